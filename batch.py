@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+from instrumentation import token_usage, tracer
+from github_actions_ai import (
+    create_llm,
+    extract_yaml_content,
+    generate_yaml_prompt,
+    output_dir,
+    process_workflow,
+)
+from similarity_index import find_reusable, remember
+
+
+def load_queries(path):
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl") or line.startswith("{"):
+                entry = json.loads(line)
+                if isinstance(entry, dict):
+                    entry = entry.get("query", "")
+                line = str(entry).strip()
+                if not line:
+                    continue
+            queries.append(line)
+    return queries
+
+
+def is_rate_limited(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+async def invoke_with_retry(chain, query, max_retries=5, base_delay=1.0, max_delay=60.0):
+    attempt = 0
+    while True:
+        try:
+            return await chain.ainvoke({"query": query})
+        except Exception as e:
+            if not is_rate_limited(e) or attempt >= max_retries:
+                raise
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            attempt += 1
+            print(f"⏳ Rate limited on '{query[:40]}', retry {attempt}/{max_retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def generate_batch(queries, chain, results_file, concurrency=8, max_retries=5, timeout=120.0,
+                         cache=None, refresh=False, llm=None, prompt=None, report_options=None,
+                         similarity=None, reuse_threshold=0.8, optimize=False, repair_options=None, repo_root=None):
+    from langchain_core.messages import AIMessage
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    reused = set()
+
+    async def generate_one(index, query):
+        match = None if refresh else find_reusable(similarity, query, reuse_threshold)
+        if match is not None:
+            reused.add(index)
+            return AIMessage(content=match[1]["yaml"]), None, 0.0
+        key = cache.key_for(llm, prompt, query) if cache is not None else None
+        if key is not None and not refresh:
+            content = cache.get(key)
+            if content is not None:
+                return AIMessage(content=content), None, 0.0
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                with tracer.span("llm", query=query) as span:
+                    response = await asyncio.wait_for(
+                        invoke_with_retry(chain, query, max_retries=max_retries), timeout
+                    )
+                    span.set(**token_usage(response))
+                if key is not None:
+                    cache.put_workflow(key, response.content, getattr(llm, "model_name", None))
+                return response, None, time.perf_counter() - started
+            except asyncio.TimeoutError:
+                return None, f"Timed out after {timeout}s", time.perf_counter() - started
+            except Exception as e:
+                return None, f"{type(e).__name__}: {e}", time.perf_counter() - started
+
+    async def run_one(index, query):
+        response, error, elapsed = await generate_one(index, query)
+        if error is not None:
+            return index, query, None, None, error, elapsed
+        with tracer.span("extract_yaml_content"):
+            yaml_content = extract_yaml_content(response)
+        # Validation may repair the workflow with blocking LLM calls, so it runs
+        # in a worker thread instead of stalling every other query on the loop.
+        # A thread cannot be cancelled, so the timeout is a deadline that
+        # process_workflow checks itself before repairing or writing files.
+        async with semaphore:
+            deadline = time.monotonic() + timeout
+            outputs = await asyncio.to_thread(
+                process_workflow, yaml_content, query, report_options, optimize, repair_options, llm, repo_root,
+                deadline,
+            )
+        if outputs is None:
+            if time.monotonic() >= deadline:
+                return index, query, yaml_content, None, f"Validation timed out after {timeout}s", elapsed
+            return index, query, yaml_content, None, "Generated workflow failed validation", elapsed
+        return index, query, yaml_content, outputs, None, elapsed
+
+    tasks = [asyncio.create_task(run_one(i, q)) for i, q in enumerate(queries)]
+    summary = {"succeeded": 0, "failed": 0}
+    for finished in asyncio.as_completed(tasks):
+        index, query, yaml_content, outputs, error, elapsed = await finished
+        result = {"index": index, "query": query, "elapsed_seconds": round(elapsed, 3)}
+        if error is None:
+            result.update(outputs)
+            if index in reused:
+                result["reused"] = True
+            else:
+                remember(similarity, query, outputs["repair"]["yaml"] if "repair" in outputs else yaml_content)
+        result["status"] = "ok" if error is None else "error"
+        if error is not None:
+            result["error"] = error
+        summary["succeeded" if error is None else "failed"] += 1
+        results_file.write(json.dumps(result) + "\n")
+        results_file.flush()
+    return summary
+
+
+def run_batch(queries_path, concurrency=8, max_retries=5, timeout=120.0, results_path=None,
+              cache=None, refresh=False, report_options=None, similarity=None, reuse_threshold=0.8,
+              optimize=False, repair_options=None, repo_root=None):
+    queries = load_queries(queries_path)
+    if results_path is None:
+        report_dir = output_dir("reports")
+        os.makedirs(report_dir, exist_ok=True)
+        results_path = os.path.join(report_dir, f"batch-results-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl")
+
+    llm = create_llm()
+    prompt = generate_yaml_prompt(None)
+    chain = prompt | llm
+
+    print(f"Generating {len(queries)} workflows with concurrency {concurrency}...")
+    with open(results_path, "w", encoding="utf-8") as results_file:
+        summary = asyncio.run(
+            generate_batch(queries, chain, results_file, concurrency, max_retries, timeout,
+                           cache=cache, refresh=refresh, llm=llm, prompt=prompt,
+                           report_options=report_options, similarity=similarity,
+                           reuse_threshold=reuse_threshold, optimize=optimize,
+                           repair_options=repair_options, repo_root=repo_root)
+        )
+    print(f"\nBatch complete: {summary['succeeded']} succeeded, {summary['failed']} failed")
+    print(f"Results written to {results_path}")
+    if hasattr(llm, "backend_stats"):
+        print(llm.summary())
+    if cache is not None:
+        print(cache.summary())
+    return results_path
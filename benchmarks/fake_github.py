@@ -0,0 +1,148 @@
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeGitHub:
+    """In-memory repositories behind the subset of the GitHub REST API used by ``deploy``.
+
+    ``latency`` adds a delay to every request, and ``rate_limit`` requests are
+    allowed per ``rate_window`` seconds before 403s with X-RateLimit headers
+    are returned, like the real API.
+    """
+
+    def __init__(self, latency=0.0, rate_limit=5000, rate_window=1.0):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.lock = threading.Lock()
+        self.objects = {}
+        self.refs = {}
+        self.requests = 0
+        self.connections = set()
+        self.window_start = time.time()
+        self.window_used = 0
+
+    def _store(self, kind, value):
+        sha = hashlib.sha1(json.dumps([kind, value], sort_keys=True).encode("utf-8")).hexdigest()
+        self.objects[sha] = (kind, value)
+        return sha
+
+    def create_repo(self, repo, branch="main", files=None):
+        with self.lock:
+            tree = self._store("tree", dict(files or {}))
+            self.refs[(repo, branch)] = self._store("commit", {"tree": tree, "parents": [], "message": "init"})
+
+    def files(self, repo, branch="main"):
+        with self.lock:
+            commit = self.objects[self.refs[(repo, branch)]][1]
+            return dict(self.objects[commit["tree"]][1])
+
+    def commits(self, repo, branch="main"):
+        with self.lock:
+            count, sha = 0, self.refs[(repo, branch)]
+            while sha:
+                count += 1
+                parents = self.objects[sha][1]["parents"]
+                sha = parents[0] if parents else None
+            return count
+
+    def take_rate_budget(self):
+        with self.lock:
+            self.requests += 1
+            now = time.time()
+            if now - self.window_start >= self.rate_window:
+                self.window_start, self.window_used = now, 0
+            self.window_used += 1
+            remaining = self.rate_limit - self.window_used
+            return remaining >= 0, max(0, remaining), self.window_start + self.rate_window
+
+    def handle(self, method, path, payload):
+        match = re.match(r"^/repos/([^/]+/[^/]+)/(.*)$", path.split("?", 1)[0])
+        if not match:
+            return 404, {"message": "Not Found"}
+        repo, rest = match.groups()
+        query = path.split("?", 1)[1] if "?" in path else ""
+        with self.lock:
+            if (m := re.match(r"^git/refs?/heads/(.+)$", rest)):
+                key = (repo, m.group(1))
+                if key not in self.refs:
+                    return 404, {"message": "Not Found"}
+                if method == "GET":
+                    return 200, {"object": {"sha": self.refs[key]}}
+                commit = self.objects.get(payload["sha"])
+                if commit is None or self.refs[key] not in commit[1]["parents"]:
+                    return 422, {"message": "Update is not a fast forward"}
+                self.refs[key] = payload["sha"]
+                return 200, {"object": {"sha": payload["sha"]}}
+            if (m := re.match(r"^git/commits/([0-9a-f]+)$", rest)) and method == "GET":
+                return 200, {"sha": m.group(1), "tree": {"sha": self.objects[m.group(1)][1]["tree"]}}
+            if rest == "git/trees" and method == "POST":
+                files = dict(self.objects[payload["base_tree"]][1])
+                files.update((entry["path"], entry["content"]) for entry in payload["tree"])
+                return 201, {"sha": self._store("tree", files)}
+            if rest == "git/commits" and method == "POST":
+                commit = {"tree": payload["tree"], "parents": payload["parents"], "message": payload["message"]}
+                return 201, {"sha": self._store("commit", commit)}
+            if (m := re.match(r"^contents/(.+)$", rest)):
+                branch = payload["branch"] if method == "PUT" else dict(p.split("=") for p in query.split("&") if p).get("ref", "main")
+                key = (repo, branch)
+                if key not in self.refs:
+                    return 404, {"message": "Branch not found"}
+                head = self.refs[key]
+                files = dict(self.objects[self.objects[head][1]["tree"]][1])
+                path = m.group(1)
+                if method == "GET":
+                    if path not in files:
+                        return 404, {"message": "Not Found"}
+                    return 200, {"sha": hashlib.sha1(files[path].encode("utf-8")).hexdigest()}
+                if path in files and payload.get("sha") != hashlib.sha1(files[path].encode("utf-8")).hexdigest():
+                    return 409, {"message": "sha does not match"}
+                files[path] = base64.b64decode(payload["content"]).decode("utf-8")
+                commit = {"tree": self._store("tree", files), "parents": [head], "message": payload["message"]}
+                self.refs[key] = self._store("commit", commit)
+                return 201, {"commit": {"sha": self.refs[key]}}
+        return 404, {"message": "Not Found"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _dispatch(self):
+        fake = self.server.fake
+        fake.connections.add(self.client_address)
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length)) if length else None
+        if fake.latency:
+            time.sleep(fake.latency)
+        allowed, remaining, reset = fake.take_rate_budget()
+        if allowed:
+            status, body = fake.handle(self.command, self.path, payload)
+        else:
+            status, body = 403, {"message": "API rate limit exceeded"}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-RateLimit-Remaining", str(remaining))
+        self.send_header("X-RateLimit-Reset", f"{reset:.3f}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = _dispatch
+
+
+def start_fake_github(fake=None, host="127.0.0.1", port=0):
+    """Serves ``fake`` on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.fake = fake or FakeGitHub()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
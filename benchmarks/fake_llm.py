@@ -0,0 +1,42 @@
+import asyncio
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from benchmarks.synthetic import generate_yaml
+
+
+class FakeWorkflowLLM(BaseChatModel):
+    """Deterministic local stand-in for ChatOpenAI with configurable latency."""
+
+    model_name: str = "fake-gpt-4o"
+    latency: float = 0.0
+    profile: str = "small"
+    response: Optional[str] = None
+    chunk_size: int = 64
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-workflow"
+
+    def _content(self) -> str:
+        return f"```yaml\n{self.response or generate_yaml(self.profile)}```"
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._content()))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._content()))])
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        content = self._content()
+        chunks = range(0, len(content), self.chunk_size)
+        delay = self.latency / max(1, len(chunks))
+        for i in chunks:
+            time.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content[i:i + self.chunk_size]))
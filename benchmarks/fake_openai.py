@@ -0,0 +1,115 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import generate_yaml
+
+
+class FakeOpenAI:
+    """OpenAI-compatible chat completions endpoint answering with a synthetic workflow.
+
+    Every request waits ``latency`` seconds; a ``slow_rate`` fraction waits
+    ``slow_latency`` instead (the tail), and an ``error_rate`` fraction fails
+    with ``error_status``. The same server answers Azure deployment URLs.
+    """
+
+    def __init__(self, latency=0.0, slow_rate=0.0, slow_latency=0.0, error_rate=0.0, error_status=500,
+                 profile="small", chunk_size=64, seed=0):
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.content = f"```yaml\n{generate_yaml(profile)}```"
+        self.chunk_size = chunk_size
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "slow": 0, "disconnected": 0}
+
+    def plan(self):
+        """Returns (delay, error status or None) for the next request."""
+        with self.lock:
+            self.stats["requests"] += 1
+            delay = self.latency
+            if self.random.random() < self.slow_rate:
+                self.stats["slow"] += 1
+                delay = self.slow_latency
+            if self.random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return delay, self.error_status
+            return delay, None
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, fake, model):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        content = fake.content
+        for i in range(0, len(content), fake.chunk_size):
+            chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": {"content": content[i:i + fake.chunk_size]},
+                                                  "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        done = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+
+    def do_POST(self):
+        fake = self.server.fake
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if "/chat/completions" not in self.path:
+            self._json(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+            return
+        delay, error = fake.plan()
+        time.sleep(delay)
+        model = payload.get("model") or "fake-gpt-4o"
+        try:
+            if error is not None:
+                self._json(error, {"error": {"message": "Injected failure", "type": "server_error"}})
+            elif payload.get("stream"):
+                self._stream(fake, model)
+            else:
+                prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in payload.get("messages", []))
+                completion_tokens = len(fake.content.split())
+                self._json(200, {
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": fake.content},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on this request, e.g. a hedged request that lost the race.
+            fake.count("disconnected")
+            self.close_connection = True
+
+
+def start_fake_openai(fake=None, host="127.0.0.1", port=0):
+    """Serves ``fake`` on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.fake = fake or FakeOpenAI()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
@@ -0,0 +1,174 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import yaml
+
+import github_actions_ai
+import yaml_io
+from benchmarks.synthetic import PROFILES, generate_yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEATS = {"small": 50, "medium": 20, "large": 5, "pathological": 1}
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return {"median": statistics.median(times), "min": min(times), "runs": repeat}
+
+
+def component_benchmarks(profile, tmp_dir):
+    from workflow_schema import WorkflowSchema
+
+    text = generate_yaml(profile)
+    parsed = yaml.safe_load(text)
+    fixed = github_actions_ai.fix_yaml_structure(dict(parsed))
+    security = github_actions_ai.check_security_compliance(fixed)
+    efficiency = github_actions_ai.analyze_pipeline_efficiency(fixed)
+    report_path = os.path.join(tmp_dir, f"report-{profile}.md")
+    return {
+        "yaml.safe_load": lambda: yaml.safe_load(text),
+        "load_yaml (uncached)": lambda: yaml_io.load_yaml(text, cache=None),
+        "load_yaml (cached)": lambda: yaml_io.load_yaml(text),
+        "fix_yaml_structure": lambda: github_actions_ai.fix_yaml_structure(dict(parsed)),
+        "WorkflowSchema.model_validate": lambda: WorkflowSchema.model_validate(fixed),
+        "check_security_compliance": lambda: github_actions_ai.check_security_compliance(fixed),
+        "analyze_pipeline_efficiency": lambda: github_actions_ai.analyze_pipeline_efficiency(fixed),
+        "analyze_build_quality": lambda: github_actions_ai.analyze_build_quality(fixed),
+        "analyze_workflow": lambda: github_actions_ai.analyze_workflow(fixed),
+        "generate_report": lambda: github_actions_ai.generate_report(fixed, security, efficiency, report_path, "benchmark"),
+    }
+
+
+def end_to_end_benchmarks(profile, latency):
+    from benchmarks.fake_llm import FakeWorkflowLLM
+
+    def run(*extra):
+        original = github_actions_ai.create_azure_llm
+        github_actions_ai.create_azure_llm = lambda: FakeWorkflowLLM(latency=latency, profile=profile)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                github_actions_ai.main(["--query", f"benchmark {profile}", "--no-cache", "--no-reuse", *extra])
+        finally:
+            github_actions_ai.create_azure_llm = original
+
+    return {"main": run, "main --stream": lambda: run("--stream")}
+
+
+def startup_benchmarks(tmp_dir):
+    workflow = os.path.join(tmp_dir, "startup.yml")
+    with open(workflow, "w", encoding="utf-8") as f:
+        f.write(generate_yaml("small"))
+    script = os.path.join(ROOT, "github_actions_ai.py")
+
+    def run(*args):
+        subprocess.run([sys.executable, script, *args], check=False,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return {
+        "analyze": lambda: run("analyze", "--no-report", workflow),
+        "--help": lambda: run("--help"),
+    }
+
+
+def run_benchmarks(profiles, latency=0.0, repeat_scale=1.0, include_e2e=True):
+    results = {}
+
+    def record(name, fn, repeat):
+        repeat = max(1, int(repeat * repeat_scale))
+        results[name] = timed(fn, repeat)
+        print(f"{name:<50} median {results[name]['median'] * 1000:10.3f} ms  (n={repeat})")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["GHA_AI_OUTPUT_DIR"] = tmp_dir
+        for name, fn in startup_benchmarks(tmp_dir).items():
+            record(f"startup/{name}", fn, 5)
+        for profile in profiles:
+            for name, fn in component_benchmarks(profile, tmp_dir).items():
+                record(f"{profile}/{name}", fn, REPEATS[profile])
+            if include_e2e and profile != "pathological":
+                for name, fn in end_to_end_benchmarks(profile, latency).items():
+                    record(f"{profile}/e2e/{name}", fn, max(1, REPEATS[profile] // 5))
+        os.environ.pop("GHA_AI_OUTPUT_DIR", None)
+    return results
+
+
+def compare(baseline, current, threshold=0.2):
+    """Prints a comparison table and returns the names of regressed benchmarks."""
+    regressions = []
+    base_results = baseline["results"]
+    for name, result in current["results"].items():
+        if name not in base_results:
+            print(f"{name:<50} {'new':>10}")
+            continue
+        before, after = base_results[name]["median"], result["median"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  ⚠️ REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  🚀 faster"
+        print(f"{name:<50} {before * 1000:10.3f} ms -> {after * 1000:10.3f} ms  {change:+7.1%}{flag}")
+    return regressions
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the workflow pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and optionally save a JSON baseline")
+    run_parser.add_argument("--profiles", nargs="+", default=["small", "medium", "large"], choices=list(PROFILES))
+    run_parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds of latency for the fake LLM")
+    run_parser.add_argument("--repeat-scale", type=float, default=1.0, help="Multiplier for repetition counts")
+    run_parser.add_argument("--no-e2e", action="store_true", help="Skip end-to-end main() benchmarks")
+    run_parser.add_argument("--output", help="Write results as a JSON baseline")
+    run_parser.add_argument("--compare", help="Baseline JSON to compare against")
+    run_parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown flagged as a regression")
+
+    compare_parser = commands.add_parser("compare", help="Compare two saved benchmark runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown flagged as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        regressions = compare(load(args.baseline), load(args.current), args.threshold)
+    else:
+        current = {
+            "meta": {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "llm_latency": args.llm_latency,
+            },
+            "results": run_benchmarks(args.profiles, args.llm_latency, args.repeat_scale, not args.no_e2e),
+        }
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=2)
+            print(f"\nResults written to {args.output}")
+        regressions = compare(load(args.compare), current, args.threshold) if args.compare else []
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
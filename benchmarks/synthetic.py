@@ -0,0 +1,57 @@
+import functools
+import random
+
+import yaml
+
+ACTIONS = [
+    "actions/checkout@v4", "actions/setup-python@v5", "actions/cache@v4", "actions/upload-artifact@v4",
+    "actions/setup-node@master", "docker/build-push-action@v1", "codecov/codecov-action@main",
+]
+COMMANDS = [
+    "pip install -r requirements.txt", "pytest --cov=app tests/", "flake8 .", "mypy app",
+    "curl -sSL https://example.com/install.sh | sh", "sudo apt-get install -y libpq-dev",
+    "echo done >> $GITHUB_STEP_SUMMARY", "npm ci && npm test", "safety check", "wget https://example.com/a.tgz",
+]
+
+PROFILES = {
+    "small": {"jobs": 1, "steps": 5, "matrix_axes": 0, "matrix_values": 0, "run_lines": 2},
+    "medium": {"jobs": 10, "steps": 15, "matrix_axes": 2, "matrix_values": 3, "run_lines": 5},
+    "large": {"jobs": 200, "steps": 30, "matrix_axes": 3, "matrix_values": 5, "run_lines": 10},
+    "pathological": {"jobs": 2000, "steps": 25, "matrix_axes": 8, "matrix_values": 12, "run_lines": 400},
+}
+
+
+def generate_workflow(jobs=1, steps=5, matrix_axes=0, matrix_values=0, run_lines=2, seed=0):
+    """Builds a deterministic workflow dict of the requested shape."""
+    rng = random.Random(seed)
+    workflow = {
+        "name": f"Synthetic workflow {jobs}x{steps}",
+        "on": {"push": {"branches": ["main"]}, "pull_request": {"branches": ["main"]}},
+        "jobs": {},
+    }
+    for j in range(jobs):
+        job = {"runs-on": rng.choice(["ubuntu-latest", "windows-latest", "macos-latest"]), "steps": []}
+        if j:
+            job["needs"] = [f"job-{rng.randrange(j)}"]
+        if matrix_axes:
+            matrix = {f"axis{a}": [f"v{v}" for v in range(matrix_values)] for a in range(matrix_axes)}
+            matrix["include"] = [{"axis0": "v0", "extra": True}]
+            matrix["exclude"] = [{"axis0": "v1", "axis1": "v1"}] if matrix_axes > 1 else []
+            job["strategy"] = {"matrix": matrix}
+        if rng.random() < 0.5:
+            job["timeout-minutes"] = 30
+        for s in range(steps):
+            if rng.random() < 0.4:
+                step = {"name": f"Step {s}", "uses": rng.choice(ACTIONS)}
+            else:
+                lines = [rng.choice(COMMANDS) for _ in range(run_lines)]
+                step = {"name": f"Step {s}", "run": "\n".join(lines)}
+            job["steps"].append(step)
+        workflow["jobs"][f"job-{j}"] = job
+    return workflow
+
+
+@functools.lru_cache(maxsize=None)
+def generate_yaml(profile="small", seed=0):
+    workflow = generate_workflow(seed=seed, **PROFILES[profile])
+    return yaml.dump(workflow, default_flow_style=False, sort_keys=False, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
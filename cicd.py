@@ -12,7 +12,6 @@ from pydantic import BaseModel, SecretStr, validator
 from langchain.chat_models import AzureChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
-from playwright.sync_api import sync_playwright
 import csv
 #from PyPDF2 import PdfReader
 import logging
@@ -68,35 +67,15 @@ class GitHubWorkflowAgent:
             raise
 
     def deploy_workflow(self, repo_name: str, branch: str, workflow_name: str, yaml_content: str):
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False)
-            context = browser.new_context()
-            page = context.new_page()
-
-            # Login to GitHub
-            page.goto("https://github.com/login")
-            page.fill("input[name=login]", os.getenv("GITHUB_USERNAME"))
-            page.fill("input[name=password]", os.getenv("GITHUB_PASSWORD"))
-            page.click("input[name=commit]")
-            page.wait_for_url("https://github.com/")
-
-            # Navigate to Actions Tab
-            page.goto(f"https://github.com/{repo_name}/actions")
-            page.click(".js-new-workflow")
-
-            # Create Workflow
-            page.fill('input[placeholder="Workflow name"]', workflow_name)
-            iframe = page.frame_locator("iframe")
-            iframe.fill("div.Monaco-editor.no-user-select", yaml_content)
-
-            # Commit Changes
-            page.click('button:text("Start commit")')
-            page.click('button[js-controller="BranchCommitButton"]')
-            page.wait_for_load_state("networkidle")
-
-            logging.info(f"Workflow '{workflow_name}' deployed successfully to {repo_name}:{branch}")
-            context.close()
-            browser.close()
+        from deploy import DEFAULT_API_URL, WORKFLOW_DIR, GitHubClient, commit_files
+
+        client = GitHubClient(os.getenv("GITHUB_TOKEN"), os.getenv("GITHUB_API_URL", DEFAULT_API_URL))
+        try:
+            commit_files(client, repo_name, branch, {f"{WORKFLOW_DIR}/{workflow_name}.yml": yaml_content},
+                         f"Add {workflow_name} workflow")
+        finally:
+            client.close()
+        logging.info(f"Workflow '{workflow_name}' deployed successfully to {repo_name}:{branch}")
 
 def main():
     parser = argparse.ArgumentParser(description="GitHub Actions AI Agent")
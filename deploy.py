@@ -0,0 +1,244 @@
+import argparse
+import base64
+import contextlib
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_API_URL = "https://api.github.com"
+WORKFLOW_DIR = ".github/workflows"
+MAX_RATE_LIMIT_WAIT = 900.0
+
+
+class DeployError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, shared by all threads."""
+
+    def __init__(self, base_url, size=8, timeout=30.0):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.https = parsed.scheme == "https"
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.prefix = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.created = 0
+
+    def _connect(self):
+        self.created += 1
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    @contextlib.contextmanager
+    def connection(self):
+        with self.slots:
+            try:
+                connection, reused = self.idle.get_nowait(), True
+            except queue.Empty:
+                connection, reused = self._connect(), False
+            try:
+                yield connection, reused
+            except BaseException:
+                connection.close()
+                raise
+            self.idle.put(connection)
+
+    def request(self, method, path, body=None, headers=None):
+        for attempt in range(2):
+            with self.connection() as (connection, reused):
+                try:
+                    connection.request(method, self.prefix + path, body, headers or {})
+                    response = connection.getresponse()
+                    data = response.read()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    # The server closed an idle keep-alive connection; retry once on a fresh one.
+                    if reused and attempt == 0:
+                        connection.close()
+                        continue
+                    raise
+                if response.getheader("Connection", "").lower() == "close":
+                    connection.close()
+                return response.status, response.headers, data
+        raise DeployError(f"{method} {path} failed after reconnecting")
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RateLimit:
+    """Tracks the X-RateLimit headers and makes callers wait once the budget is spent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.remaining = None
+        self.reset_at = 0.0
+
+    def update(self, headers):
+        remaining, reset = headers.get("X-RateLimit-Remaining"), headers.get("X-RateLimit-Reset")
+        with self._lock:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if reset is not None:
+                self.reset_at = float(reset)
+
+    def delay(self):
+        with self._lock:
+            if self.remaining is not None and self.remaining <= 0:
+                return max(0.0, min(MAX_RATE_LIMIT_WAIT, self.reset_at - time.time()))
+        return 0.0
+
+
+class GitHubClient:
+    def __init__(self, token=None, api_url=DEFAULT_API_URL, pool_size=8, max_retries=3, timeout=30.0):
+        self.pool = ConnectionPool(api_url, pool_size, timeout)
+        self.rate_limit = RateLimit()
+        self.max_retries = max_retries
+        self.headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "User-Agent": "github-actions-ai",
+            "Content-Type": "application/json",
+        }
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+    def request(self, method, path, payload=None, expected=(200, 201)):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        for attempt in range(self.max_retries + 1):
+            delay = self.rate_limit.delay()
+            if delay:
+                print(f"⏳ GitHub rate limit exhausted, waiting {delay:.1f}s")
+                time.sleep(delay)
+            status, headers, data = self.pool.request(method, path, body, self.headers)
+            self.rate_limit.update(headers)
+            if status in expected:
+                return json.loads(data) if data else {}
+            limited = status == 429 or (status == 403 and (headers.get("Retry-After")
+                                                           or headers.get("X-RateLimit-Remaining") == "0"))
+            if limited and attempt < self.max_retries:
+                retry_after = headers.get("Retry-After")
+                wait = float(retry_after) if retry_after else self.rate_limit.delay() or 2 ** attempt
+                time.sleep(min(wait, MAX_RATE_LIMIT_WAIT))
+                continue
+            try:
+                message = json.loads(data).get("message", "")
+            except ValueError:
+                message = data[:200].decode("utf-8", "replace")
+            raise DeployError(f"{method} {path} returned {status}: {message}", status)
+        raise DeployError(f"{method} {path} still rate limited after {self.max_retries} retries", 429)
+
+    def close(self):
+        self.pool.close()
+
+
+def commit_files(client, repo, branch, files, message):
+    """Commits ``files`` (path -> text) to ``branch`` of ``repo`` as a single commit; returns its sha."""
+    if len(files) == 1:
+        return put_contents(client, repo, branch, *next(iter(files.items())), message)
+    base = f"/repos/{repo}/git"
+    for attempt in range(3):
+        head = client.request("GET", f"{base}/ref/heads/{urllib.parse.quote(branch)}")["object"]["sha"]
+        base_tree = client.request("GET", f"{base}/commits/{head}")["tree"]["sha"]
+        tree = client.request("POST", f"{base}/trees", {
+            "base_tree": base_tree,
+            "tree": [{"path": path, "mode": "100644", "type": "blob", "content": content}
+                     for path, content in files.items()],
+        })["sha"]
+        commit = client.request("POST", f"{base}/commits", {"message": message, "tree": tree, "parents": [head]})["sha"]
+        try:
+            client.request("PATCH", f"{base}/refs/heads/{urllib.parse.quote(branch)}", {"sha": commit})
+            return commit
+        except DeployError as e:
+            # 422: the branch moved while we were building the commit; rebuild it on the new head.
+            if e.status != 422 or attempt == 2:
+                raise
+    raise DeployError(f"Could not update {repo}:{branch}")
+
+
+def put_contents(client, repo, branch, path, content, message):
+    url = f"/repos/{repo}/contents/{urllib.parse.quote(path)}"
+    payload = {"message": message, "branch": branch,
+               "content": base64.b64encode(content.encode("utf-8")).decode("ascii")}
+    try:
+        existing = client.request("GET", f"{url}?ref={urllib.parse.quote(branch)}")
+        payload["sha"] = existing["sha"]
+    except DeployError as e:
+        if e.status != 404:
+            raise
+    return client.request("PUT", url, payload)["commit"]["sha"]
+
+
+def deploy(client, deployments, workers=8):
+    """Runs each (repo, branch, files, message) deployment concurrently and yields result dicts."""
+
+    def run(deployment):
+        repo, branch, files, message = deployment
+        started = time.perf_counter()
+        result = {"repo": repo, "branch": branch, "files": sorted(files)}
+        try:
+            result.update(status="ok", commit=commit_files(client, repo, branch, files, message))
+        except (DeployError, OSError, KeyError, ValueError) as e:
+            result.update(status="error", error=str(e))
+        result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        return result
+
+    with ThreadPoolExecutor(max(1, workers)) as pool:
+        yield from pool.map(run, deployments)
+
+
+def workflow_files(paths, directory=WORKFLOW_DIR):
+    from github_actions_ai import find_workflow_files
+
+    files = {}
+    for path in find_workflow_files(paths):
+        with open(path, encoding="utf-8") as f:
+            files[f"{directory}/{os.path.basename(path)}"] = f.read()
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="github_actions_ai.py deploy",
+        description="Commit workflow files to GitHub repositories through the REST API",
+    )
+    parser.add_argument("paths", nargs="+", help="Workflow files or directories to deploy")
+    parser.add_argument("--repo", action="append", required=True, help="Target repository (owner/name); repeatable")
+    parser.add_argument("--branch", default="main", help="Branch to commit to")
+    parser.add_argument("--message", default="Add GitHub Actions workflows", help="Commit message")
+    parser.add_argument("--api-url", default=os.getenv("GITHUB_API_URL", DEFAULT_API_URL),
+                        help="GitHub API base URL (GitHub Enterprise or a local stub server)")
+    parser.add_argument("--workers", type=int, default=8, help="Repositories deployed concurrently")
+    args = parser.parse_args(argv)
+
+    files = workflow_files(args.paths)
+    if not files:
+        print("❌ No workflow files found")
+        return 1
+    client = GitHubClient(os.getenv("GITHUB_TOKEN"), args.api_url, pool_size=args.workers)
+    exit_code = 0
+    try:
+        for result in deploy(client, [(repo, args.branch, files, args.message) for repo in args.repo], args.workers):
+            if result["status"] == "ok":
+                print(f"✅ {result['repo']}:{result['branch']} {result['commit'][:7]} "
+                      f"({len(result['files'])} files, {result['elapsed_seconds']}s)")
+            else:
+                print(f"❌ {result['repo']}:{result['branch']} {result['error']}")
+                exit_code = 1
+    finally:
+        client.close()
+    return exit_code
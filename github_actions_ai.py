@@ -1,66 +1,82 @@
 import os
-from dotenv import load_dotenv
-from pydantic import BaseModel, field_validator
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
+import sys
 import argparse
+import time
 import uuid
 import yaml
-from langchain_core.messages import AIMessage
-from typing import Optional, Dict, Any
 from datetime import datetime
-import json
-
-load_dotenv()
-
-class WorkflowSchema(BaseModel):
-    name: Optional[str] = None
-    on: Dict[str, Any]
-    jobs: Dict[str, Dict[str, Any]]
-
-    @field_validator('on', mode='before')
-    @classmethod
-    def valid_triggers(cls, value):
-        if isinstance(value, dict):
-            return value
-        elif isinstance(value, str):
-            return {value: {}}
-        raise ValueError("Invalid trigger event")
-
-    @field_validator('jobs')
-    @classmethod
-    def valid_jobs(cls, value):
-        if not isinstance(value, dict):
-            raise ValueError("Jobs must be a dictionary")
-        for job_config in value.values():
-            if not isinstance(job_config, dict):
-                raise ValueError("Each job must be a dictionary of configurations")
-            if 'runs-on' not in job_config:
-                raise ValueError("Each job must specify 'runs-on'")
-        return value
+from instrumentation import tracer
+from yaml_io import document_cache, load_yaml, with_source
+from repair import MAX_ATTEMPTS as MAX_REPAIR_ATTEMPTS, MAX_TOKENS as MAX_REPAIR_TOKENS
+
+# LangChain, OpenAI, pydantic and dotenv are imported lazily on the generate
+# path so that `analyze` and `--help` start without loading the LLM stack.
+
+def __getattr__(name):
+    if name == "WorkflowSchema":
+        from workflow_schema import WorkflowSchema
+        return WorkflowSchema
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def output_dir(*parts):
+    base_dir = os.getenv("GHA_AI_OUTPUT_DIR") or os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, *parts)
+
+def find_repo_root(path, default=None):
+    """The root of the repository ``path`` belongs to.
+
+    That is the nearest directory holding ``.git``, otherwise the one holding the
+    ``.github`` directory ``path`` lives in, otherwise ``default`` or the working directory.
+    """
+    path = os.path.abspath(path)
+    directory = path if os.path.isdir(path) else os.path.dirname(path)
+    while not os.path.exists(os.path.join(directory, ".git")):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            parts = path.split(os.sep)
+            if ".github" in parts:
+                return os.sep.join(parts[:len(parts) - 1 - parts[::-1].index(".github")]) or os.sep
+            return default or os.getcwd()
+        directory = parent
+    return directory
 
 def generate_yaml_prompt(query):
+    from langchain.prompts import PromptTemplate
+
     return PromptTemplate.from_template(
         """Generate valid GitHub Actions YAML for: {query}
         Output only the YAML content without explanation."""
     )
 
 def create_azure_llm():
+    from dotenv import load_dotenv
+    from langchain_openai import ChatOpenAI
+
+    load_dotenv()
     return ChatOpenAI(
         model_name="gpt-4o",
         openai_api_base=os.getenv("AZURE_OPENAI_ENDPOINT"),
         openai_api_key=os.getenv("AZURE_OPENAI_KEY"),
     )
 
+def create_llm():
+    """The LLM router when GHA_AI_BACKENDS points at a backend config, otherwise the single Azure model."""
+    backends = os.getenv("GHA_AI_BACKENDS")
+    if backends:
+        from llm_router import load_router
+        return load_router(backends)
+    return create_azure_llm()
+
+WORKFLOW_NAME_LENGTH = 30
+
 def generate_workflow_filename(query):
-    base_name = query.lower().replace(" ", "-")[:30]
+    base_name = query.lower().replace(" ", "-")[:WORKFLOW_NAME_LENGTH]
     unique_id = uuid.uuid4().hex[:8]
     return f"{base_name}-{unique_id}.yml"
 
 def create_local_workflow_file(yaml_content, query):
     workflow_name = generate_workflow_filename(query)
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    workflow_dir = os.path.join(base_dir, ".github", "workflows")
+    workflow_dir = output_dir(".github", "workflows")
     os.makedirs(workflow_dir, exist_ok=True)
     
     file_path = os.path.join(workflow_dir, workflow_name)
@@ -70,6 +86,8 @@ def create_local_workflow_file(yaml_content, query):
     return file_path
 
 def extract_yaml_content(response):
+    from langchain_core.messages import AIMessage
+
     if isinstance(response, AIMessage):
         content = response.content
         if content.startswith("```"):
@@ -85,171 +103,29 @@ def fix_yaml_structure(yaml_dict):
         del yaml_dict[True]
     return yaml_dict
 
+def analyze_workflow(yaml_dict):
+    from rules import run_rules
+
+    return run_rules(yaml_dict)
+
 def check_security_compliance(yaml_dict):
-    security_issues = {
-        "critical": [],
-        "warning": [],
-        "info": []
-    }
-    
-    if 'jobs' in yaml_dict:
-        for job_id, job in yaml_dict['jobs'].items():
-            if 'steps' in job:
-                for step in job['steps']:
-                    if 'uses' in step and '@' in step['uses']:
-                        action = step['uses']
-                        if '@master' in action or '@main' in action:
-                            security_issues["critical"].append(f"⛔ Using unstable version in {action}. Specify a fixed version.")
-                        elif '@v1' in action:
-                            security_issues["warning"].append(f"⚠️ Consider updating {action} to latest version")
-                    
-                    if 'run' in step:
-                        cmd = step['run'].lower()
-                        if 'curl' in cmd and not cmd.startswith('curl --fail'):
-                            security_issues["warning"].append(f"⚠️ Unsafe curl usage without --fail in step '{step.get('name', 'unnamed')}'")
-                        if 'wget' in cmd:
-                            security_issues["warning"].append(f"⚠️ Consider using curl --fail instead of wget in step '{step.get('name', 'unnamed')}'")
-                        if 'sudo' in cmd:
-                            security_issues["critical"].append(f"⛔ Sudo usage detected in step '{step.get('name', 'unnamed')}'")
-                        if '>' in cmd or '>>' in cmd:
-                            security_issues["info"].append(f"ℹ️ File system write detected in step '{step.get('name', 'unnamed')}'")
-
-    return security_issues
+    return analyze_workflow(yaml_dict)["security"]
 
 def analyze_pipeline_efficiency(yaml_dict):
-    analysis = {
-        "metrics": {
-            "parallel_jobs": len(yaml_dict.get('jobs', {})),
-            "total_steps": sum(len(job.get('steps', [])) for job in yaml_dict['jobs'].values()),
-            "matrix_builds": any('matrix' in job.get('strategy', {}) for job in yaml_dict['jobs'].values()),
-            "caching_used": any('cache' in step.get('uses', '') for job in yaml_dict['jobs'].values() for step in job.get('steps', [])),
-        },
-        "optimization_suggestions": [],
-        "best_practices": []
-    }
-    
-    if analysis["metrics"]["total_steps"] > 10:
-        analysis["optimization_suggestions"].append("🔄 Consider splitting into multiple jobs for better parallelization")
-    
-    if not analysis["metrics"]["caching_used"]:
-        analysis["optimization_suggestions"].append("💾 Implement dependency caching to speed up builds")
-    
-    if not analysis["metrics"]["matrix_builds"] and analysis["metrics"]["parallel_jobs"] == 1:
-        analysis["optimization_suggestions"].append("⚡ Consider using matrix strategy for parallel testing")
-    
-    for job_id, job in yaml_dict['jobs'].items():
-        if not job.get('timeout-minutes'):
-            analysis["best_practices"].append("⏱️ Add timeout-minutes to prevent hanging jobs")
-        if 'continue-on-error' not in job:
-            analysis["best_practices"].append("🔄 Consider using continue-on-error for non-critical steps")
-
-    return analysis
+    return analyze_workflow(yaml_dict)["efficiency"]
 
 def analyze_build_quality(yaml_dict):
-    build_analysis = {
-        "quality_gates": [],
-        "test_coverage": False,
-        "linting": False,
-        "type_checking": False,
-        "dependency_audit": False,
-        "estimated_success_rate": 0
-    }
-    
-    for job in yaml_dict.get('jobs', {}).values():
-        for step in job.get('steps', []):
-            step_name = step.get('name', '').lower()
-            step_run = step.get('run', '').lower()
-            step_uses = step.get('uses', '').lower()
-            
-            if any(tool in f"{step_name} {step_run} {step_uses}" 
-                  for tool in ['pytest', 'unittest', 'coverage']):
-                build_analysis["quality_gates"].append("Unit Testing")
-                
-            if any(linter in f"{step_name} {step_run} {step_uses}"
-                  for linter in ['flake8', 'pylint', 'black', 'ruff']):
-                build_analysis["linting"] = True
-                build_analysis["quality_gates"].append("Code Style")
-                
-            if any(checker in f"{step_name} {step_run} {step_uses}"
-                  for checker in ['mypy', 'pytype', 'pyre']):
-                build_analysis["type_checking"] = True
-                build_analysis["quality_gates"].append("Type Safety")
-                
-            if any(scanner in f"{step_name} {step_run} {step_uses}"
-                  for scanner in ['dependabot', 'snyk', 'safety']):
-                build_analysis["dependency_audit"] = True
-                build_analysis["quality_gates"].append("Dependency Check")
-                
-            if 'coverage' in f"{step_name} {step_run} {step_uses}":
-                build_analysis["test_coverage"] = True
-    
-    base_rate = 70
-    if build_analysis["linting"]: base_rate += 10
-    if build_analysis["type_checking"]: base_rate += 10
-    if build_analysis["test_coverage"]: base_rate += 5
-    if build_analysis["dependency_audit"]: base_rate += 5
-    
-    build_analysis["estimated_success_rate"] = min(base_rate, 100)
-    return build_analysis
-
-def generate_report(yaml_dict, security_issues, efficiency_analysis, output_path, query):
-    build_analysis = analyze_build_quality(yaml_dict)
-    
-    report_content = f"""# 🚀 Workflow Analysis Report
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## 📝 Query
-```
-{query}
-```
-
-## 🏗️ Build Quality Analysis
-
-### Quality Gates
-{chr(10).join(f"- ✅ {gate}" for gate in build_analysis["quality_gates"]) or "❌ No quality gates configured"}
-
-### Code Quality Metrics
-- 🔍 Linting: {'✅ Enabled' if build_analysis["linting"] else '❌ Not configured'}
-- 🏷️ Type Checking: {'✅ Enabled' if build_analysis["type_checking"] else '❌ Not configured'}
-- 📊 Test Coverage: {'✅ Enabled' if build_analysis["test_coverage"] else '❌ Not configured'}
-- 🔒 Dependency Audit: {'✅ Enabled' if build_analysis["dependency_audit"] else '❌ Not configured'}
-
-### Build Success Estimation
-- 📈 Estimated Success Rate: {build_analysis["estimated_success_rate"]}%
-- 🎯 Quality Score: {'🟢 High' if build_analysis["estimated_success_rate"] >= 90 else '🟡 Medium' if build_analysis["estimated_success_rate"] >= 75 else '🔴 Low'}
-
-## 🔒 Security Analysis
-{generate_security_section(security_issues)}
-
-## ⚡ Pipeline Efficiency
-{generate_efficiency_section(efficiency_analysis)}
-
-## 📊 Implementation Details
-
-### Current Implementation
-```yaml
-{yaml.dump(yaml_dict, default_flow_style=False, sort_keys=False)}
-```
-
-### Recommended Improvements
-{generate_recommendations(build_analysis, efficiency_analysis)}
+    return analyze_workflow(yaml_dict)["quality"]
 
-## 📈 Performance Metrics
-- 🕒 Estimated Total Runtime: {calculate_runtime(efficiency_analysis, build_analysis)} minutes
-- 💪 Resource Utilization: {calculate_resource_usage(efficiency_analysis)}
-- ⚡ Pipeline Efficiency Score: {calculate_efficiency_score(efficiency_analysis, build_analysis)}/100
+def generate_report(yaml_dict, security_issues, efficiency_analysis, output_path, query, build_analysis=None,
+                    yaml_mode="full", yaml_max_lines=None):
+    from report_writers import DEFAULT_YAML_MAX_LINES, MarkdownReportWriter, Report
 
-## 🔄 Continuous Integration Best Practices
-{generate_ci_best_practices(build_analysis, efficiency_analysis)}
-
-## 📚 References
-- [GitHub Actions Security Hardening](https://docs.github.com/en/actions/security-guides/security-hardening-for-github-actions)
-- [Workflow Optimization Guide](https://docs.github.com/en/actions/using-workflows/about-workflows)
-- [GitHub Actions Best Practices](https://docs.github.com/en/actions/learn-github-actions/best-practices-for-using-github-actions)
-"""
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(report_content)
-    return output_path
+    if build_analysis is None:
+        build_analysis = analyze_build_quality(yaml_dict)
+    report = Report(yaml_dict, security_issues, efficiency_analysis, build_analysis, query)
+    writer = MarkdownReportWriter(yaml_mode, yaml_max_lines or DEFAULT_YAML_MAX_LINES)
+    return writer.write(report, output_path)
 
 def generate_security_section(security_issues):
     return f"""### Critical Issues
@@ -267,11 +143,40 @@ def generate_efficiency_section(efficiency_analysis):
 - 📋 Total Steps: {efficiency_analysis["metrics"]["total_steps"]}
 - 🔀 Matrix Builds: {'✅ Yes' if efficiency_analysis["metrics"]["matrix_builds"] else '❌ No'}
 - 💾 Caching: {'✅ Implemented' if efficiency_analysis["metrics"]["caching_used"] else '❌ Not implemented'}
-
+{generate_runtime_section(efficiency_analysis)}
 ### Optimization Opportunities
 {chr(10).join(f"- {sugg}" for sugg in efficiency_analysis["optimization_suggestions"]) or "✅ No optimization needed"}"""
 
+def generate_runtime_section(efficiency_analysis):
+    runtime = efficiency_analysis.get("runtime")
+    if not runtime:
+        return ""
+    path = " → ".join(runtime["critical_path"]) or "n/a"
+    lines = [
+        "",
+        "### Job Graph",
+        f"- 🛤️ Critical Path: {path} ({runtime['critical_path_minutes']} min)",
+        f"- 🧮 Runner Minutes: {runtime['runner_minutes']} across {runtime['job_instances']} job instances",
+        f"- 🔀 Max Parallelism: {runtime['max_parallel_jobs']} jobs / {runtime['max_parallel_instances']} runners",
+    ]
+    if runtime["cycles"]:
+        lines.append(f"- 🔁 Dependency Cycle: {', '.join(runtime['cycles'])}")
+    if runtime["unreachable_jobs"]:
+        lines.append(f"- 🚫 Unreachable Jobs: {', '.join(runtime['unreachable_jobs'])}")
+    for job_id, matrix in runtime.get("matrices", {}).items():
+        lines.append(f"- 🔀 Matrix `{job_id}`: {matrix['instances']} instances"
+                     f"{' (plus values only known at run time)' if matrix['dynamic'] else ''}")
+        for axis, minutes in matrix["axis_minutes"].items():
+            shown = sorted(minutes.items(), key=lambda item: -item[1])
+            values = ", ".join(f"{label} {value} min" for label, value in shown[:6])
+            more = f", … {len(shown) - 6} more" if len(shown) > 6 else ""
+            lines.append(f"  - {axis}: {values}{more}")
+    return "\n".join(lines) + "\n"
+
 def calculate_runtime(efficiency_analysis, build_analysis):
+    runtime = efficiency_analysis.get("runtime")
+    if runtime:
+        return runtime["critical_path_minutes"]
     base_time = efficiency_analysis["metrics"]["total_steps"] * 0.5
     if build_analysis["test_coverage"]: base_time += 2
     if build_analysis["linting"]: base_time += 1
@@ -293,7 +198,7 @@ def calculate_efficiency_score(efficiency_analysis, build_analysis):
     if build_analysis["test_coverage"]: score += 10
     return min(score, 100)
 
-def generate_recommendations(build_analysis, efficiency_analysis):
+def recommendation_list(build_analysis, efficiency_analysis):
     recommendations = []
     
     if not build_analysis["linting"]:
@@ -304,7 +209,10 @@ def generate_recommendations(build_analysis, efficiency_analysis):
         recommendations.append("🏷️ Add type checking for better code reliability")
     if not efficiency_analysis["metrics"]["caching_used"]:
         recommendations.append("💾 Implement dependency caching to reduce build times")
-        
+    return recommendations
+
+def generate_recommendations(build_analysis, efficiency_analysis):
+    recommendations = recommendation_list(build_analysis, efficiency_analysis)
     return chr(10).join(f"- {rec}" for rec in recommendations) or "✅ All recommended practices are implemented"
 
 def generate_ci_best_practices(build_analysis, efficiency_analysis):
@@ -317,56 +225,379 @@ def generate_ci_best_practices(build_analysis, efficiency_analysis):
     ]
     return chr(10).join(f"- {practice}" for practice in practices)
 
-def main():
-    parser = argparse.ArgumentParser(description="GitHub Actions AI")
-    parser.add_argument("--query", required=True, help="Workflow requirements description")
-    args = parser.parse_args()
+def add_report_arguments(parser):
+    parser.add_argument("--report-format", action="append", choices=["markdown", "json", "sarif", "junit"],
+                        help="Report format to write; repeat for several (default: markdown)")
+    parser.add_argument("--report-yaml", choices=["full", "truncate", "omit"], default="full",
+                        help="How much of the workflow YAML to embed in reports")
+    parser.add_argument("--report-yaml-lines", type=int, default=200,
+                        help="Maximum embedded YAML lines with --report-yaml truncate")
+
+def report_options_from_args(args):
+    return {
+        "formats": args.report_format or ["markdown"],
+        "yaml_mode": args.report_yaml,
+        "yaml_max_lines": args.report_yaml_lines,
+    }
+
+def repair_options_from_args(args):
+    return {"max_attempts": args.repair_attempts, "max_tokens": args.repair_tokens}
+
+def write_analysis_reports(yaml_dict, analysis, base_path, query, workflow_path=None, report_options=None):
+    from report_writers import Report, write_reports
+
+    report = Report(yaml_dict, analysis["security"], analysis["efficiency"], analysis["quality"], query, workflow_path)
+    return write_reports(report, base_path, **(report_options or {}))
+
+def process_workflow(yaml_content, query, report_options=None, optimize=False, repair_options=None, llm=None,
+                     repo_root=None, deadline=None):
+    """Validates, repairs and analyzes a generated workflow, then writes it with its reports.
+
+    Returns the written paths, or None when the workflow is invalid. With a
+    ``deadline`` (a ``time.monotonic()`` value), repair stops at it and nothing
+    is written once it has passed.
+    """
+    from repair import repair_workflow, schema_error
+    from workflow_schema import WorkflowSchema
 
-    llm = create_azure_llm()
-    prompt = generate_yaml_prompt(args.query)
-    
-    chain = prompt | llm
-    response = chain.invoke({"query": args.query})
-    yaml_content = extract_yaml_content(response)
     print("Generated YAML content:")
     print(yaml_content)
 
     print("\nValidating YAML content...")
     try:
-        yaml_dict = yaml.safe_load(yaml_content)
-        yaml_dict = fix_yaml_structure(yaml_dict)
-        print("\nFixed YAML structure:")
-        print(yaml_dict)
-        
-        workflow = WorkflowSchema.model_validate(yaml_dict)
-        print("\nYAML content validated successfully.")
-        print(f"Workflow name: {workflow.name}")
-        print(f"Triggers: {list(workflow.on.keys())}")
-        print(f"Jobs: {list(workflow.jobs.keys())}")
+        with tracer.span("yaml_parse", chars=len(yaml_content)):
+            yaml_dict = load_yaml(yaml_content)
     except yaml.YAMLError as e:
         print(f"Invalid YAML format: {e}")
-        return
-    except Exception as e:
-        print(f"Validation error: {e}")
-        print("\nDebug information:")
-        print(f"YAML content type: {type(yaml_dict)}")
-        print(f"YAML content structure: {yaml_dict}")
-        return
+        return None
+    print("\nFixed YAML structure:")
+    print(yaml_dict)
+
+    repaired = None
+    with tracer.span("schema_validation"):
+        error = schema_error(yaml_dict)
+    if error is not None:
+        from optimizer import dump
+
+        print(f"Validation error: {error}")
+        with tracer.span("repair") as span:
+            repair = repair_workflow(yaml_dict, llm, llm_factory=create_llm, deadline=deadline,
+                                     **(repair_options or {}))
+            span.set(llm_attempts=repair.attempts, tokens=repair.tokens)
+        print(repair.summary())
+        for fix in repair.fixes:
+            print(f"  - {fix}")
+        if not repair.valid:
+            print(f"Validation error: {repair.error}")
+            print("\nDebug information:")
+            print(f"YAML content type: {type(yaml_dict)}")
+            print(f"YAML content structure: {yaml_dict}")
+            return None
+        yaml_content = dump(repair.workflow)
+        yaml_dict = with_source(repair.workflow, yaml_content)
+        repaired = dict(repair.stats(), yaml=yaml_content)
+    workflow = WorkflowSchema.model_validate(yaml_dict)
+    print("\nYAML content validated successfully.")
+    print(f"Workflow name: {workflow.name}")
+    print(f"Triggers: {list(workflow.on.keys())}")
+    print(f"Jobs: {list(workflow.jobs.keys())}")
+
+    optimization = None
+    if optimize:
+        from optimizer import optimize_workflow, print_optimization
+
+        with tracer.span("optimize"):
+            optimization = optimize_workflow(yaml_dict, lockfile_root=repo_root or find_repo_root(os.getcwd()))
+        print_optimization(optimization, generate_workflow_filename(query))
+        if optimization.changes:
+            yaml_content = optimization.yaml()
+            yaml_dict = with_source(optimization.workflow, yaml_content)
 
     print("\nPerforming security checks...")
-    security_issues = check_security_compliance(yaml_dict)
-    efficiency_analysis = analyze_pipeline_efficiency(yaml_dict)
-    
-    report_name = f"workflow-analysis-{datetime.now().strftime('%Y%m%d-%H%M%S')}.md"
-    report_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
+    with tracer.span("analyze"):
+        analysis = analyze_workflow(yaml_dict)
+
+    if deadline is not None and time.monotonic() >= deadline:
+        print("Out of time, not writing the workflow")
+        return None
+    with tracer.span("create_local_workflow_file"):
+        local_file_path = create_local_workflow_file(yaml_content, query)
+
+    report_name = f"workflow-analysis-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    report_dir = output_dir("reports")
     os.makedirs(report_dir, exist_ok=True)
-    report_path = os.path.join(report_dir, report_name)
+    report_base = os.path.join(report_dir, report_name)
     
-    report_file = generate_report(yaml_dict, security_issues, efficiency_analysis, report_path, args.query)
-    print(f"\nAnalysis report generated at: {report_file}")
+    with tracer.span("generate_report"):
+        report_files = write_analysis_reports(yaml_dict, analysis, report_base, query, local_file_path, report_options)
+    for report_file in report_files:
+        print(f"\nAnalysis report generated at: {report_file}")
+    outputs = {"report": report_files[0], "reports": report_files, "workflow": local_file_path}
+    if optimization is not None and optimization.changes:
+        outputs["diff"] = report_base + ".optimize.diff"
+        with open(outputs["diff"], "w", encoding="utf-8") as f:
+            f.write(optimization.diff(os.path.basename(local_file_path)))
+        print(f"Optimization diff written to {outputs['diff']}")
+
+    if repaired is not None:
+        outputs["repair"] = repaired
 
-    local_file_path = create_local_workflow_file(yaml_content, args.query)
     print(f"\nWorkflow created successfully at {local_file_path}")
+    return outputs
+
+def find_workflow_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith((".yml", ".yaml")):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+def parse_workflow(content, cache=document_cache):
+    """Parses a workflow; bulk callers that read each file once pass ``cache=None``."""
+    yaml_dict = load_yaml(content, cache=cache)
+    if not isinstance(yaml_dict, dict) or not isinstance(yaml_dict.get('jobs'), dict):
+        raise ValueError("Not a workflow: expected a mapping with a 'jobs' section")
+    return yaml_dict
+
+def load_workflow_file(path):
+    with open(path, "rb") as f:
+        return parse_workflow(f.read())
+
+def analyze_workflow_file(path, report_dir=None, report_options=None):
+    yaml_dict = load_workflow_file(path)
+    analysis = analyze_workflow(yaml_dict)
+    report_paths = []
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        report_base = os.path.join(report_dir, f"workflow-analysis-{stem}")
+        report_paths = write_analysis_reports(yaml_dict, analysis, report_base, f"Analysis of {path}", path,
+                                              report_options)
+    return analysis["security"], analysis["efficiency"], report_paths
+
+def analyze_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="github_actions_ai.py analyze",
+        description="Analyze existing workflow files without calling the LLM",
+    )
+    parser.add_argument("paths", nargs="*", default=[os.path.join(".github", "workflows")],
+                        help="Workflow files or directories (default: .github/workflows)")
+    parser.add_argument("--report-dir", default=output_dir("reports"),
+                        help="Directory analysis reports are written to")
+    parser.add_argument("--no-report", action="store_true", help="Only print findings, do not write reports")
+    parser.add_argument("--fail-on", choices=["critical", "warning", "never"], default="critical",
+                        help="Exit non-zero when findings of this severity or worse are present")
+    parser.add_argument("--durations",
+                        help="JSON step-duration table or JSONL of historical CI step timings for runtime estimates")
+    parser.add_argument("--optimize", action="store_true",
+                        help="Print the diff of an optimized version of each workflow and its estimated speedup")
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.durations:
+        from runtime_estimator import use_durations
+        use_durations(args.durations)
+
+    failing = {"critical": ("critical",), "warning": ("critical", "warning"), "never": ()}[args.fail_on]
+    exit_code = 0
+    for path in find_workflow_files(args.paths):
+        try:
+            security_issues, _, report_paths = analyze_workflow_file(
+                path, None if args.no_report else args.report_dir, report_options_from_args(args))
+        except (OSError, yaml.YAMLError, ValueError) as e:
+            print(f"❌ {path}: {e}")
+            exit_code = 1
+            continue
+        except Exception as e:
+            # One file the rules cannot handle must not stop the others from being checked.
+            print(f"❌ {path}: analysis failed: {type(e).__name__}: {e}")
+            exit_code = 1
+            continue
+        counts = {level: len(security_issues[level]) for level in ("critical", "warning", "info")}
+        print(f"{path}: {counts['critical']} critical, {counts['warning']} warnings, {counts['info']} info")
+        for level in failing:
+            for issue in security_issues[level]:
+                print(f"  {issue}")
+        if any(counts[level] for level in failing):
+            exit_code = 1
+        for report_path in report_paths:
+            print(f"  Report: {report_path}")
+        if args.optimize:
+            from optimizer import optimize_file, print_optimization
+            print_optimization(optimize_file(path), os.path.basename(path))
+    return exit_code
+
+def scan_main(argv):
+    from scanner import main as scanner_main
+
+    return scanner_main(argv)
+
+def serve_main(argv):
+    from server import main as server_main
+
+    return server_main(argv)
+
+def watch_main(argv):
+    from watch import main as watch_main
+
+    return watch_main(argv)
+
+def deploy_main(argv):
+    from deploy import main as deploy_main
+
+    return deploy_main(argv)
+
+def store_main(argv):
+    from workflow_store import main as store_main
+
+    return store_main(argv)
+
+COMMANDS = {
+    "analyze": analyze_main,
+    "deploy": deploy_main,
+    "scan": scan_main,
+    "serve": serve_main,
+    "store": store_main,
+    "watch": watch_main,
+}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        sys.exit(COMMANDS[argv[0]](argv[1:]))
+
+    parser = argparse.ArgumentParser(
+        description="GitHub Actions AI",
+        epilog="Subcommands: analyze <paths...> (offline analysis of existing workflows), "
+               "scan <root> (parallel, incremental scan of every workflow under a directory), "
+               "serve (HTTP server with a warm LLM client), "
+               "watch [dir] (re-analyze workflows on every save), "
+               "deploy <paths...> --repo owner/name (commit workflows through the GitHub API), "
+               "store build|query (columnar store for corpus-wide statistics)",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--query", help="Workflow requirements description")
+    source.add_argument("--queries-file", help="Text (one query per line) or JSONL file of queries to generate in batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum concurrent LLM requests in batch mode")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per query on rate limiting (HTTP 429) in batch mode")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-query timeout in seconds in batch mode")
+    parser.add_argument("--results-file", help="JSONL file batch results are streamed to")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk LLM response cache")
+    parser.add_argument("--refresh-cache", action="store_true", help="Ignore cached responses and overwrite them with fresh ones")
+    parser.add_argument("--cache-dir", help="Directory for the LLM response cache")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream the completion, validate it incrementally and abort as soon as it cannot be valid")
+    parser.add_argument("--no-reuse", action="store_true",
+                        help="Always call the LLM instead of reusing workflows of near-duplicate past queries")
+    parser.add_argument("--reuse-threshold", type=float, default=0.8,
+                        help="Minimum query similarity (Jaccard, 0-1) for reusing a stored workflow")
+    parser.add_argument("--reuse-index", help="Path of the query similarity index")
+    parser.add_argument("--durations",
+                        help="JSON step-duration table or JSONL of historical CI step timings for runtime estimates")
+    parser.add_argument("--optimize", action="store_true",
+                        help="Add caching, concurrency, timeouts and job splitting to the workflow before writing it")
+    parser.add_argument("--repo-root",
+                        help="Repository whose lockfiles --optimize keys caches on (default: the one containing the working directory)")
+    parser.add_argument("--backends",
+                        help="JSON config of LLM backends to route, hedge and fail over between (default: GHA_AI_BACKENDS)")
+    parser.add_argument("--repair-attempts", type=int, default=MAX_REPAIR_ATTEMPTS,
+                        help="LLM calls allowed to repair the failing parts of an invalid workflow; 0 applies local "
+                             f"fixes only (default: {MAX_REPAIR_ATTEMPTS})")
+    parser.add_argument("--repair-tokens", type=int, default=MAX_REPAIR_TOKENS,
+                        help=f"Token budget for repairing one workflow (default: {MAX_REPAIR_TOKENS})")
+    add_report_arguments(parser)
+    parser.add_argument("--trace", help="Write per-stage timing spans to this JSON file")
+    parser.add_argument("--metrics", help="Write per-stage timings and token counts in Prometheus text format")
+    parser.add_argument("--profile", help="Run under cProfile and dump the stats to this file")
+    args = parser.parse_args(argv)
+    if args.durations:
+        from runtime_estimator import use_durations
+        use_durations(args.durations)
+    if args.backends:
+        os.environ["GHA_AI_BACKENDS"] = os.path.abspath(args.backends)
+
+    if args.trace or args.metrics:
+        tracer.enable()
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        generate(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"Profile written to {args.profile}")
+        if args.trace:
+            print(f"Trace written to {tracer.write_json(args.trace)}")
+        if args.metrics:
+            print(f"Metrics written to {tracer.write_prometheus(args.metrics)}")
+
+def generate(args):
+    from llm_cache import ResponseCache
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+
+    if args.queries_file:
+        from batch import run_batch
+        from similarity_index import open_index
+        run_batch(
+            args.queries_file,
+            concurrency=args.concurrency,
+            max_retries=args.max_retries,
+            timeout=args.timeout,
+            results_path=args.results_file,
+            cache=cache,
+            refresh=args.refresh_cache,
+            report_options=report_options_from_args(args),
+            similarity=None if args.no_reuse else open_index(args.reuse_index),
+            reuse_threshold=args.reuse_threshold,
+            optimize=args.optimize,
+            repo_root=args.repo_root,
+            repair_options=repair_options_from_args(args),
+        )
+        return
+
+    from similarity_index import find_reusable, open_index, remember
+
+    index = None if args.no_reuse else open_index(args.reuse_index)
+    match = None if args.refresh_cache else find_reusable(index, args.query, args.reuse_threshold)
+    if match is not None:
+        yaml_content = match[1]["yaml"]
+    else:
+        yaml_content = generate_with_llm(args, cache)
+        if yaml_content is None:
+            return
+    outputs = process_workflow(yaml_content, args.query, report_options_from_args(args), args.optimize,
+                               repair_options_from_args(args), repo_root=args.repo_root)
+    if outputs is not None and match is None:
+        remember(index, args.query, outputs["repair"]["yaml"] if "repair" in outputs else yaml_content)
+    if cache is not None:
+        print(cache.summary())
+
+def generate_with_llm(args, cache):
+    from llm_cache import invoke_cached
+    from instrumentation import token_usage
+
+    llm = create_llm()
+    prompt = generate_yaml_prompt(args.query)
+    
+    chain = prompt | llm
+    if args.stream:
+        from streaming import StreamAbort, stream_cached
+        print("Streaming workflow...")
+        try:
+            with tracer.span("llm", stream=True):
+                return stream_cached(chain, llm, prompt, args.query, cache, refresh=args.refresh_cache)
+        except StreamAbort:
+            return None
+    with tracer.span("llm") as span:
+        response = invoke_cached(chain, llm, prompt, args.query, cache, refresh=args.refresh_cache)
+        span.set(**token_usage(response))
+    with tracer.span("extract_yaml_content"):
+        return extract_yaml_content(response)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
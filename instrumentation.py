@@ -0,0 +1,150 @@
+import json
+import time
+from datetime import datetime
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "start", "duration")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+        self.duration = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.spans.append(self)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Tracer:
+    """Collects timing spans for pipeline stages.
+
+    While disabled, ``span()`` returns a shared no-op context manager, so the
+    instrumentation left in place costs one attribute check per stage.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self.origin = time.perf_counter()
+        self.started = datetime.now()
+
+    def enable(self):
+        self.enabled = True
+        self.spans = []
+        self.origin = time.perf_counter()
+        self.started = datetime.now()
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def record(self, name, duration, **attrs):
+        """Adds a span whose duration was measured elsewhere."""
+        if not self.enabled:
+            return
+        span = Span(self, name, attrs)
+        span.start = time.perf_counter() - duration
+        span.duration = duration
+        self.spans.append(span)
+
+    def totals(self):
+        totals = {}
+        for span in self.spans:
+            entry = totals.setdefault(span.name, {"count": 0, "seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += span.duration
+        return totals
+
+    def token_totals(self):
+        tokens = {"prompt": 0, "completion": 0}
+        for span in self.spans:
+            tokens["prompt"] += span.attrs.get("prompt_tokens", 0)
+            tokens["completion"] += span.attrs.get("completion_tokens", 0)
+        return tokens
+
+    def to_dict(self):
+        return {
+            "started": self.started.isoformat(timespec="seconds"),
+            "spans": [
+                {
+                    "name": span.name,
+                    "start_ms": round((span.start - self.origin) * 1000, 3),
+                    "duration_ms": round(span.duration * 1000, 3),
+                    **span.attrs,
+                }
+                for span in sorted(self.spans, key=lambda s: s.start)
+            ],
+            "totals": {name: {"count": t["count"], "total_ms": round(t["seconds"] * 1000, 3)}
+                       for name, t in self.totals().items()},
+            "tokens": self.token_totals(),
+        }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP gha_ai_stage_duration_seconds Time spent in each pipeline stage.",
+            "# TYPE gha_ai_stage_duration_seconds summary",
+        ]
+        for name, total in sorted(self.totals().items()):
+            lines.append(f'gha_ai_stage_duration_seconds_sum{{stage="{name}"}} {total["seconds"]:.6f}')
+            lines.append(f'gha_ai_stage_duration_seconds_count{{stage="{name}"}} {total["count"]}')
+        lines.append("# HELP gha_ai_llm_tokens_total Tokens used by LLM calls.")
+        lines.append("# TYPE gha_ai_llm_tokens_total counter")
+        for kind, count in self.token_totals().items():
+            lines.append(f'gha_ai_llm_tokens_total{{kind="{kind}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        return path
+
+
+def token_usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return {"prompt_tokens": usage.get("input_tokens", 0), "completion_tokens": usage.get("output_tokens", 0)}
+    usage = (getattr(response, "response_metadata", None) or {}).get("token_usage")
+    if usage:
+        return {"prompt_tokens": usage.get("prompt_tokens", 0), "completion_tokens": usage.get("completion_tokens", 0)}
+    return {}
+
+
+tracer = Tracer()
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+EVICTION_INTERVAL = 64
+EVICTION_PERIOD_SECONDS = 3600
+EVICTION_MARKER = ".last-eviction"
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of LLM completions.
+
+    Entries are JSON files sharded by key prefix. Writes go through a temp file
+    and ``os.replace`` so several processes can share one cache directory.
+    The file mtime is the creation time the TTL is measured from; recency for
+    size eviction is tracked with the atime, which is bumped on every hit.
+    Eviction walks the directory, so it only runs from ``put``: every
+    ``EVICTION_INTERVAL`` writes, or on a process's first write when the last
+    eviction is more than ``EVICTION_PERIOD_SECONDS`` old.
+    """
+
+    def __init__(self, cache_dir=None, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.getenv("GHA_AI_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._marker_checked = False
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(model, template, query):
+        payload = json.dumps([model, template, query], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def key_for(self, llm, prompt, query):
+        model = getattr(llm, "model_name", None) or type(llm).__name__
+        template = getattr(prompt, "template", None) or str(prompt)
+        return self.key(model, template, query)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        if self.ttl_seconds and time.time() - entry.get("created", 0) > self.ttl_seconds:
+            self._remove(path)
+            self.stats["misses"] += 1
+            return None
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        return entry["content"]
+
+    def put(self, key, content, model=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"created": time.time(), "model": model, "content": content}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self.stats["writes"] += 1
+        if self._eviction_due():
+            self.evict()
+
+    def put_workflow(self, key, content, model=None):
+        """Stores a completion only when the workflow in it validates without repair.
+
+        An invalid or prose answer is not cached, so it is not replayed (and
+        repaired again) for the whole TTL. Returns whether it was stored.
+        """
+        if not is_valid_completion(content):
+            return False
+        self.put(key, content, model)
+        return True
+
+    def _eviction_due(self):
+        if self.stats["writes"] % EVICTION_INTERVAL == 0:
+            return True
+        if self._marker_checked:
+            return False
+        self._marker_checked = True
+        try:
+            return time.time() - os.stat(os.path.join(self.cache_dir, EVICTION_MARKER)).st_mtime > EVICTION_PERIOD_SECONDS
+        except OSError:
+            return True
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def evict(self):
+        now = time.time()
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name == EVICTION_MARKER:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if name.endswith(".tmp"):
+                    if now - st.st_mtime > 3600:
+                        self._remove(path)
+                    continue
+                if self.ttl_seconds and now - st.st_mtime > self.ttl_seconds:
+                    if self._remove(path):
+                        self.stats["evictions"] += 1
+                    continue
+                entries.append((st.st_atime, st.st_size, path))
+                total += st.st_size
+        if self.max_bytes and total > self.max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if self._remove(path):
+                    self.stats["evictions"] += 1
+                total -= size
+        with open(os.path.join(self.cache_dir, EVICTION_MARKER), "w", encoding="utf-8"):
+            pass
+
+    def summary(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        rate = (self.stats["hits"] / lookups * 100) if lookups else 0
+        return (f"Cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+                f"({rate:.0f}% hit rate), {self.stats['writes']} writes, {self.stats['evictions']} evictions")
+
+
+def is_valid_completion(content):
+    """Whether the YAML in an LLM completion passes ``WorkflowSchema`` as it is."""
+    import yaml
+    from github_actions_ai import extract_yaml_content
+    from langchain_core.messages import AIMessage
+    from repair import schema_error
+    from yaml_io import load_yaml
+
+    try:
+        workflow = load_yaml(extract_yaml_content(AIMessage(content=content)))
+    except yaml.YAMLError:
+        return False
+    return schema_error(workflow) is None
+
+
+def invoke_cached(chain, llm, prompt, query, cache=None, refresh=False):
+    from langchain_core.messages import AIMessage
+
+    if cache is None:
+        return chain.invoke({"query": query})
+    key = cache.key_for(llm, prompt, query)
+    if not refresh:
+        content = cache.get(key)
+        if content is not None:
+            return AIMessage(content=content)
+    response = chain.invoke({"query": query})
+    cache.put_workflow(key, response.content, getattr(llm, "model_name", None))
+    return response
@@ -0,0 +1,412 @@
+import asyncio
+import collections
+import json
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict, PrivateAttr
+
+LATENCY_WINDOW = 256
+LOCAL_BASE_URL = "http://localhost:11434/v1"
+ROUTER_OPTIONS = ("hedge_percentile", "min_hedge_delay", "max_hedge_delay", "min_samples", "max_attempts",
+                  "hedge_budget")
+BREAKER_OPTIONS = ("failure_threshold", "reset_timeout")
+
+
+class RouterError(RuntimeError):
+    pass
+
+
+def all_failed(errors):
+    """The error for a request that no backend answered; rate limiting is raised as is so callers back off."""
+    if errors and all(getattr(error, "status_code", None) == 429 for _, error in errors):
+        return errors[-1][1]
+    details = "; ".join(f"{name}: {error}" for name, error in errors)
+    return RouterError("All LLM backends failed: " + (details or "every circuit breaker is open"))
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies for one backend."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q, min_samples=1):
+        with self._lock:
+            if len(self.samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures.
+
+    Once ``reset_timeout`` seconds have passed a single probe request is let
+    through (half-open); its outcome closes the breaker or opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def available(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            return self.state == self.CLOSED or not self.probing
+
+    def acquire(self):
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state, self.probing = self.HALF_OPEN, False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.state, self.failures, self.probing = self.CLOSED, 0, False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state, self.opened_at = self.OPEN, time.monotonic()
+
+    def release(self):
+        """A cancelled request says nothing about the backend's health."""
+        with self._lock:
+            self.probing = False
+
+
+class Backend:
+    def __init__(self, name, llm, weight=1.0, breaker=None, window=LATENCY_WINDOW):
+        self.name = name
+        self.llm = llm
+        self.weight = weight
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker(window)
+        self.stats = collections.Counter()
+        self._lock = threading.Lock()
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def succeeded(self, seconds):
+        self.latency.record(seconds)
+        self.breaker.success()
+        self.count("successes")
+
+    def failed(self):
+        self.breaker.failure()
+        self.count("failures")
+
+    def cancelled(self):
+        # Not a latency sample: a hedged loser is cut off near the hedge delay, so recording
+        # it would pull the percentile that sets the next hedge delay down and hedge ever more.
+        self.breaker.release()
+        self.count("cancelled")
+
+
+class LLMRouter(BaseChatModel):
+    """Routes each request to one of several chat models.
+
+    The primary backend is chosen by weight among those whose circuit breaker
+    is closed. If it has not answered by the ``hedge_percentile`` latency it
+    has recently shown, the same request is sent to a second backend and the
+    slower of the two is cancelled; at most ``hedge_budget`` of all requests
+    are hedged. Failed requests fail over to another
+    backend, up to ``max_attempts`` requests in total. Streams fail over
+    before their first chunk but are not hedged.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    backends: List[Any]
+    model_name: str = "router"
+    hedge_percentile: float = 95.0
+    min_hedge_delay: float = 1.0
+    max_hedge_delay: float = 30.0
+    min_samples: int = 20
+    max_attempts: int = 3
+    hedge_budget: float = 0.1
+    seed: Optional[int] = None
+
+    _random: Any = PrivateAttr(default=None)
+    _loop: Any = PrivateAttr(default=None)
+    _loop_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _routed: int = PrivateAttr(default=0)
+    _hedged: int = PrivateAttr(default=0)
+
+    def model_post_init(self, context):
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "router"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name, "backends": [backend.name for backend in self.backends]}
+
+    def select(self, exclude=()):
+        candidates = [backend for backend in self.backends
+                      if backend not in exclude and backend.weight > 0 and backend.breaker.available()]
+        while candidates:
+            backend = self._random.choices(candidates, [backend.weight for backend in candidates])[0]
+            if backend.breaker.acquire():
+                return backend
+            candidates.remove(backend)
+        return None
+
+    def hedge_delay(self, backend):
+        delay = backend.latency.percentile(self.hedge_percentile, self.min_samples)
+        if delay is None:
+            return self.max_hedge_delay
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, delay))
+
+    def _event_loop(self):
+        # Every backend's async client lives on this one loop, so sync and async
+        # callers share the same hedging code and losers can really be cancelled.
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-router", daemon=True).start()
+        return self._loop
+
+    async def _attempt(self, backend, messages, stop, kwargs):
+        backend.count("requests")
+        started = time.perf_counter()
+        try:
+            message = await backend.llm.ainvoke(messages, stop=stop, **kwargs)
+        except asyncio.CancelledError:
+            backend.cancelled()
+            raise
+        except Exception:
+            backend.failed()
+            raise
+        backend.succeeded(time.perf_counter() - started)
+        return message
+
+    async def _route(self, messages, stop, kwargs):
+        loop = asyncio.get_running_loop()
+        pending, tried, errors = {}, [], []
+
+        def launch():
+            backend = self.select(tried)
+            if backend is not None:
+                tried.append(backend)
+                pending[asyncio.ensure_future(self._attempt(backend, messages, stop, kwargs))] = backend
+            return backend
+
+        first = launch()
+        if first is None:
+            raise RouterError("No LLM backend available, every circuit breaker is open")
+        self._routed += 1
+        hedged, hedge = False, None
+        hedge_at = loop.time() + self.hedge_delay(first)
+        try:
+            while pending:
+                timeout = None if hedged else max(0.0, hedge_at - loop.time())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    # Under load every backend slows down at once; cap the hedges so they cannot pile on.
+                    if len(tried) < self.max_attempts and self._hedged < self.hedge_budget * self._routed + 1:
+                        hedge = launch()
+                        if hedge is not None:
+                            self._hedged += 1
+                            hedge.count("hedges")
+                    continue
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is None:
+                        if backend is hedge:
+                            backend.count("hedges_won")
+                        return task.result(), backend
+                    errors.append((backend.name, task.exception()))
+                if len(tried) < self.max_attempts and launch() is not None and not hedged:
+                    hedge_at = loop.time() + self.hedge_delay(tried[-1])
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        raise all_failed(errors)
+
+    def _result(self, message, backend):
+        message.response_metadata = {**message.response_metadata, "backend": backend.name}
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output={"backend": backend.name})
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        future = asyncio.run_coroutine_threadsafe(self._route(messages, stop, kwargs), self._event_loop())
+        try:
+            return self._result(*future.result())
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        future = asyncio.run_coroutine_threadsafe(self._route(messages, stop, kwargs), self._event_loop())
+        return self._result(*await asyncio.wrap_future(future))
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        tried, errors = [], []
+        while len(tried) < self.max_attempts:
+            backend = self.select(tried)
+            if backend is None:
+                break
+            tried.append(backend)
+            backend.count("requests")
+            started = time.perf_counter()
+            streamed = False
+            try:
+                for chunk in backend.llm.stream(messages, stop=stop, **kwargs):
+                    streamed = True
+                    yield ChatGenerationChunk(message=chunk)
+            except GeneratorExit:
+                backend.cancelled()
+                raise
+            except Exception as e:
+                backend.failed()
+                if streamed:
+                    raise
+                errors.append((backend.name, e))
+                continue
+            backend.succeeded(time.perf_counter() - started)
+            return
+        raise all_failed(errors)
+
+    def backend_stats(self):
+        stats = {}
+        for backend in self.backends:
+            stats[backend.name] = {
+                **backend.stats,
+                "state": backend.breaker.state,
+                "p50_seconds": backend.latency.percentile(50),
+                "p95_seconds": backend.latency.percentile(95),
+                "p99_seconds": backend.latency.percentile(99),
+            }
+        return stats
+
+    def prometheus_lines(self):
+        lines = [
+            "# HELP gha_ai_llm_backend_requests_total LLM requests by backend and outcome.",
+            "# TYPE gha_ai_llm_backend_requests_total counter",
+        ]
+        stats = self.backend_stats()
+        for name, backend in stats.items():
+            for outcome in ("requests", "successes", "failures", "cancelled", "hedges", "hedges_won"):
+                lines.append(f'gha_ai_llm_backend_requests_total{{backend="{name}",outcome="{outcome}"}} '
+                             f'{backend.get(outcome, 0)}')
+        lines.append("# HELP gha_ai_llm_backend_latency_seconds Recent LLM latency percentiles by backend.")
+        lines.append("# TYPE gha_ai_llm_backend_latency_seconds gauge")
+        for name, backend in stats.items():
+            for q in ("p50", "p95", "p99"):
+                if backend[f"{q}_seconds"] is not None:
+                    lines.append(f'gha_ai_llm_backend_latency_seconds{{backend="{name}",quantile="{q}"}} '
+                                 f'{backend[f"{q}_seconds"]:.6f}')
+        lines.append("# HELP gha_ai_llm_backend_open Whether the backend's circuit breaker is open.")
+        lines.append("# TYPE gha_ai_llm_backend_open gauge")
+        for name, backend in stats.items():
+            lines.append(f'gha_ai_llm_backend_open{{backend="{name}"}} {int(backend["state"] != CircuitBreaker.CLOSED)}')
+        return lines
+
+    def summary(self):
+        parts = []
+        for name, backend in self.backend_stats().items():
+            part = f"{name} {backend.get('successes', 0)}/{backend.get('requests', 0)} ok"
+            if backend["p95_seconds"] is not None:
+                part += f", p95 {backend['p95_seconds']:.2f}s"
+            if backend.get("hedges"):
+                part += f", {backend.get('hedges_won', 0)}/{backend['hedges']} hedges won"
+            if backend["state"] != CircuitBreaker.CLOSED:
+                part += f", circuit {backend['state'].replace('_', '-')}"
+            parts.append(part)
+        return "LLM backends: " + " | ".join(parts)
+
+
+def create_backend_llm(config):
+    """Builds the LangChain chat model for one backend entry of the router config."""
+    import httpx
+
+    kind = config.get("type", "openai")
+    timeout = config.get("timeout", 120.0)
+    # langchain_openai shares cached httpx clients between models; the router's
+    # event loop needs async clients (and connection pools) of its own.
+    options = {"timeout": timeout, "max_retries": 0, "http_async_client": httpx.AsyncClient(timeout=timeout)}
+    api_key = os.getenv(config["api_key_env"]) if config.get("api_key_env") else config.get("api_key")
+    if kind == "azure":
+        from langchain_openai import AzureChatOpenAI
+
+        return AzureChatOpenAI(
+            azure_endpoint=config.get("endpoint") or os.getenv("AZURE_OPENAI_ENDPOINT"),
+            azure_deployment=config.get("deployment", "gpt-4o"),
+            api_version=config.get("api_version", "2024-10-21"),
+            api_key=api_key or os.getenv("AZURE_OPENAI_KEY"),
+            **options,
+        )
+    if kind not in ("openai", "local"):
+        raise ValueError(f"Unknown LLM backend type '{kind}' (expected azure, openai or local)")
+    from langchain_openai import ChatOpenAI
+
+    if kind == "local":
+        # Ollama, vLLM and llama.cpp all serve the OpenAI chat completions API.
+        options["base_url"] = config.get("base_url", LOCAL_BASE_URL)
+        api_key = api_key or "local"
+    elif config.get("base_url"):
+        options["base_url"] = config["base_url"]
+    if api_key:
+        options["api_key"] = api_key
+    return ChatOpenAI(model=config.get("model", "gpt-4o"), **options)
+
+
+def load_router(path):
+    """Creates an ``LLMRouter`` from a JSON file holding a list of backends or
+    an object with a ``backends`` list and router options."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    if isinstance(config, list):
+        config = {"backends": config}
+    if not config.get("backends"):
+        raise ValueError(f"{path} does not configure any LLM backends")
+    backends = []
+    for i, entry in enumerate(config["backends"]):
+        options = {key: config[key] for key in BREAKER_OPTIONS if key in config}
+        options.update((key, entry[key]) for key in BREAKER_OPTIONS if key in entry)
+        breaker = CircuitBreaker(**options)
+        name = entry.get("name") or f"{entry.get('type', 'openai')}-{i}"
+        backends.append(Backend(name, create_backend_llm(entry), entry.get("weight", 1.0), breaker))
+    return LLMRouter(
+        backends=backends,
+        model_name=config.get("model_name") or "router:" + "+".join(backend.name for backend in backends),
+        **{key: config[key] for key in ROUTER_OPTIONS if key in config},
+    )
@@ -0,0 +1,131 @@
+import itertools
+import json
+import math
+
+
+def value_label(value):
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class Matrix:
+    """A job's ``strategy.matrix`` with GitHub's include/exclude semantics.
+
+    Excludes remove base combinations that match every key they name. Each
+    include is then merged into every remaining combination whose original
+    axis values it does not overwrite; an include that matches none becomes
+    a combination of its own. Counting only enumerates the axes constrained
+    by excludes (and by the include being matched), so the cost does not
+    depend on the size of the full cartesian product, and iteration yields
+    combinations lazily.
+    """
+
+    def __init__(self, matrix):
+        self.dynamic = not isinstance(matrix, dict)
+        matrix = matrix if isinstance(matrix, dict) else {}
+        self.axes = {}
+        for key, values in matrix.items():
+            if key in ('include', 'exclude'):
+                continue
+            if isinstance(values, list):
+                self.axes[key] = values
+            else:
+                # e.g. ${{ fromJSON(needs.setup.outputs.versions) }}, only known at run time
+                self.dynamic = True
+        self.include = self._entries(matrix.get('include'))
+        self.exclude = [e for e in self._entries(matrix.get('exclude')) if e and all(k in self.axes for k in e)]
+        self._excluded_axes = {key for entry in self.exclude for key in entry}
+        self._counts = None
+
+    def _entries(self, entries):
+        if entries is None:
+            return []
+        if not isinstance(entries, list):
+            self.dynamic = True
+            return []
+        return [entry for entry in entries if isinstance(entry, dict)]
+
+    def _excluded(self, combination):
+        return any(all(combination[k] == v for k, v in entry.items()) for entry in self.exclude)
+
+    def _survivors(self, fixed=None):
+        """Yields (partial combination, weight) for the base combinations that survive the excludes.
+
+        Only axes named by an exclude or fixed by ``fixed`` are enumerated; the
+        weight is the number of full combinations each partial one stands for.
+        """
+        fixed = fixed or {}
+        names = [name for name in self.axes if name in self._excluded_axes or name in fixed]
+        weight = math.prod(len(values) for name, values in self.axes.items() if name not in names)
+        if not self.axes or not weight:
+            return
+        choices = [[v for v in self.axes[name] if name not in fixed or v == fixed[name]] for name in names]
+        for values in itertools.product(*choices):
+            partial = dict(zip(names, values))
+            if not self._excluded(partial):
+                yield partial, weight
+
+    def _include_matches(self, entry):
+        fixed = {k: v for k, v in entry.items() if k in self.axes}
+        return any(True for _ in self._survivors(fixed))
+
+    def _compute(self):
+        if self._counts is None:
+            axis_counts = {name: {} for name in self.axes}
+            if self.exclude:
+                base = 0
+                for partial, weight in self._survivors():
+                    base += weight
+                    for name, value in partial.items():
+                        label = value_label(value)
+                        axis_counts[name][label] = axis_counts[name].get(label, 0) + weight
+            else:
+                base = math.prod(len(values) for values in self.axes.values()) if self.axes else 0
+            for name, values in self.axes.items():
+                if name in self._excluded_axes or not base:
+                    continue
+                for value in values:
+                    label = value_label(value)
+                    axis_counts[name][label] = axis_counts[name].get(label, 0) + base // len(values)
+            standalone = [entry for entry in self.include if not (base and self._include_matches(entry))]
+            for entry in standalone:
+                for name, value in entry.items():
+                    if name in axis_counts:
+                        label = value_label(value)
+                        axis_counts[name][label] = axis_counts[name].get(label, 0) + 1
+            self._counts = (base + len(standalone), axis_counts)
+        return self._counts
+
+    def count(self):
+        return self._compute()[0]
+
+    __len__ = count
+
+    def axis_counts(self):
+        """Instances per value of each axis, e.g. ``{"os": {"ubuntu-latest": 6, "windows-latest": 3}}``."""
+        return self._compute()[1]
+
+    def __iter__(self):
+        matched = [False] * len(self.include)
+        names = list(self.axes)
+        if names:
+            for values in itertools.product(*(self.axes[name] for name in names)):
+                combination = dict(zip(names, values))
+                if self._excluded(combination):
+                    continue
+                for index, entry in enumerate(self.include):
+                    if all(combination[k] == v for k, v in entry.items() if k in self.axes):
+                        combination.update(entry)
+                        matched[index] = True
+                yield combination
+        for index, entry in enumerate(self.include):
+            if not matched[index]:
+                yield dict(entry)
+
+
+def job_matrix(job):
+    strategy = job.get('strategy') if isinstance(job, dict) else None
+    if not isinstance(strategy, dict) or 'matrix' not in strategy:
+        return None
+    return Matrix(strategy['matrix'])
@@ -0,0 +1,302 @@
+import copy
+import difflib
+import fnmatch
+import math
+import os
+import re
+
+import yaml
+
+from rules import BuildQualityRule
+from runtime_estimator import durations, estimate_runtime, job_uses_cache
+from yaml_io import Dumper
+
+MAX_JOB_STEPS = 10
+MAX_LOCKFILES = 10
+CONCURRENCY = {"group": "${{ github.workflow }}-${{ github.ref }}", "cancel-in-progress": True}
+
+# (name, run markers, lockfile patterns, setup action, setup action cache value, cache paths)
+ECOSYSTEMS = [
+    ("poetry", ("poetry install",), ("poetry.lock",), "actions/setup-python", "poetry", ("~/.cache/pypoetry",)),
+    ("pip", ("pip install", "pip3 install"), ("requirements*.txt", "pyproject.toml"), "actions/setup-python", "pip",
+     ("~/.cache/pip",)),
+    ("pnpm", ("pnpm ",), ("pnpm-lock.yaml",), "actions/setup-node", "pnpm", ("~/.local/share/pnpm/store",)),
+    ("yarn", ("yarn",), ("yarn.lock",), "actions/setup-node", "yarn", ("~/.cache/yarn",)),
+    ("npm", ("npm ci", "npm install"), ("package-lock.json",), "actions/setup-node", "npm", ("~/.npm",)),
+    ("maven", ("mvn",), ("pom.xml",), "actions/setup-java", "maven", ("~/.m2/repository",)),
+    ("gradle", ("gradle",), ("*.gradle*", "gradle-wrapper.properties"), "actions/setup-java", "gradle",
+     ("~/.gradle/caches", "~/.gradle/wrapper")),
+    ("go", ("go build", "go test", "go mod"), ("go.sum",), "actions/setup-go", True, ("~/go/pkg/mod", "~/.cache/go-build")),
+    ("cargo", ("cargo ",), ("Cargo.lock",), None, None, ("~/.cargo/registry", "~/.cargo/git", "target")),
+]
+SPLIT_GROUPS = [
+    ("lint", BuildQualityRule.linters + ("eslint", "prettier", "golangci-lint", "clippy", "fmt")),
+    ("typecheck", BuildQualityRule.type_checkers + ("tsc",)),
+    ("audit", BuildQualityRule.scanners + ("npm audit", "pip-audit", "bandit", "cargo audit")),
+]
+TOP_LEVEL_ORDER = ("name", "run-name", "on", "permissions", "env", "defaults", "concurrency", "jobs")
+
+
+def marker_pattern(markers):
+    """Matches any of ``markers`` as a command, so "go build" does not match inside "cargo build"."""
+    return re.compile(r"(?<![\w./-])(?:%s)" % "|".join(re.escape(marker) for marker in markers))
+
+
+ECOSYSTEM_PATTERNS = {ecosystem[0]: marker_pattern(ecosystem[1]) for ecosystem in ECOSYSTEMS}
+SETUP_PATTERN = marker_pattern(marker for ecosystem in ECOSYSTEMS for marker in ecosystem[1])
+
+
+def find_lockfiles(root, patterns):
+    """Paths relative to ``root`` of files matching ``patterns``, skipping vendored directories."""
+    from scanner import PRUNED_DIRS
+
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in PRUNED_DIRS and not d.startswith("."))
+        for name in sorted(filenames):
+            if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                found.append(os.path.relpath(os.path.join(dirpath, name), root).replace(os.sep, "/"))
+                if len(found) >= MAX_LOCKFILES:
+                    return found
+    return found
+
+
+def uses_of(step):
+    return str(step.get('uses') or '').lower() if isinstance(step, dict) else ''
+
+
+def step_text(step):
+    return f"{step.get('name') or ''}\n{step.get('run') or ''}".lower()
+
+
+def insert_after(mapping, anchor, key, value):
+    """Returns a copy of ``mapping`` with ``key`` placed right after ``anchor`` (or last)."""
+    items = [(k, v) for k, v in mapping.items() if k != key]
+    position = next((i + 1 for i, (k, _) in enumerate(items) if k == anchor), len(items))
+    items.insert(position, (key, value))
+    return dict(items)
+
+
+def add_caching(workflow, lockfile_root=None):
+    changes = []
+    for job_id, job in workflow['jobs'].items():
+        if not isinstance(job, dict) or job_uses_cache(job):
+            continue
+        steps = job.get('steps') or []
+        commands = "\n".join(str(step.get('run') or '').lower() for step in steps if isinstance(step, dict))
+        configured = set()
+        for name, markers, patterns, setup, setup_cache, paths in ECOSYSTEMS:
+            if (setup or name) in configured or not ECOSYSTEM_PATTERNS[name].search(commands):
+                continue
+            lockfiles = find_lockfiles(lockfile_root, patterns) if lockfile_root else []
+            lockfiles = lockfiles or [f"**/{pattern}" for pattern in patterns]
+            setup_step = next((step for step in steps if setup and uses_of(step).startswith(setup + "@")), None)
+            if setup_step is not None:
+                with_ = setup_step.get('with') if isinstance(setup_step.get('with'), dict) else {}
+                with_['cache'] = setup_cache
+                with_['cache-dependency-path'] = "\n".join(lockfiles)
+                setup_step['with'] = with_
+                changes.append(f"💾 {job_id}: enabled {name} caching in {setup} keyed on {', '.join(lockfiles)}")
+            else:
+                hashed = ", ".join(f"'{lockfile}'" for lockfile in lockfiles)
+                cache_step = {
+                    'name': f"Cache {name} dependencies",
+                    'uses': "actions/cache@v4",
+                    'with': {
+                        'path': "\n".join(paths),
+                        'key': f"${{{{ runner.os }}}}-{name}-${{{{ hashFiles({hashed}) }}}}",
+                        'restore-keys': f"${{{{ runner.os }}}}-{name}-",
+                    },
+                }
+                position = next((i + 1 for i, step in enumerate(steps) if uses_of(step).startswith("actions/checkout")), 0)
+                steps.insert(position, cache_step)
+                job['steps'] = steps
+                changes.append(f"💾 {job_id}: added actions/cache for {name} keyed on {', '.join(lockfiles)}")
+            configured.add(setup or name)
+    return changes
+
+
+def is_setup_step(step):
+    uses = uses_of(step)
+    if uses:
+        return uses.startswith(("actions/checkout", "actions/setup-", "actions/cache"))
+    run = str(step.get('run') or '').lower() if isinstance(step, dict) else ''
+    return bool(run) and bool(SETUP_PATTERN.search(run))
+
+
+def split_group(step, job_text):
+    """Name of the parallel job ``step`` can move to, or None if it has to stay."""
+    if not isinstance(step, dict) or step.get('uses') or 'steps.' in str(step.get('if') or ''):
+        return None
+    step_id = step.get('id')
+    if step_id and f"steps.{step_id}." in job_text:
+        return None
+    text = step_text(step)
+    for group, markers in SPLIT_GROUPS:
+        if any(marker in text for marker in markers):
+            return group
+    return None
+
+
+def split_large_jobs(workflow, table):
+    changes = []
+    jobs = workflow['jobs']
+    for job_id, job in list(jobs.items()):
+        steps = job.get('steps') if isinstance(job, dict) else None
+        if not isinstance(steps, list) or len(steps) <= MAX_JOB_STEPS or 'uses' in job:
+            continue
+        prefix_length = 0
+        while prefix_length < len(steps) and is_setup_step(steps[prefix_length]):
+            prefix_length += 1
+        prefix, body = steps[:prefix_length], steps[prefix_length:]
+        job_text = yaml.dump(job, Dumper=Dumper).lower()
+        groups, remaining = {}, []
+        for step in body:
+            group = split_group(step, job_text)
+            if group:
+                groups.setdefault(group, []).append(step)
+            else:
+                remaining.append(step)
+        if not groups:
+            continue
+        if not remaining:
+            remaining = groups.pop(next(iter(groups)))
+            if not groups:
+                continue
+
+        split_jobs = {}
+        for group, group_steps in groups.items():
+            new_id = f"{job_id}-{group}"
+            while new_id in jobs or new_id in split_jobs:
+                new_id += "-split"
+            new_job = {k: copy.deepcopy(v) for k, v in job.items() if k not in ('steps', 'outputs', 'timeout-minutes')}
+            if job.get('name'):
+                new_job['name'] = f"{job['name']} ({group})"
+            new_job['steps'] = copy.deepcopy(prefix) + group_steps
+            split_jobs[new_id] = new_job
+        before = table.job_minutes(job)
+        after = max(table.job_minutes({'steps': prefix + remaining}),
+                    *(table.job_minutes(new_job) for new_job in split_jobs.values()))
+        if after >= before:
+            continue
+
+        job['steps'] = prefix + remaining
+        rebuilt = {}
+        for existing_id, existing in jobs.items():
+            rebuilt[existing_id] = existing
+            if existing_id == job_id:
+                rebuilt.update(split_jobs)
+        for other_id, other in rebuilt.items():
+            if not isinstance(other, dict) or other_id in split_jobs:
+                continue
+            needs = other.get('needs')
+            needs = [needs] if isinstance(needs, str) else needs
+            if isinstance(needs, list) and job_id in needs:
+                other['needs'] = needs + list(split_jobs)
+        workflow['jobs'] = jobs = rebuilt
+        changes.append(f"🔀 {job_id}: moved {', '.join(groups)} steps into parallel jobs {', '.join(split_jobs)}")
+    return changes
+
+
+def timeout_for(minutes):
+    """Three times the estimated runtime, rounded up to 5 minutes, at least 10."""
+    return max(10, int(math.ceil(minutes * 3 / 5) * 5))
+
+
+def add_timeouts(workflow, table):
+    changes = []
+    for job_id, job in list(workflow['jobs'].items()):
+        if not isinstance(job, dict) or 'timeout-minutes' in job or 'uses' in job:
+            continue
+        timeout = timeout_for(table.job_overhead + table.job_minutes(job))
+        workflow['jobs'][job_id] = insert_after(job, 'runs-on', 'timeout-minutes', timeout)
+        changes.append(f"⏱️ {job_id}: added timeout-minutes: {timeout}")
+    return changes
+
+
+def add_concurrency(workflow):
+    if 'concurrency' in workflow:
+        return [], workflow
+    workflow = insert_after(workflow, 'on', 'concurrency', dict(CONCURRENCY))
+    return ["🚦 Added a concurrency group that cancels superseded runs"], workflow
+
+
+class WorkflowDumper(Dumper):
+    pass
+
+
+def _represent_str(dumper, data):
+    return dumper.represent_scalar("tag:yaml.org,2002:str", data, style="|" if "\n" in data else None)
+
+
+WorkflowDumper.add_representer(str, _represent_str)
+
+
+def dump(yaml_dict):
+    """Dumps a workflow with its top-level keys in the usual order and multi-line strings as blocks."""
+    known = [key for key in TOP_LEVEL_ORDER if key in yaml_dict]
+    ordered = {key: yaml_dict[key] for key in known}
+    ordered.update((key, value) for key, value in yaml_dict.items() if key not in ordered)
+    return yaml.dump(ordered, Dumper=WorkflowDumper, default_flow_style=False, sort_keys=False)
+
+
+class Optimization:
+    def __init__(self, original, workflow, changes, before, after):
+        self.original = original
+        self.workflow = workflow
+        self.changes = changes
+        self.before = before
+        self.after = after
+
+    @property
+    def speedup(self):
+        after = self.after["critical_path_minutes"]
+        return self.before["critical_path_minutes"] / after if after else 1.0
+
+    def yaml(self):
+        return dump(self.workflow)
+
+    def diff(self, name="workflow.yml"):
+        return "".join(difflib.unified_diff(
+            dump(self.original).splitlines(keepends=True), self.yaml().splitlines(keepends=True),
+            f"a/{name}", f"b/{name}"))
+
+    def summary(self):
+        before, after = self.before, self.after
+        return (f"Estimated critical path {before['critical_path_minutes']} → {after['critical_path_minutes']} min "
+                f"({self.speedup:.2f}x), runner-minutes {before['runner_minutes']} → {after['runner_minutes']}")
+
+
+def optimize_workflow(yaml_dict, lockfile_root=None, table=None):
+    """Applies caching, job splitting, timeouts and concurrency to a copy of ``yaml_dict``."""
+    table = table or durations()
+    workflow = copy.deepcopy(yaml_dict)
+    changes = []
+    if isinstance(workflow.get('jobs'), dict):
+        changes += add_caching(workflow, lockfile_root)
+        changes += split_large_jobs(workflow, table)
+        changes += add_timeouts(workflow, table)
+    concurrency_changes, workflow = add_concurrency(workflow)
+    changes += concurrency_changes
+    return Optimization(yaml_dict, workflow, changes,
+                        estimate_runtime(yaml_dict.get('jobs') or {}, table=table),
+                        estimate_runtime(workflow.get('jobs') or {}, table=table))
+
+
+def optimize_file(path, table=None):
+    """Optimizes a workflow file, detecting lockfiles in the repository it belongs to."""
+    from github_actions_ai import find_repo_root, load_workflow_file
+
+    root = find_repo_root(path, default=os.path.dirname(os.path.abspath(path)))
+    return optimize_workflow(load_workflow_file(path), lockfile_root=root, table=table)
+
+
+def print_optimization(optimization, name="workflow.yml"):
+    if not optimization.changes:
+        print("\n✅ Optimizer found nothing to change")
+        return
+    print("\nOptimizations applied:")
+    for change in optimization.changes:
+        print(f"- {change}")
+    print(f"\n{optimization.diff(name)}")
+    print(f"🚀 {optimization.summary()}")
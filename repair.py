@@ -0,0 +1,183 @@
+import copy
+import time
+
+from instrumentation import token_usage, tracer
+
+DEFAULT_RUNNER = "ubuntu-latest"
+DEFAULT_TRIGGERS = {"push": {}}
+RUNS_ON_ALIASES = ("runs_on", "runsOn", "runs-On", "runson")
+MAX_ATTEMPTS = 2
+MAX_TOKENS = 4000
+
+REPAIR_PROMPT = """This part of a GitHub Actions workflow failed validation:
+
+{errors}
+
+```yaml
+{fragment}```
+
+Return only the corrected YAML for this part, with the same top-level keys, and no explanation."""
+
+
+class RepairResult:
+    def __init__(self, workflow, valid, error=None, fixes=(), attempts=0, tokens=0):
+        self.workflow = workflow
+        self.valid = valid
+        self.error = error
+        self.fixes = list(fixes)
+        self.attempts = attempts
+        self.tokens = tokens
+
+    def summary(self):
+        status = "Repaired workflow" if self.valid else "Could not repair workflow"
+        return (f"🔧 {status}: {len(self.fixes)} local fixes, {self.attempts} LLM attempts, "
+                f"{self.tokens} tokens")
+
+    def stats(self):
+        return {"fixes": self.fixes, "llm_attempts": self.attempts, "tokens": self.tokens}
+
+
+def schema_error(workflow, where=None):
+    """The validation errors for ``workflow`` on one line, or None when it is valid.
+
+    Only locations and messages are kept; pydantic's own message repeats the
+    offending input, which would put the whole workflow back into the prompt.
+    """
+    from pydantic import ValidationError
+    from workflow_schema import WorkflowSchema
+
+    try:
+        WorkflowSchema.model_validate(workflow)
+    except ValidationError as e:
+        return "; ".join(f"{where or '.'.join(map(str, error['loc'])) or 'workflow'}: {error['msg']}"
+                         for error in e.errors())
+    return None
+
+
+def local_fixes(workflow):
+    """Applies the fixes that need no LLM in place; returns what was changed."""
+    fixes = []
+    triggers = workflow.get("on")
+    if triggers is None:
+        workflow["on"] = copy.deepcopy(DEFAULT_TRIGGERS)
+        fixes.append(f"added default trigger {list(DEFAULT_TRIGGERS)}")
+    elif isinstance(triggers, list) and all(isinstance(event, str) for event in triggers):
+        workflow["on"] = {event: {} for event in triggers}
+        fixes.append("turned the trigger list into a mapping")
+    jobs = workflow.get("jobs")
+    if not isinstance(jobs, dict):
+        return fixes
+    for name, job in jobs.items():
+        if isinstance(job, list):
+            job = jobs[name] = {"steps": job}
+            fixes.append(f"job '{name}': wrapped its step list in a job")
+        if not isinstance(job, dict) or "runs-on" in job:
+            continue
+        alias = next((key for key in RUNS_ON_ALIASES if key in job), None)
+        if alias is not None:
+            runner = job.pop(alias)
+            fixes.append(f"job '{name}': renamed '{alias}' to 'runs-on'")
+        else:
+            runner = DEFAULT_RUNNER
+            fixes.append(f"job '{name}': added runs-on: {DEFAULT_RUNNER}")
+        jobs[name] = {"runs-on": runner, **job}
+    return fixes
+
+
+def failing_fragments(workflow):
+    """The smallest parts of ``workflow`` that fail validation, as (partial workflow, errors).
+
+    Each job and the triggers are validated on their own, so a single broken job
+    is sent to the LLM without the rest of the workflow. An empty partial
+    workflow means the document as a whole is broken.
+    """
+    if not isinstance(workflow, dict) or not isinstance(workflow.get("jobs"), dict):
+        return {}, [schema_error(workflow)]
+    fragment, errors = {}, []
+    error = schema_error({"on": workflow.get("on"), "jobs": {}}, "on")
+    if error is not None:
+        fragment["on"] = workflow.get("on")
+        errors.append(error)
+    for name, job in workflow["jobs"].items():
+        error = schema_error({"on": DEFAULT_TRIGGERS, "jobs": {name: job}}, f"jobs.{name}")
+        if error is not None:
+            fragment.setdefault("jobs", {})[name] = job
+            errors.append(error)
+    if not errors:
+        return {}, [schema_error(workflow)]
+    return fragment, errors
+
+
+def splice(workflow, fragment, fixed):
+    """Puts the corrected parts from ``fixed`` back in place of ``fragment``."""
+    if not fragment:
+        return fixed if isinstance(fixed, dict) else workflow
+    if not isinstance(fixed, dict):
+        return workflow
+    if "on" in fragment and "on" in fixed:
+        workflow["on"] = fixed["on"]
+    fixed_jobs = fixed.get("jobs")
+    if not isinstance(fixed_jobs, dict):
+        # Answers for a single job sometimes drop the enclosing "jobs:" key.
+        fixed_jobs = fixed
+    for name in fragment.get("jobs", {}):
+        if name in fixed_jobs:
+            workflow["jobs"][name] = fixed_jobs[name]
+    return workflow
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def repair_workflow(workflow, llm=None, max_attempts=MAX_ATTEMPTS, max_tokens=MAX_TOKENS, llm_factory=None,
+                    deadline=None):
+    """Makes ``workflow`` pass ``WorkflowSchema`` with as little LLM work as possible.
+
+    Local fixes are applied first. Whatever still fails is sent to the LLM one
+    fragment at a time: only the failing jobs or triggers and their errors,
+    never the whole workflow unless the document itself is broken. Stops after
+    ``max_attempts`` LLM calls or ``max_tokens`` tokens, or before an LLM call
+    once ``time.monotonic()`` has reached ``deadline``. The LLM is created
+    with ``llm_factory`` on first use when ``llm`` is None.
+    """
+    from langchain_core.messages import HumanMessage
+    from github_actions_ai import extract_yaml_content
+    from yaml_io import dump, load_yaml
+
+    workflow = copy.deepcopy(workflow)
+    fixes = local_fixes(workflow) if isinstance(workflow, dict) else []
+    error = schema_error(workflow)
+    attempts = tokens = 0
+    while error is not None and attempts < max_attempts:
+        fragment, errors = failing_fragments(workflow)
+        prompt = REPAIR_PROMPT.format(errors="\n".join(errors), fragment=dump(fragment or workflow))
+        if tokens + estimate_tokens(prompt) > max_tokens:
+            break
+        if llm is None and llm_factory is None:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            error = f"{error}\nRepair stopped: out of time"
+            break
+        attempts += 1
+        try:
+            if llm is None:
+                llm = llm_factory()
+            with tracer.span("repair_llm", attempt=attempts, chars=len(prompt)) as span:
+                response = llm.invoke([HumanMessage(content=prompt)])
+                usage = token_usage(response)
+                span.set(**usage)
+        except Exception as e:
+            error = f"{error}\nRepair request failed: {type(e).__name__}: {e}"
+            break
+        content = extract_yaml_content(response)
+        tokens += sum(usage.values()) or estimate_tokens(prompt) + estimate_tokens(content)
+        try:
+            fixed = load_yaml(content, cache=None)
+        except Exception:
+            continue
+        workflow = splice(workflow, fragment, copy.deepcopy(fixed))
+        if isinstance(workflow, dict):
+            fixes.extend(local_fixes(workflow))
+        error = schema_error(workflow)
+    return RepairResult(workflow, error is None, error, fixes, attempts, tokens)
@@ -0,0 +1,327 @@
+import json
+import os
+from datetime import datetime
+from xml.sax.saxutils import escape, quoteattr
+
+from github_actions_ai import (
+    calculate_efficiency_score,
+    calculate_resource_usage,
+    calculate_runtime,
+    find_repo_root,
+    generate_ci_best_practices,
+    generate_efficiency_section,
+    generate_recommendations,
+    generate_security_section,
+    recommendation_list,
+)
+import yaml_io
+
+YAML_MODES = ("full", "truncate", "omit")
+DEFAULT_YAML_MAX_LINES = 200
+REFERENCES = [
+    ("GitHub Actions Security Hardening", "https://docs.github.com/en/actions/security-guides/security-hardening-for-github-actions"),
+    ("Workflow Optimization Guide", "https://docs.github.com/en/actions/using-workflows/about-workflows"),
+    ("GitHub Actions Best Practices", "https://docs.github.com/en/actions/learn-github-actions/best-practices-for-using-github-actions"),
+]
+SECURITY_RULES = [
+    ("unstable-action-version", "Using unstable version", "Action pinned to a moving branch"),
+    ("outdated-action-version", "Consider updating", "Action pinned to an old major version"),
+    ("curl-without-fail", "Unsafe curl usage", "curl used without --fail"),
+    ("wget-usage", "instead of wget", "wget used instead of curl --fail"),
+    ("sudo-usage", "Sudo usage", "Step runs commands with sudo"),
+    ("filesystem-write", "File system write", "Step writes to the file system"),
+]
+SARIF_LEVELS = {"critical": "error", "warning": "warning", "info": "note"}
+
+
+def repo_relative_uri(path):
+    """``path`` relative to the root of its repository, with forward slashes.
+
+    See ``find_repo_root`` for how the root is found.
+    """
+    path = os.path.abspath(path)
+    return os.path.relpath(path, find_repo_root(path)).replace(os.sep, "/")
+
+
+def workflow_lines(report):
+    """Line numbers of the jobs and steps of the reported workflow, from its source text."""
+    source = getattr(report.yaml_dict, "source", None)
+    if source is None and report.workflow_path:
+        try:
+            with open(report.workflow_path, encoding="utf-8") as f:
+                source = f.read()
+        except OSError:
+            return {}
+    return yaml_io.step_lines(source) if source else {}
+
+
+class TruncatedOutput(Exception):
+    pass
+
+
+class LineLimitedStream:
+    """Forwards writes to ``stream`` and stops the producer after ``max_lines`` lines."""
+
+    def __init__(self, stream, max_lines):
+        self.stream = stream
+        self.remaining = max_lines
+
+    def write(self, data):
+        if self.remaining <= 0:
+            raise TruncatedOutput()
+        newlines = data.count("\n")
+        if newlines >= self.remaining:
+            cut = -1
+            for _ in range(self.remaining):
+                cut = data.index("\n", cut + 1)
+            self.stream.write(data[:cut + 1])
+            self.remaining = 0
+            raise TruncatedOutput()
+        self.stream.write(data)
+        self.remaining -= newlines
+
+
+def dump_yaml(yaml_dict, stream, max_lines=None):
+    """Serializes straight into ``stream``; returns False if output was cut at ``max_lines``.
+
+    A workflow that still has the text it was parsed from is written as that
+    text instead of being dumped again.
+    """
+    target = stream if max_lines is None else LineLimitedStream(stream, max_lines)
+    source = getattr(yaml_dict, "source", None)
+    try:
+        if source is not None:
+            target.write(source if source.endswith("\n") else source + "\n")
+        else:
+            yaml_io.dump(yaml_dict, target)
+    except TruncatedOutput:
+        return False
+    return True
+
+
+class Report:
+    """Everything the writers need, computed once and shared between formats."""
+
+    def __init__(self, yaml_dict, security_issues, efficiency_analysis, build_analysis, query, workflow_path=None):
+        self.yaml_dict = yaml_dict
+        self.security = security_issues
+        self.efficiency = efficiency_analysis
+        self.quality = build_analysis
+        self.query = query
+        self.workflow_path = workflow_path
+        self.generated = datetime.now()
+
+
+class ReportWriter:
+    extension = ""
+
+    def __init__(self, yaml_mode="full", yaml_max_lines=DEFAULT_YAML_MAX_LINES):
+        if yaml_mode not in YAML_MODES:
+            raise ValueError(f"yaml_mode must be one of {YAML_MODES}")
+        self.yaml_mode = yaml_mode
+        self.yaml_max_lines = yaml_max_lines
+
+    def write(self, report, path):
+        with open(path, "w", encoding="utf-8") as f:
+            self.write_to(report, f)
+        return path
+
+    def write_to(self, report, f):
+        raise NotImplementedError
+
+
+class MarkdownReportWriter(ReportWriter):
+    extension = ".md"
+    sections = ("header", "build_quality", "security", "efficiency", "implementation", "performance",
+                "best_practices", "references")
+
+    def write_to(self, report, f):
+        for name in self.sections:
+            getattr(self, name)(report, f)
+
+    def header(self, report, f):
+        f.write(f"# 🚀 Workflow Analysis Report\nGenerated on: {report.generated.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+        f.write(f"## 📝 Query\n```\n{report.query}\n```\n\n")
+
+    def build_quality(self, report, f):
+        quality = report.quality
+        rate = quality["estimated_success_rate"]
+        gates = "\n".join(f"- ✅ {gate}" for gate in quality["quality_gates"]) or "❌ No quality gates configured"
+        f.write(f"""## 🏗️ Build Quality Analysis
+
+### Quality Gates
+{gates}
+
+### Code Quality Metrics
+- 🔍 Linting: {'✅ Enabled' if quality["linting"] else '❌ Not configured'}
+- 🏷️ Type Checking: {'✅ Enabled' if quality["type_checking"] else '❌ Not configured'}
+- 📊 Test Coverage: {'✅ Enabled' if quality["test_coverage"] else '❌ Not configured'}
+- 🔒 Dependency Audit: {'✅ Enabled' if quality["dependency_audit"] else '❌ Not configured'}
+
+### Build Success Estimation
+- 📈 Estimated Success Rate: {rate}%
+- 🎯 Quality Score: {'🟢 High' if rate >= 90 else '🟡 Medium' if rate >= 75 else '🔴 Low'}
+
+""")
+
+    def security(self, report, f):
+        f.write(f"## 🔒 Security Analysis\n{generate_security_section(report.security)}\n\n")
+
+    def efficiency(self, report, f):
+        f.write(f"## ⚡ Pipeline Efficiency\n{generate_efficiency_section(report.efficiency)}\n\n")
+
+    def implementation(self, report, f):
+        f.write("## 📊 Implementation Details\n\n")
+        if self.yaml_mode != "omit":
+            f.write("### Current Implementation\n```yaml\n")
+            max_lines = self.yaml_max_lines if self.yaml_mode == "truncate" else None
+            if not dump_yaml(report.yaml_dict, f, max_lines):
+                f.write(f"# ... truncated after {max_lines} lines\n")
+            f.write("\n```\n\n")
+        f.write(f"### Recommended Improvements\n{generate_recommendations(report.quality, report.efficiency)}\n\n")
+
+    def performance(self, report, f):
+        f.write(f"""## 📈 Performance Metrics
+- 🕒 Estimated Total Runtime: {calculate_runtime(report.efficiency, report.quality)} minutes
+- 🧮 Billed Runner Minutes: {report.efficiency.get("runtime", {}).get("runner_minutes", "n/a")}
+- 💪 Resource Utilization: {calculate_resource_usage(report.efficiency)}
+- ⚡ Pipeline Efficiency Score: {calculate_efficiency_score(report.efficiency, report.quality)}/100
+
+""")
+
+    def best_practices(self, report, f):
+        f.write(f"## 🔄 Continuous Integration Best Practices\n{generate_ci_best_practices(report.quality, report.efficiency)}\n\n")
+
+    def references(self, report, f):
+        f.write("## 📚 References\n")
+        for title, url in REFERENCES:
+            f.write(f"- [{title}]({url})\n")
+
+
+class JsonReportWriter(ReportWriter):
+    extension = ".json"
+
+    def write_to(self, report, f):
+        sections = [
+            ("query", lambda: report.query),
+            ("generated", lambda: report.generated.isoformat(timespec="seconds")),
+            ("workflow_path", lambda: report.workflow_path),
+            ("build_quality", lambda: report.quality),
+            ("security", lambda: report.security),
+            ("efficiency", lambda: report.efficiency),
+            ("recommendations", lambda: recommendation_list(report.quality, report.efficiency)),
+            ("performance", lambda: {
+                "estimated_runtime_minutes": calculate_runtime(report.efficiency, report.quality),
+                "runner_minutes": report.efficiency.get("runtime", {}).get("runner_minutes"),
+                "resource_utilization": calculate_resource_usage(report.efficiency),
+                "efficiency_score": calculate_efficiency_score(report.efficiency, report.quality),
+            }),
+        ]
+        f.write("{")
+        for index, (key, value) in enumerate(sections):
+            f.write(f"{',' if index else ''}\n  {json.dumps(key)}: {json.dumps(value(), ensure_ascii=False, default=str)}")
+        if self.yaml_mode == "full":
+            f.write(',\n  "workflow": ')
+            json.dump(report.yaml_dict, f, ensure_ascii=False, default=str)
+        elif self.yaml_mode == "truncate":
+            stream = _StringCollector()
+            complete = dump_yaml(report.yaml_dict, stream, self.yaml_max_lines)
+            f.write(f',\n  "workflow_yaml": {json.dumps(stream.text(), ensure_ascii=False)}')
+            f.write(f',\n  "workflow_truncated": {json.dumps(not complete)}')
+        f.write("\n}\n")
+
+
+class _StringCollector:
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(data)
+
+    def text(self):
+        return "".join(self.parts)
+
+
+def security_rule_id(message):
+    for rule_id, marker, _ in SECURITY_RULES:
+        if marker in message:
+            return rule_id
+    return "security-finding"
+
+
+class SarifReportWriter(ReportWriter):
+    """SARIF 2.1.0 log of the security findings, for code-scanning upload."""
+
+    extension = ".sarif"
+
+    def write_to(self, report, f):
+        rules = [{"id": rule_id, "shortDescription": {"text": description}} for rule_id, _, description in SECURITY_RULES]
+        rules.append({"id": "security-finding", "shortDescription": {"text": "Workflow security finding"}})
+        f.write('{\n  "$schema": "https://json.schemastore.org/sarif-2.1.0.json",\n  "version": "2.1.0",\n')
+        f.write('  "runs": [{\n    "tool": {"driver": ')
+        json.dump({"name": "github-actions-ai", "rules": rules}, f)
+        f.write('},\n    "results": [')
+        uri = repo_relative_uri(report.workflow_path) if report.workflow_path else None
+        lines = workflow_lines(report) if uri else {}
+        locations = report.security.get("locations", {})
+        first = True
+        for severity, level in SARIF_LEVELS.items():
+            steps = locations.get(severity) or []
+            for i, message in enumerate(report.security[severity]):
+                result = {"ruleId": security_rule_id(message), "level": level, "message": {"text": message}}
+                if uri:
+                    physical = {"artifactLocation": {"uri": uri, "uriBaseId": "%SRCROOT%"}}
+                    job_id, index = steps[i] if i < len(steps) else (None, None)
+                    line = lines.get((job_id, index)) or lines.get(job_id)
+                    if line:
+                        physical["region"] = {"startLine": line}
+                    result["locations"] = [{"physicalLocation": physical}]
+                f.write(("\n      " if first else ",\n      ") + json.dumps(result, ensure_ascii=False))
+                first = False
+        f.write("\n    ]\n  }]\n}\n")
+
+
+class JUnitReportWriter(ReportWriter):
+    """JUnit XML with one test case per quality gate, for CI dashboards."""
+
+    extension = ".junit.xml"
+
+    def write_to(self, report, f):
+        quality = report.quality
+        cases = [
+            ("Linting", quality["linting"], "No linter (flake8, pylint, black, ruff) configured"),
+            ("Type Checking", quality["type_checking"], "No type checker (mypy, pytype, pyre) configured"),
+            ("Test Coverage", quality["test_coverage"], "No coverage reporting configured"),
+            ("Dependency Audit", quality["dependency_audit"], "No dependency audit (dependabot, snyk, safety) configured"),
+            ("Unit Testing", "Unit Testing" in quality["quality_gates"], "No unit test step found"),
+            ("No Critical Security Issues", not report.security["critical"], "; ".join(report.security["critical"])),
+        ]
+        failures = sum(1 for _, passed, _ in cases if not passed)
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<testsuites name="workflow-quality-gates" tests="{len(cases)}" failures="{failures}">\n')
+        f.write(f'  <testsuite name={quoteattr(report.workflow_path or report.query)} tests="{len(cases)}" '
+                f'failures="{failures}" timestamp="{report.generated.isoformat(timespec="seconds")}">\n')
+        for name, passed, message in cases:
+            f.write(f'    <testcase classname="quality_gates" name={quoteattr(name)}')
+            if passed:
+                f.write("/>\n")
+            else:
+                f.write(f">\n      <failure message={quoteattr(message)}>{escape(message)}</failure>\n    </testcase>\n")
+        f.write("  </testsuite>\n</testsuites>\n")
+
+
+WRITERS = {
+    "markdown": MarkdownReportWriter,
+    "json": JsonReportWriter,
+    "sarif": SarifReportWriter,
+    "junit": JUnitReportWriter,
+}
+
+
+def write_reports(report, base_path, formats=("markdown",), yaml_mode="full", yaml_max_lines=DEFAULT_YAML_MAX_LINES):
+    """Writes ``report`` once per format to ``base_path`` plus the format's extension."""
+    paths = []
+    for name in formats:
+        writer = WRITERS[name](yaml_mode, yaml_max_lines)
+        paths.append(writer.write(report, base_path + writer.extension))
+    return paths
@@ -0,0 +1,439 @@
+import copy
+import hashlib
+import json
+import re
+import sys
+import time
+
+from instrumentation import tracer
+from runtime_estimator import durations, estimate_runtime, step_uses_cache
+
+
+class KeywordMatcher:
+    """Finds every keyword that occurs as a substring of a text in one regex pass.
+
+    All keywords are folded into a single alternation inside a lookahead, so
+    each position reports the longest keyword starting there. Shorter keywords
+    contained in a match are added back from a precomputed table, which keeps
+    the result identical to testing ``keyword in text`` for each keyword.
+    """
+
+    def __init__(self, keywords):
+        keywords = sorted(set(keywords), key=len, reverse=True)
+        self._pattern = None
+        if keywords:
+            self._pattern = re.compile("(?=(%s))" % "|".join(re.escape(kw) for kw in keywords))
+        self._implied = {kw: frozenset(other for other in keywords if other in kw) for kw in keywords}
+
+    def find(self, text):
+        if not text or self._pattern is None:
+            return frozenset()
+        matched = set(self._pattern.findall(text))
+        if len(matched) == 1:
+            return self._implied[matched.pop()]
+        found = set()
+        for kw in matched:
+            found |= self._implied[kw]
+        return found
+
+
+class StepHits:
+    """Keywords found in each field of a step; ``index`` is the step's position in its
+    job's steps, counting malformed steps, as in the YAML source."""
+
+    __slots__ = ("name", "run", "uses", "uses_lower", "index", "_combined")
+
+    def __init__(self, name, run, uses, uses_lower, index=None):
+        self.name = name
+        self.run = run
+        self.uses = uses
+        self.uses_lower = uses_lower
+        self.index = index
+        self._combined = None
+
+    @property
+    def combined(self):
+        """Keywords found in the lowercased name, run and uses of the step."""
+        if self._combined is None:
+            self._combined = self.name | self.run | self.uses_lower
+        return self._combined
+
+
+def workflow_jobs(yaml_dict):
+    """(job_id, job) for every job that is a mapping; half-written jobs are skipped."""
+    jobs = yaml_dict.get('jobs')
+    if not isinstance(jobs, dict):
+        return
+    for job_id, job in jobs.items():
+        if isinstance(job, dict):
+            yield job_id, job
+
+
+def numbered_steps(job):
+    """(index, step) for the steps of ``job`` that are mappings, indexed as in the YAML source."""
+    steps = job.get('steps')
+    if not isinstance(steps, list):
+        return []
+    return [(index, step) for index, step in enumerate(steps) if isinstance(step, dict)]
+
+
+def job_steps(job):
+    """The steps of ``job`` that are mappings."""
+    return [step for _, step in numbered_steps(job)]
+
+
+class Rule:
+    """Base class for analysis rules fed by a single traversal of the workflow.
+
+    ``keywords`` are compiled into the engine's shared matcher; ``visit_step``
+    receives the keywords found in each step field as a ``StepHits``.
+    """
+
+    name = None
+    keywords = ()
+
+    def start(self, yaml_dict):
+        return {}
+
+    def visit_job(self, result, job_id, job):
+        pass
+
+    def visit_step(self, result, job_id, job, step, hits):
+        pass
+
+    def finish(self, result, yaml_dict):
+        return result
+
+    def merge(self, result, partial):
+        """Folds the state of one job, from ``RuleEngine.run_job``, into ``result``.
+
+        Returns the merged state (updating ``result`` in place where it can).
+        The default concatenates lists, adds numbers, ORs booleans and merges
+        dicts recursively, so the state returned by ``start`` may be a dict or
+        a list; override it if that does not fit the rule.
+        """
+        return merge_value(result, partial)
+
+
+def merge_value(current, value):
+    if isinstance(current, dict) and isinstance(value, dict):
+        merge_state(current, value)
+        return current
+    if isinstance(current, list) and isinstance(value, list):
+        current.extend(value)
+        return current
+    if isinstance(current, bool) and isinstance(value, bool):
+        return current or value
+    if isinstance(current, (int, float)) and isinstance(value, (int, float)):
+        return current + value
+    return copy.deepcopy(value)
+
+
+def merge_state(result, partial):
+    for key, value in partial.items():
+        if key not in result:
+            result[key] = copy.deepcopy(value)
+        else:
+            result[key] = merge_value(result[key], value)
+
+
+class SecurityRule(Rule):
+    """Findings are messages per severity; ``locations`` holds the [job id, step index]
+    of each message, in the same order, for reports that point at the step."""
+
+    name = "security"
+    keywords = ("@master", "@main", "@v1", "curl", "wget", "sudo", ">")
+
+    def start(self, yaml_dict):
+        return {"critical": [], "warning": [], "info": [],
+                "locations": {"critical": [], "warning": [], "info": []}}
+
+    def visit_step(self, result, job_id, job, step, hits):
+        def report(level, message):
+            result[level].append(message)
+            result["locations"][level].append([job_id, hits.index])
+
+        action = str(step.get('uses') or '')
+        if '@' in action:
+            if '@master' in hits.uses or '@main' in hits.uses:
+                report("critical", f"⛔ Using unstable version in {action}. Specify a fixed version.")
+            elif '@v1' in hits.uses:
+                report("warning", f"⚠️ Consider updating {action} to latest version")
+
+        if 'run' in step:
+            found = hits.run
+            if not found:
+                return
+            step_name = step.get('name', 'unnamed')
+            if 'curl' in found and not str(step['run']).lower().startswith('curl --fail'):
+                report("warning", f"⚠️ Unsafe curl usage without --fail in step '{step_name}'")
+            if 'wget' in found:
+                report("warning", f"⚠️ Consider using curl --fail instead of wget in step '{step_name}'")
+            if 'sudo' in found:
+                report("critical", f"⛔ Sudo usage detected in step '{step_name}'")
+            if '>' in found:
+                report("info", f"ℹ️ File system write detected in step '{step_name}'")
+
+
+LARGE_MATRIX = 50
+
+
+class EfficiencyRule(Rule):
+    name = "efficiency"
+    keywords = ("cache",)
+
+    def start(self, yaml_dict):
+        return {
+            "metrics": {
+                "parallel_jobs": 0,
+                "total_steps": 0,
+                "matrix_builds": False,
+                "caching_used": False,
+            },
+            "optimization_suggestions": [],
+            "best_practices": [],
+            "_job_minutes": {},
+        }
+
+    def visit_job(self, result, job_id, job):
+        metrics = result["metrics"]
+        metrics["total_steps"] += len(job_steps(job))
+        result["_job_minutes"][job_id] = [0.0, 0.0, False]
+        if isinstance(job.get('strategy'), dict) and 'matrix' in job['strategy']:
+            metrics["matrix_builds"] = True
+        if not job.get('timeout-minutes'):
+            result["best_practices"].append("⏱️ Add timeout-minutes to prevent hanging jobs")
+        if 'continue-on-error' not in job:
+            result["best_practices"].append("🔄 Consider using continue-on-error for non-critical steps")
+
+    def visit_step(self, result, job_id, job, step, hits):
+        if 'cache' in hits.uses:
+            result["metrics"]["caching_used"] = True
+        totals = result["_job_minutes"][job_id]
+        minutes, savings = durations().step_cost(step)
+        totals[0] += minutes
+        totals[1] += savings
+        totals[2] = totals[2] or step_uses_cache(step)
+
+    def finish(self, result, yaml_dict):
+        metrics = result["metrics"]
+        job_minutes = {job_id: minutes - savings if cached else minutes
+                       for job_id, (minutes, savings, cached) in result.pop("_job_minutes").items()}
+        runtime = estimate_runtime(dict(workflow_jobs(yaml_dict)), job_minutes)
+        result["runtime"] = runtime
+        metrics["parallel_jobs"] = runtime["max_parallel_jobs"]
+        if runtime["cycles"]:
+            result["optimization_suggestions"].append(f"🔁 Break the dependency cycle between jobs: {', '.join(runtime['cycles'])}")
+        for missing in runtime["missing_dependencies"]:
+            result["optimization_suggestions"].append(f"🚫 Fix missing dependency: {missing}")
+        for job_id, breakdown in runtime["matrices"].items():
+            if breakdown["instances"] > LARGE_MATRIX:
+                result["optimization_suggestions"].append(
+                    f"🔀 Matrix of job '{job_id}' expands to {breakdown['instances']} instances; "
+                    "trim axes or switch to include-only combinations")
+        blocked = [job for job in runtime["unreachable_jobs"] if job not in runtime["cycles"]]
+        if blocked:
+            result["optimization_suggestions"].append(f"🚫 Jobs that can never run: {', '.join(blocked)}")
+        if metrics["total_steps"] > 10:
+            result["optimization_suggestions"].append("🔄 Consider splitting into multiple jobs for better parallelization")
+        if not metrics["caching_used"]:
+            result["optimization_suggestions"].append("💾 Implement dependency caching to speed up builds")
+        if not metrics["matrix_builds"] and metrics["parallel_jobs"] == 1:
+            result["optimization_suggestions"].append("⚡ Consider using matrix strategy for parallel testing")
+        return result
+
+
+class BuildQualityRule(Rule):
+    name = "quality"
+    testing = ('pytest', 'unittest', 'coverage')
+    linters = ('flake8', 'pylint', 'black', 'ruff')
+    type_checkers = ('mypy', 'pytype', 'pyre')
+    scanners = ('dependabot', 'snyk', 'safety')
+    keywords = testing + linters + type_checkers + scanners
+
+    def start(self, yaml_dict):
+        return {
+            "quality_gates": [],
+            "test_coverage": False,
+            "linting": False,
+            "type_checking": False,
+            "dependency_audit": False,
+            "estimated_success_rate": 0
+        }
+
+    def visit_step(self, result, job_id, job, step, hits):
+        found = hits.combined
+        if not found:
+            return
+        if not found.isdisjoint(self.testing):
+            result["quality_gates"].append("Unit Testing")
+        if not found.isdisjoint(self.linters):
+            result["linting"] = True
+            result["quality_gates"].append("Code Style")
+        if not found.isdisjoint(self.type_checkers):
+            result["type_checking"] = True
+            result["quality_gates"].append("Type Safety")
+        if not found.isdisjoint(self.scanners):
+            result["dependency_audit"] = True
+            result["quality_gates"].append("Dependency Check")
+        if 'coverage' in found:
+            result["test_coverage"] = True
+
+    def finish(self, result, yaml_dict):
+        base_rate = 70
+        if result["linting"]: base_rate += 10
+        if result["type_checking"]: base_rate += 10
+        if result["test_coverage"]: base_rate += 5
+        if result["dependency_audit"]: base_rate += 5
+        result["estimated_success_rate"] = min(base_rate, 100)
+        return result
+
+
+class RuleEngine:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate rule names: {names}")
+        self.matcher = KeywordMatcher(kw for rule in self.rules for kw in rule.keywords)
+
+    def scan_step(self, step, index=None):
+        find = self.matcher.find
+        uses = str(step.get('uses', '') or '')
+        uses_lower = uses.lower()
+        uses_hits = find(uses)
+        return StepHits(
+            find(str(step.get('name', '') or '').lower()),
+            find(str(step.get('run', '') or '').lower()),
+            uses_hits,
+            uses_hits if uses_lower == uses else find(uses_lower),
+            index,
+        )
+
+    def run(self, yaml_dict):
+        if tracer.enabled:
+            return self._run_traced(yaml_dict)
+        return self._run(self.rules, yaml_dict)
+
+    def _run_traced(self, yaml_dict):
+        timed = [TimedRule(rule) for rule in self.rules]
+        started = time.perf_counter()
+        results = self._run(timed, yaml_dict)
+        elapsed = time.perf_counter() - started
+        for rule in timed:
+            tracer.record(f"rule.{rule.name}", rule.elapsed)
+        tracer.record("rules.traversal", elapsed - sum(rule.elapsed for rule in timed))
+        return results
+
+    def _run(self, rules, yaml_dict):
+        results = {rule.name: rule.start(yaml_dict) for rule in rules}
+        for job_id, job in workflow_jobs(yaml_dict):
+            for rule in rules:
+                rule.visit_job(results[rule.name], job_id, job)
+            for index, step in numbered_steps(job):
+                hits = self.scan_step(step, index)
+                for rule in rules:
+                    rule.visit_step(results[rule.name], job_id, job, step, hits)
+        for rule in rules:
+            results[rule.name] = rule.finish(results[rule.name], yaml_dict)
+        return results
+
+    def run_job(self, yaml_dict, job_id, job):
+        """Rule states after visiting only ``job``, to be cached and passed to ``combine``."""
+        partials = {rule.name: rule.start(yaml_dict) for rule in self.rules}
+        for rule in self.rules:
+            rule.visit_job(partials[rule.name], job_id, job)
+        for index, step in numbered_steps(job):
+            hits = self.scan_step(step, index)
+            for rule in self.rules:
+                rule.visit_step(partials[rule.name], job_id, job, step, hits)
+        return partials
+
+    def combine(self, yaml_dict, job_partials):
+        """Merges per-job states in job order and finishes them; equivalent to ``run``."""
+        results = {rule.name: rule.start(yaml_dict) for rule in self.rules}
+        for partials in job_partials:
+            for rule in self.rules:
+                merged = rule.merge(results[rule.name], partials[rule.name])
+                if merged is not None:
+                    # Rules written against the older contract merge in place and return None.
+                    results[rule.name] = merged
+        for rule in self.rules:
+            results[rule.name] = rule.finish(results[rule.name], yaml_dict)
+        return results
+
+
+class TimedRule:
+    """Wraps a rule and accumulates the time spent in its hooks."""
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.name = rule.name
+        self.elapsed = 0.0
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+    def start(self, yaml_dict):
+        return self._timed(self.rule.start, yaml_dict)
+
+    def visit_job(self, result, job_id, job):
+        return self._timed(self.rule.visit_job, result, job_id, job)
+
+    def visit_step(self, result, job_id, job, step, hits):
+        return self._timed(self.rule.visit_step, result, job_id, job, step, hits)
+
+    def finish(self, result, yaml_dict):
+        return self._timed(self.rule.finish, result, yaml_dict)
+
+
+RULES = [SecurityRule(), EfficiencyRule(), BuildQualityRule()]
+# Bump when a change outside the rule modules (e.g. to the runtime estimator) alters analysis results.
+ANALYSIS_VERSION = 1
+_default_engine = None
+
+
+def register_rule(rule):
+    """Add a rule to the default engine. Usable as a class decorator."""
+    global _default_engine
+    RULES.append(rule() if isinstance(rule, type) else rule)
+    _default_engine = None
+    return rule
+
+
+def default_engine():
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = RuleEngine(RULES)
+    return _default_engine
+
+
+def source_digest(module_name):
+    path = getattr(sys.modules.get(module_name), "__file__", None)
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except (OSError, TypeError):
+        return None
+
+
+def analysis_fingerprint(engine=None):
+    """Identifies what analysis results depend on besides the workflow itself.
+
+    Covers ANALYSIS_VERSION, every rule of ``engine`` (class, name, keywords and
+    the source of its module) and the duration table in use, so stored results
+    can be recognized as stale.
+    """
+    engine = engine or default_engine()
+    rules = [(type(rule).__module__, type(rule).__qualname__, rule.name, sorted(rule.keywords),
+              source_digest(type(rule).__module__)) for rule in engine.rules]
+    data = [ANALYSIS_VERSION, rules, durations().fingerprint]
+    return hashlib.blake2b(json.dumps(data).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def run_rules(yaml_dict):
+    return default_engine().run(yaml_dict)
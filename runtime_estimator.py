@@ -0,0 +1,312 @@
+import hashlib
+import json
+import math
+import os
+import re
+import statistics
+
+from matrix import job_matrix
+
+DEFAULT_DURATIONS = {
+    "default_step": 0.5,
+    "job_overhead": 0.3,
+    # Share of a dependency install's time that remains when the job restores a cache.
+    "cache_hit_factor": 0.3,
+    "cacheable": ["pip install", "npm ci", "npm install", "yarn install", "pnpm install", "poetry install",
+                  "cargo build", "mvn", "gradle", "go mod download"],
+    "actions": {
+        "actions/checkout": 0.2,
+        "actions/setup-python": 0.4,
+        "actions/setup-node": 0.4,
+        "actions/setup-java": 0.6,
+        "actions/setup-go": 0.4,
+        "actions/cache": 0.3,
+        "actions/upload-artifact": 0.3,
+        "actions/download-artifact": 0.2,
+        "docker/build-push-action": 4.0,
+        "codecov/codecov-action": 0.3,
+    },
+    "commands": {
+        "pip install": 1.0,
+        "npm ci": 1.5,
+        "npm install": 2.0,
+        "npm test": 2.0,
+        "pytest": 3.0,
+        "unittest": 2.0,
+        "flake8": 0.5,
+        "pylint": 1.0,
+        "black": 0.3,
+        "ruff": 0.2,
+        "mypy": 1.0,
+        "docker build": 4.0,
+        "apt-get install": 1.0,
+        "go test": 2.0,
+        "cargo build": 4.0,
+        "cargo test": 3.0,
+        "mvn": 4.0,
+        "gradle": 4.0,
+    },
+}
+
+
+class DurationTable:
+    """Per-action and per-command step durations in minutes."""
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.default_step = float(data.get("default_step", DEFAULT_DURATIONS["default_step"]))
+        self.job_overhead = float(data.get("job_overhead", DEFAULT_DURATIONS["job_overhead"]))
+        self.cache_hit_factor = float(data.get("cache_hit_factor", DEFAULT_DURATIONS["cache_hit_factor"]))
+        self.cacheable = {c.lower() for c in data.get("cacheable", DEFAULT_DURATIONS["cacheable"])}
+        self.actions = {**DEFAULT_DURATIONS["actions"], **data.get("actions", {})}
+        self.commands = {**DEFAULT_DURATIONS["commands"], **data.get("commands", {})}
+        commands = sorted(self.commands, key=len, reverse=True)
+        self._command_pattern = re.compile("|".join(re.escape(c.lower()) for c in commands)) if commands else None
+        self._command_minutes = {c.lower(): minutes for c, minutes in self.commands.items()}
+        table = [self.default_step, self.job_overhead, self.cache_hit_factor, sorted(self.cacheable),
+                 self.actions, self.commands]
+        self.fingerprint = hashlib.blake2b(json.dumps(table, sort_keys=True).encode("utf-8"),
+                                           digest_size=16).hexdigest()
+
+    @classmethod
+    def load(cls, path):
+        """Loads a JSON table, or a JSONL export of historical step timings.
+
+        History records look like ``{"uses": "actions/setup-node@v4", "seconds": 21}``
+        or ``{"run": "npm ci", "minutes": 1.2}``; the median per action or
+        command becomes its duration.
+        """
+        with open(path, encoding="utf-8") as f:
+            if not path.endswith(".jsonl"):
+                return cls(json.load(f))
+            return cls.from_history(json.loads(line) for line in f if line.strip())
+
+    @classmethod
+    def from_history(cls, records):
+        samples = {"actions": {}, "commands": {}}
+        for record in records:
+            minutes = record.get("minutes")
+            if minutes is None and record.get("seconds") is not None:
+                minutes = record["seconds"] / 60
+            if minutes is None:
+                continue
+            if record.get("uses"):
+                kind, key = "actions", str(record["uses"]).split("@", 1)[0].lower()
+            elif record.get("run"):
+                kind, key = "commands", str(record["run"]).strip().lower()
+            else:
+                continue
+            samples[kind].setdefault(key, []).append(float(minutes))
+        return cls({kind: {key: round(statistics.median(values), 2) for key, values in table.items()}
+                    for kind, table in samples.items()})
+
+    def step_minutes(self, step):
+        return self.step_cost(step)[0]
+
+    def step_cost(self, step):
+        """Returns (minutes, minutes a dependency cache can save) for one step."""
+        uses = step.get('uses')
+        if uses:
+            action = str(uses).split("@", 1)[0].lower()
+            if action in self.actions:
+                return self.actions[action], 0.0
+            for prefix, minutes in self.actions.items():
+                if action.startswith(prefix):
+                    return minutes, 0.0
+            return self.default_step, 0.0
+        run = step.get('run')
+        if run and self._command_pattern is not None:
+            matches = self._command_pattern.findall(str(run).lower())
+            if matches:
+                cacheable = sum(self._command_minutes[m] for m in matches if m in self.cacheable)
+                return sum(self._command_minutes[m] for m in matches), cacheable * (1 - self.cache_hit_factor)
+        return self.default_step, 0.0
+
+    def job_minutes(self, job):
+        """Minutes of one run of ``job``'s steps, crediting dependency caching when the job has it."""
+        minutes = savings = 0.0
+        for step in job.get('steps', []) or []:
+            if isinstance(step, dict):
+                step_minutes, step_savings = self.step_cost(step)
+                minutes += step_minutes
+                savings += step_savings
+        return minutes - savings if job_uses_cache(job) else minutes
+
+
+def step_uses_cache(step):
+    uses = str(step.get('uses') or '').lower()
+    if 'cache' in uses:
+        return True
+    with_ = step.get('with')
+    return uses.startswith('actions/setup-') and isinstance(with_, dict) and bool(with_.get('cache'))
+
+
+def job_uses_cache(job):
+    return any(isinstance(step, dict) and step_uses_cache(step) for step in job.get('steps', []) or [])
+
+
+_durations = None
+
+
+def durations():
+    global _durations
+    if _durations is None:
+        path = os.getenv("GHA_AI_DURATIONS")
+        _durations = DurationTable.load(path) if path else DurationTable()
+    return _durations
+
+
+def set_durations(table):
+    """Replaces the duration table used by the estimator (e.g. one built from CI history)."""
+    global _durations
+    _durations = table
+
+
+def use_durations(path):
+    """Loads ``path`` as the duration table, also for worker processes started later."""
+    os.environ["GHA_AI_DURATIONS"] = os.path.abspath(path)
+    set_durations(DurationTable.load(path))
+
+
+def job_needs(job):
+    needs = job.get('needs') or []
+    if isinstance(needs, str):
+        return [needs]
+    return [str(n) for n in needs] if isinstance(needs, list) else []
+
+
+def matrix_instances(job, matrix):
+    if matrix is None:
+        return 1, 1
+    count = max(1, matrix.count())
+    max_parallel = job['strategy'].get('max-parallel')
+    concurrent = min(count, max_parallel) if isinstance(max_parallel, int) and max_parallel > 0 else count
+    return count, concurrent
+
+
+def matrix_breakdown(matrix, minutes):
+    """Instances and runner-minutes per value of every axis of a job matrix."""
+    return {
+        "instances": matrix.count(),
+        "dynamic": matrix.dynamic,
+        "axis_minutes": {
+            axis: {label: round(count * minutes, 1) for label, count in values.items() if count}
+            for axis, values in matrix.axis_counts().items()
+        },
+    }
+
+
+def estimate_runtime(jobs, job_minutes=None, table=None):
+    """Schedules the job graph as early as possible and returns wall-time estimates.
+
+    ``job_minutes`` maps job id to the minutes of one run of the job; jobs not
+    in it are timed from their steps with the duration table.
+    """
+    table = table or durations()
+    job_minutes = dict(job_minutes or {})
+    graph = {}
+    instances = {}
+    wall = {}
+    cost = {}
+    matrices = {}
+    missing = []
+    for job_id, job in jobs.items():
+        job = job if isinstance(job, dict) else {}
+        if job_id not in job_minutes:
+            job_minutes[job_id] = table.job_minutes(job)
+        minutes = table.job_overhead + job_minutes[job_id]
+        matrix = job_matrix(job)
+        count, concurrent = matrix_instances(job, matrix)
+        instances[job_id] = (count, concurrent)
+        wall[job_id] = minutes * math.ceil(count / concurrent)
+        cost[job_id] = minutes * count
+        if matrix is not None:
+            matrices[job_id] = matrix_breakdown(matrix, minutes)
+        graph[job_id] = []
+        for need in job_needs(job):
+            if need in jobs:
+                graph[job_id].append(need)
+            else:
+                missing.append(f"{job_id} needs unknown job '{need}'")
+
+    blocked = {job_id for job_id, job in jobs.items()
+               if isinstance(job, dict) and any(need not in jobs for need in job_needs(job))}
+    dependents = {job_id: [] for job_id in graph}
+    pending = {job_id: len(needs) for job_id, needs in graph.items()}
+    for job_id, needs in graph.items():
+        for need in needs:
+            dependents[need].append(job_id)
+
+    start, finish, parent = {}, {}, {}
+    ready = [job_id for job_id, count in pending.items() if count == 0]
+    order = []
+    while ready:
+        job_id = ready.pop()
+        order.append(job_id)
+        needs = graph[job_id]
+        start[job_id] = max((finish[n] for n in needs), default=0.0)
+        parent[job_id] = max(needs, key=lambda n: finish[n]) if needs else None
+        finish[job_id] = start[job_id] + wall[job_id]
+        for dependent in dependents[job_id]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                ready.append(dependent)
+    stuck = {job_id for job_id in graph if job_id not in start}
+    # Jobs that are stuck only because they sit downstream of a cycle are peeled off,
+    # leaving the jobs that actually form the cycles.
+    cyclic = set(stuck)
+    feeding = {job_id: sum(1 for d in dependents[job_id] if d in cyclic) for job_id in cyclic}
+    leaves = [job_id for job_id, count in feeding.items() if count == 0]
+    while leaves:
+        job_id = leaves.pop()
+        cyclic.discard(job_id)
+        for need in graph[job_id]:
+            if need in cyclic:
+                feeding[need] -= 1
+                if feeding[need] == 0:
+                    leaves.append(need)
+    cyclic = sorted(cyclic)
+
+    unreachable = set(blocked)
+    for job_id in order:
+        if any(need in unreachable for need in graph[job_id]):
+            unreachable.add(job_id)
+    unreachable.update(stuck)
+    runnable = [job_id for job_id in order if job_id not in unreachable]
+
+    critical_end = max(runnable, key=lambda j: finish[j], default=None)
+    path = []
+    node = critical_end
+    while node is not None:
+        path.append(node)
+        node = parent[node]
+    path.reverse()
+
+    events = []
+    for job_id in runnable:
+        if wall[job_id] > 0:
+            events.append((start[job_id], 1, instances[job_id][1]))
+            events.append((finish[job_id], 0, instances[job_id][1]))
+    max_instances = max_jobs = running_instances = running_jobs = 0
+    for _, is_start, concurrent in sorted(events):
+        if is_start:
+            running_instances += concurrent
+            running_jobs += 1
+            max_instances = max(max_instances, running_instances)
+            max_jobs = max(max_jobs, running_jobs)
+        else:
+            running_instances -= concurrent
+            running_jobs -= 1
+
+    return {
+        "critical_path_minutes": round(finish[critical_end], 1) if critical_end else 0.0,
+        "critical_path": path,
+        "runner_minutes": round(sum(cost[job_id] for job_id in runnable), 1),
+        "max_parallel_jobs": max_jobs,
+        "max_parallel_instances": max_instances,
+        "job_instances": sum(instances[job_id][0] for job_id in runnable),
+        "cycles": cyclic,
+        "unreachable_jobs": sorted(unreachable),
+        "missing_dependencies": missing,
+        "matrices": matrices,
+    }
@@ -0,0 +1,231 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from github_actions_ai import analyze_workflow, parse_workflow
+from rules import analysis_fingerprint
+
+DEFAULT_INDEX = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "scan-index.sqlite")
+PRUNED_DIRS = {".git", "node_modules", ".venv", "venv", "__pycache__", ".tox", ".mypy_cache"}
+
+
+def discover_workflows(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in PRUNED_DIRS]
+        if os.path.basename(dirpath) == "workflows" and os.path.basename(os.path.dirname(dirpath)) == ".github":
+            for name in filenames:
+                if name.endswith((".yml", ".yaml")):
+                    yield os.path.join(dirpath, name)
+
+
+def analyze_chunk(chunk):
+    """Worker entry point: ``chunk`` is a list of (path, previously indexed sha256)."""
+    results = []
+    for path, known_hash in chunk:
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            st = os.stat(path)
+        except OSError as e:
+            results.append({"path": path, "status": "error", "error": str(e)})
+            continue
+        digest = hashlib.sha256(content).hexdigest()
+        result = {"path": path, "sha256": digest, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        if digest == known_hash:
+            result["status"] = "unchanged"
+        else:
+            try:
+                result["analysis"] = analyze_workflow(parse_workflow(content, cache=None))
+                result["status"] = "ok"
+            except Exception as e:
+                result["status"] = "error"
+                result["error"] = f"{type(e).__name__}: {e}"
+        results.append(result)
+    return results
+
+
+class ScanIndex:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("""CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, sha256 TEXT, status TEXT, result TEXT,
+            fingerprint TEXT)""")
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(files)")}
+        if "fingerprint" not in columns:
+            # Indexes written before fingerprints existed: every entry is re-analyzed once.
+            with self.db:
+                self.db.execute("ALTER TABLE files ADD COLUMN fingerprint TEXT")
+
+    def entries(self, root):
+        prefix = os.path.join(os.path.abspath(root), "")
+        rows = self.db.execute("SELECT path, mtime_ns, size, sha256, status, result, fingerprint FROM files "
+                               "WHERE path >= ? AND path < ?", (prefix, prefix + "\uffff"))
+        return {row[0]: row[1:] for row in rows}
+
+    def update(self, results, fingerprint=None):
+        rows = [(r["path"], r.get("mtime_ns"), r.get("size"), r.get("sha256"), r["status"],
+                 json.dumps(r.get("analysis") or r.get("error")), fingerprint)
+                for r in results if r["status"] in ("ok", "error")]
+        touched = [(r["mtime_ns"], r["size"], r["path"]) for r in results if r["status"] == "unchanged"]
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.db.executemany("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?", touched)
+
+    def remove(self, paths):
+        with self.db:
+            self.db.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in paths])
+
+    def close(self):
+        self.db.close()
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, results):
+        for result in results:
+            self.file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class SqliteSink:
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        with self.db:
+            self.db.execute("DROP TABLE IF EXISTS results")
+            self.db.execute("""CREATE TABLE results (
+                path TEXT PRIMARY KEY, sha256 TEXT, status TEXT, critical INTEGER, warnings INTEGER,
+                info INTEGER, total_steps INTEGER, success_rate INTEGER, result TEXT)""")
+
+    def write(self, results):
+        rows = []
+        for r in results:
+            analysis = r.get("analysis") or {}
+            security = analysis.get("security", {})
+            rows.append((
+                r["path"], r.get("sha256"), r["status"],
+                len(security.get("critical", [])), len(security.get("warning", [])), len(security.get("info", [])),
+                analysis.get("efficiency", {}).get("metrics", {}).get("total_steps"),
+                analysis.get("quality", {}).get("estimated_success_rate"),
+                json.dumps(analysis or r.get("error"), ensure_ascii=False),
+            ))
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def close(self):
+        self.db.close()
+
+
+def open_sink(path):
+    if path.endswith((".sqlite", ".sqlite3", ".db")):
+        return SqliteSink(path)
+    return JsonlSink(path)
+
+
+def cached_result(path, entry):
+    _, _, sha256, status, stored, _ = entry
+    result = {"path": path, "sha256": sha256, "status": status, "cached": True}
+    result["analysis" if status == "ok" else "error"] = json.loads(stored) if stored else None
+    return result
+
+
+def scan(root, output, index_path=DEFAULT_INDEX, workers=None, chunk_size=64, changed_only=False):
+    started = time.perf_counter()
+    index = ScanIndex(index_path)
+    sink = open_sink(output)
+    known = index.entries(root)
+    fingerprint = analysis_fingerprint()
+    stats = {"files": 0, "analyzed": 0, "unchanged": 0, "errors": 0, "removed": 0}
+
+    pending = []
+    unchanged = []
+    seen = set()
+    for path in discover_workflows(root):
+        path = os.path.abspath(path)
+        seen.add(path)
+        stats["files"] += 1
+        entry = known.get(path)
+        if entry is not None and entry[5] != fingerprint:
+            # Analyzed with other rules or durations: the stored result is stale even if the file is not.
+            entry = None
+        if entry is not None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if (st.st_mtime_ns, st.st_size) == (entry[0], entry[1]):
+                stats["unchanged"] += 1
+                if not changed_only:
+                    unchanged.append(cached_result(path, entry))
+                    if len(unchanged) >= 1000:
+                        sink.write(unchanged)
+                        unchanged = []
+                continue
+        pending.append((path, entry[2] if entry else None))
+    sink.write(unchanged)
+
+    def consume(results):
+        index.update(results, fingerprint)
+        emitted = []
+        for r in results:
+            if r["status"] == "unchanged":
+                stats["unchanged"] += 1
+                if not changed_only:
+                    emitted.append(cached_result(r["path"], known[r["path"]]))
+            else:
+                stats["analyzed" if r["status"] == "ok" else "errors"] += 1
+                emitted.append(r)
+        sink.write(emitted)
+
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    if len(chunks) <= 1 or workers == 1:
+        for chunk in chunks:
+            consume(analyze_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(analyze_chunk, chunk) for chunk in chunks]):
+                consume(future.result())
+
+    removed = [path for path in known if path not in seen]
+    index.remove(removed)
+    stats["removed"] = len(removed)
+    sink.close()
+    index.close()
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="github_actions_ai.py scan",
+        description="Recursively analyze every .github/workflows file under a directory",
+    )
+    parser.add_argument("root", help="Directory to scan (e.g. a mirror of many repositories)")
+    parser.add_argument("--output", default="scan-results.jsonl",
+                        help="Results file; .sqlite/.db writes a SQLite table, anything else JSONL")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="Content-hash index used to skip unchanged files")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Files per worker task")
+    parser.add_argument("--changed-only", action="store_true", help="Only emit files that were (re-)analyzed")
+    parser.add_argument("--durations",
+                        help="JSON step-duration table or JSONL of historical CI step timings for runtime estimates")
+    args = parser.parse_args(argv)
+    if args.durations:
+        # Sets GHA_AI_DURATIONS too, so the worker processes started by scan() load the same table.
+        from runtime_estimator import use_durations
+        use_durations(args.durations)
+
+    stats = scan(args.root, args.output, args.index, args.workers, max(1, args.chunk_size), args.changed_only)
+    print(f"Scanned {stats['files']} workflows in {stats['seconds']}s: {stats['analyzed']} analyzed, "
+          f"{stats['unchanged']} unchanged, {stats['errors']} errors, {stats['removed']} removed from index")
+    print(f"Results written to {args.output}")
+    return 0
@@ -0,0 +1,306 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+
+from github_actions_ai import (
+    analyze_workflow,
+    create_llm,
+    extract_yaml_content,
+    generate_yaml_prompt,
+    parse_workflow,
+    process_workflow,
+)
+from similarity_index import DEFAULT_THRESHOLD, find_reusable, open_index, remember
+from yaml_io import load_yaml
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class QueueFull(Exception):
+    pass
+
+
+class RequestQueue:
+    """Bounded work queue drained by a fixed pool of worker threads."""
+
+    def __init__(self, workers=8, maxsize=64):
+        self.queue = queue.Queue(maxsize)
+        self.workers = workers
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"worker-{i}", daemon=True).start()
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            self.queue.put_nowait((future, fn, args))
+        except queue.Full:
+            raise QueueFull() from None
+        return future
+
+    def _work(self):
+        while True:
+            future, fn, args = self.queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self.in_flight += 1
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+
+
+class ServerMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.latency = {}
+        self.started = time.time()
+
+    def observe(self, endpoint, status, seconds):
+        with self._lock:
+            key = (endpoint, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            total, count = self.latency.get(endpoint, (0.0, 0))
+            self.latency[endpoint] = (total + seconds, count + 1)
+
+    def prometheus_text(self, request_queue):
+        lines = [
+            "# HELP gha_ai_requests_total Requests handled, by endpoint and status.",
+            "# TYPE gha_ai_requests_total counter",
+        ]
+        with self._lock:
+            for (endpoint, status), count in sorted(self.requests.items()):
+                lines.append(f'gha_ai_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+            lines.append("# HELP gha_ai_request_duration_seconds Request latency, by endpoint.")
+            lines.append("# TYPE gha_ai_request_duration_seconds summary")
+            for endpoint, (total, count) in sorted(self.latency.items()):
+                lines.append(f'gha_ai_request_duration_seconds_sum{{endpoint="{endpoint}"}} {total:.6f}')
+                lines.append(f'gha_ai_request_duration_seconds_count{{endpoint="{endpoint}"}} {count}')
+        lines.append("# TYPE gha_ai_queue_depth gauge")
+        lines.append(f"gha_ai_queue_depth {request_queue.queue.qsize()}")
+        lines.append("# TYPE gha_ai_in_flight gauge")
+        lines.append(f"gha_ai_in_flight {request_queue.in_flight}")
+        lines.append("# TYPE gha_ai_uptime_seconds gauge")
+        lines.append(f"gha_ai_uptime_seconds {time.time() - self.started:.0f}")
+        return "\n".join(lines) + "\n"
+
+
+class WorkflowService:
+    """Holds the warm LLM client and chain shared by every request."""
+
+    def __init__(self, cache=None, llm_factory=create_llm, similarity=None, reuse_threshold=DEFAULT_THRESHOLD,
+                 repo_root=None):
+        self.cache = cache
+        self.repo_root = repo_root
+        self.llm_factory = llm_factory
+        self.similarity = similarity
+        self.reuse_threshold = reuse_threshold
+        self._chain = None
+        self._lock = threading.Lock()
+
+    def warm(self):
+        with self._lock:
+            if self._chain is None:
+                llm = self.llm_factory()
+                prompt = generate_yaml_prompt(None)
+                self._chain = (prompt | llm, llm, prompt)
+        return self._chain
+
+    def generate(self, payload):
+        from instrumentation import token_usage
+        from llm_cache import invoke_cached
+        from optimizer import dump
+        from repair import repair_workflow, schema_error
+
+        query = payload.get("query")
+        if not isinstance(query, str) or not query.strip():
+            raise BadRequest("'query' must be a non-empty string")
+        refresh = bool(payload.get("refresh"))
+        match = None if refresh else find_reusable(self.similarity, query, self.reuse_threshold)
+        llm = None
+        if match is not None:
+            score, entry = match
+            yaml_content = entry["yaml"]
+            result = {"query": query, "yaml": yaml_content,
+                      "reused": {"query": entry["query"], "similarity": round(score, 3)}}
+        else:
+            chain, llm, prompt = self.warm()
+            response = invoke_cached(chain, llm, prompt, query, self.cache, refresh=refresh)
+            yaml_content = extract_yaml_content(response)
+            result = {"query": query, "yaml": yaml_content, **token_usage(response)}
+        try:
+            yaml_dict = load_yaml(yaml_content)
+        except yaml.YAMLError as e:
+            result.update(valid=False, error=str(e))
+            return result
+        if schema_error(yaml_dict) is not None:
+            repair = repair_workflow(yaml_dict, llm, llm_factory=lambda: self.warm()[1])
+            result["repair"] = repair.stats()
+            if not repair.valid:
+                result.update(valid=False, error=repair.error)
+                return result
+            yaml_content = result["yaml"] = dump(repair.workflow)
+            yaml_dict = repair.workflow
+        result["valid"] = True
+        if match is None:
+            remember(self.similarity, query, yaml_content)
+        result["analysis"] = analyze_workflow(yaml_dict)
+        if payload.get("write"):
+            result["files"] = process_workflow(yaml_content, query, optimize=bool(payload.get("optimize")),
+                                               repo_root=self.repo_root)
+        return result
+
+    def analyze(self, payload):
+        content = payload.get("yaml")
+        if not isinstance(content, str):
+            raise BadRequest("'yaml' must be a string containing a workflow")
+        try:
+            yaml_dict = parse_workflow(content)
+        except (yaml.YAMLError, ValueError) as e:
+            raise BadRequest(f"Invalid workflow: {e}") from None
+        return {"analysis": analyze_workflow(yaml_dict)}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server_version = "GitHubActionsAI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        data = body.encode("utf-8") if isinstance(body, str) else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        app = self.server.app
+        started = time.perf_counter()
+        if self.path == "/health":
+            status = 200
+            self._send(status, {
+                "status": "ok",
+                "llm_warm": app["service"]._chain is not None,
+                "queue_depth": app["queue"].queue.qsize(),
+                "queue_capacity": app["queue"].queue.maxsize,
+                "in_flight": app["queue"].in_flight,
+                "workers": app["queue"].workers,
+            })
+        elif self.path == "/metrics":
+            status = 200
+            text = app["metrics"].prometheus_text(app["queue"])
+            llm = app["service"]._chain[1] if app["service"]._chain is not None else None
+            if hasattr(llm, "prometheus_lines"):
+                text += "\n".join(llm.prometheus_lines()) + "\n"
+            self._send(status, text, "text/plain; version=0.0.4")
+        else:
+            status = 404
+            self._send(status, {"error": f"Unknown endpoint {self.path}"})
+        app["metrics"].observe(self.path if status != 404 else "unknown", status, time.perf_counter() - started)
+
+    def do_POST(self):
+        app = self.server.app
+        started = time.perf_counter()
+        handler = {"/generate": app["service"].generate, "/analyze": app["service"].analyze}.get(self.path)
+        status, body, headers, future = 200, None, None, None
+        try:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                raise BadRequest("Content-Length must be an integer") from None
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if handler is None:
+                status, body = 404, {"error": f"Unknown endpoint {self.path}"}
+            elif not isinstance(payload, dict):
+                raise BadRequest("Request body must be a JSON object")
+            else:
+                future = app["queue"].submit(handler, payload)
+                body = future.result(timeout=app["timeout"])
+        except QueueFull:
+            status, body, headers = 429, {"error": "Server busy, request queue is full"}, {"Retry-After": "1"}
+        except FutureTimeout:
+            # A request still waiting in the queue is dropped instead of run for nobody.
+            future.cancel()
+            status, body = 504, {"error": f"Request did not finish within {app['timeout']}s"}
+        except (BadRequest, json.JSONDecodeError) as e:
+            status, body = 400, {"error": str(e)}
+        except Exception as e:
+            status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+        self._send(status, body, headers=headers)
+        app["metrics"].observe(self.path if handler else "unknown", status, time.perf_counter() - started)
+
+
+def create_server(host="127.0.0.1", port=8080, workers=8, queue_size=64, timeout=300.0, cache=None,
+                  llm_factory=create_llm, similarity=None, reuse_threshold=DEFAULT_THRESHOLD, repo_root=None):
+    server = ThreadingHTTPServer((host, port), RequestHandler)
+    server.daemon_threads = True
+    server.app = {
+        "service": WorkflowService(cache, llm_factory, similarity, reuse_threshold, repo_root),
+        "queue": RequestQueue(workers, queue_size),
+        "metrics": ServerMetrics(),
+        "timeout": timeout,
+    }
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="github_actions_ai.py serve",
+        description="Serve generate/analyze requests over HTTP with a warm LLM client",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=8, help="Requests processed concurrently")
+    parser.add_argument("--queue-size", type=int, default=64, help="Queued requests before answering 429")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Seconds a request may wait for its result")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk LLM response cache")
+    parser.add_argument("--cache-dir", help="Directory for the LLM response cache")
+    parser.add_argument("--no-reuse", action="store_true",
+                        help="Always call the LLM instead of reusing workflows of near-duplicate past queries")
+    parser.add_argument("--reuse-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Minimum query similarity (Jaccard, 0-1) for reusing a stored workflow")
+    parser.add_argument("--reuse-index", help="Path of the query similarity index")
+    parser.add_argument("--repo-root",
+                        help="Repository whose lockfiles \"optimize\" requests key caches on (default: the one containing the working directory)")
+    parser.add_argument("--lazy", action="store_true", help="Create the LLM client on the first generate request")
+    parser.add_argument("--backends",
+                        help="JSON config of LLM backends to route, hedge and fail over between (default: GHA_AI_BACKENDS)")
+    args = parser.parse_args(argv)
+    if args.backends:
+        os.environ["GHA_AI_BACKENDS"] = os.path.abspath(args.backends)
+
+    cache = None
+    if not args.no_cache:
+        from llm_cache import ResponseCache
+        cache = ResponseCache(args.cache_dir)
+    similarity = None if args.no_reuse else open_index(args.reuse_index)
+    server = create_server(args.host, args.port, max(1, args.workers), max(1, args.queue_size), args.timeout, cache,
+                           similarity=similarity, reuse_threshold=args.reuse_threshold, repo_root=args.repo_root)
+    if not args.lazy:
+        server.app["service"].warm()
+    print(f"Serving on http://{args.host}:{server.server_address[1]} "
+          f"(POST /generate, POST /analyze, GET /health, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
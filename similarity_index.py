@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "similarity-index.jsonl")
+DEFAULT_THRESHOLD = 0.8
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+MERSENNE_PRIME = (1 << 61) - 1
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "for", "with", "to", "of", "in", "on", "my", "our", "that", "this", "using",
+    "use", "please", "create", "generate", "make", "write", "setup", "set", "up", "workflow", "workflows",
+    "github", "actions", "action", "pipeline", "yaml", "which", "should", "it", "is", "be", "i", "we", "want",
+}
+SYNONYMS = {
+    "app": "application", "apps": "application", "applications": "application", "appli": "application",
+    "py": "python", "tests": "test", "testing": "test", "tested": "test", "builds": "build", "building": "build",
+    "deploys": "deploy", "deploying": "deploy", "deployment": "deploy", "lint": "linting", "linter": "linting",
+    "js": "javascript", "ts": "typescript", "k8s": "kubernetes", "pr": "pull_request", "prs": "pull_request",
+}
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9.+#]*")
+
+
+def normalize_query(query):
+    tokens = set()
+    for token in TOKEN_PATTERN.findall(query.lower()):
+        token = token.rstrip(".")
+        token = SYNONYMS.get(token, token)
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        if token and token not in STOPWORDS:
+            tokens.add(token)
+    return tokens
+
+
+def _permutations():
+    params = []
+    for i in range(NUM_PERMUTATIONS):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little") % MERSENNE_PRIME or 1
+        b = int.from_bytes(digest[8:], "little") % MERSENNE_PRIME
+        params.append((a, b))
+    return params
+
+
+PERMUTATIONS = _permutations()
+
+
+def minhash(tokens):
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "little") for t in tokens]
+    if not hashes:
+        return [MERSENNE_PRIME] * NUM_PERMUTATIONS
+    return [min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS]
+
+
+def band_keys(signature):
+    return [(band, tuple(signature[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+
+
+def jaccard(left, right):
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+class SimilarityIndex:
+    """MinHash/LSH index from past queries to their validated workflows.
+
+    Entries are appended to a JSONL file, so adding a workflow never rewrites
+    the index. Lookups only compare exact Jaccard similarity against the
+    candidates that share at least one LSH band with the query. One index is
+    shared by the server's worker threads, so loading, appending and lookups
+    hold ``lock``.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.entries = []
+        self.buckets = {}
+        self.queries = set()
+        self.lock = threading.Lock()
+        with self.lock:
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            self._insert(json.loads(line))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _insert(self, entry):
+        entry["tokens"] = set(entry["tokens"])
+        position = len(self.entries)
+        self.entries.append(entry)
+        self.queries.add(entry["query"])
+        for key in band_keys(entry["signature"]):
+            self.buckets.setdefault(key, []).append(position)
+
+    def add(self, query, yaml_content, source="generated"):
+        tokens = normalize_query(query)
+        entry = {"query": query, "tokens": sorted(tokens), "signature": minhash(tokens),
+                 "yaml": yaml_content, "source": source}
+        with self.lock:
+            if query in self.queries:
+                return False
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._insert(entry)
+        return True
+
+    def lookup(self, query, threshold=DEFAULT_THRESHOLD):
+        """Returns (similarity, entry) for the closest stored query at or above ``threshold``."""
+        tokens = normalize_query(query)
+        keys = band_keys(minhash(tokens))
+        with self.lock:
+            candidates = set()
+            for key in keys:
+                candidates.update(self.buckets.get(key, ()))
+            entries = [self.entries[position] for position in candidates]
+        best = None
+        for entry in entries:
+            score = jaccard(tokens, entry["tokens"])
+            if score >= threshold and (best is None or score > best[0]):
+                best = (score, entry)
+        return best
+
+
+def is_valid_workflow(yaml_content):
+    from workflow_schema import WorkflowSchema
+    from yaml_io import load_yaml
+
+    try:
+        WorkflowSchema.model_validate(load_yaml(yaml_content))
+    except Exception:
+        return False
+    return True
+
+
+REPORT_QUERY = re.compile(r"## 📝 Query\n```\n(.*?)\n```", re.S)
+REPORT_YAML = re.compile(r"```yaml\n(.*?)```", re.S)
+
+
+def seed_from_repo(index, workflows_dir, reports_dir):
+    """Adds the queries and workflows recorded in existing reports and workflow files.
+
+    Workflow file names keep only a truncated, lower-cased query, so a workflow
+    file is stored under the query of the report that recorded it, and under
+    its file name only when that name was not truncated.
+    """
+    from github_actions_ai import WORKFLOW_NAME_LENGTH
+
+    added = 0
+    queries_by_file, queries_by_yaml = {}, {}
+    if os.path.isdir(reports_dir):
+        for name in sorted(os.listdir(reports_dir)):
+            path = os.path.join(reports_dir, name)
+            if name.endswith(".json"):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        report = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if isinstance(report, dict) and report.get("query") and report.get("workflow_path"):
+                    queries_by_file[os.path.basename(report["workflow_path"])] = report["query"]
+                continue
+            if not name.endswith(".md"):
+                continue
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            query, workflow = REPORT_QUERY.search(text), REPORT_YAML.search(text)
+            if query and workflow:
+                queries_by_yaml[workflow.group(1).strip()] = query.group(1).strip()
+                if is_valid_workflow(workflow.group(1)):
+                    added += index.add(query.group(1).strip(), workflow.group(1).strip(), source=name)
+    if os.path.isdir(workflows_dir):
+        for name in sorted(os.listdir(workflows_dir)):
+            stem, ext = os.path.splitext(name)
+            if ext not in (".yml", ".yaml"):
+                continue
+            with open(os.path.join(workflows_dir, name), encoding="utf-8") as f:
+                content = f.read()
+            query = queries_by_file.get(name) or queries_by_yaml.get(content.strip())
+            if query is None:
+                base = re.sub(r"-[0-9a-f]{8}$", "", stem)
+                if len(base) >= WORKFLOW_NAME_LENGTH:
+                    continue
+                query = base.replace("-", " ")
+            if is_valid_workflow(content):
+                added += index.add(query, content, source=name)
+    return added
+
+
+def find_reusable(index, query, threshold=DEFAULT_THRESHOLD):
+    """The (similarity, entry) whose workflow can be reused for ``query`` instead of calling the LLM, or None."""
+    if index is None:
+        return None
+    match = index.lookup(query, threshold)
+    if match is not None:
+        score, entry = match
+        print(f"♻️ Reusing the workflow generated for '{entry['query']}' (similarity {score:.2f}), skipping the LLM call")
+    return match
+
+
+def remember(index, query, yaml_content):
+    """Stores the validated workflow generated for ``query`` so near-duplicate queries can reuse it."""
+    if index is not None:
+        index.add(query, yaml_content)
+
+
+def open_index(path=None):
+    from github_actions_ai import output_dir
+
+    index = SimilarityIndex(path or DEFAULT_INDEX_PATH)
+    if not len(index):
+        seeded = seed_from_repo(index, output_dir(".github", "workflows"), output_dir("reports"))
+        if seeded:
+            print(f"Seeded similarity index with {seeded} existing workflows")
+    return index
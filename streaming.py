@@ -0,0 +1,223 @@
+import re
+
+import yaml
+
+from github_actions_ai import fix_yaml_structure
+from repair import DEFAULT_TRIGGERS, local_fixes, schema_error
+from yaml_io import Loader
+
+KEY_PATTERN = re.compile(r"""^(?:"([^"]*)"|'([^']*)'|([^\s#'"\-\[{][^:#]*?))\s*:(?:\s|$)""")
+
+
+class StreamAbort(Exception):
+    """Raised when the partial output can no longer pass WorkflowSchema, even after local repair."""
+
+
+def mapping_key(text):
+    match = KEY_PATTERN.match(text)
+    if match is None:
+        return None
+    return next(group for group in match.groups() if group is not None)
+
+
+class FenceStripper:
+    """Turns streamed chunks into complete lines, dropping Markdown code fences."""
+
+    def __init__(self):
+        self._partial = ""
+        self._opened = False
+        self.closed = False
+
+    def _accept(self, line):
+        if self.closed:
+            return None
+        if not self._opened:
+            if not line.strip():
+                return None
+            self._opened = True
+            if line.strip().startswith("```"):
+                return None
+        elif line.strip() == "```":
+            self.closed = True
+            return None
+        return line
+
+    def feed(self, chunk):
+        self._partial += chunk
+        *complete, self._partial = self._partial.split("\n")
+        lines = []
+        for line in complete:
+            line = self._accept(line.rstrip("\r"))
+            if line is not None:
+                lines.append(line)
+        return lines
+
+    def finish(self):
+        line, self._partial = self._accept(self._partial.rstrip("\r")), ""
+        return [line] if line is not None else []
+
+
+class IncrementalWorkflowValidator:
+    """Checks a block-style workflow line by line as it streams in.
+
+    A top-level block is validated once the next top-level key starts, and a
+    job once the next job (or the end of ``jobs``) starts. Only definite schema
+    violations abort; fragments that do not parse on their own (for example
+    because they use anchors from elsewhere) are left to the final validation.
+    """
+
+    def __init__(self, on_event=print):
+        self.on_event = on_event
+        self.lines = []
+        self.seen_keys = set()
+        self._started = False
+        self._flow = False
+        self._top_key = None
+        self._top_start = 0
+        self._job_indent = None
+        self._job_id = None
+        self._job_start = 0
+        self._jobs_seen = 0
+
+    def feed_line(self, line):
+        index = len(self.lines)
+        self.lines.append(line)
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#") or self._flow:
+            return
+        indent = len(line) - len(line.lstrip(" "))
+        if indent == 0:
+            if not self._started:
+                self._started = True
+                if stripped == "---" or stripped.startswith("%"):
+                    self._started = False
+                    return
+                if stripped.startswith("{"):
+                    self._flow = True
+                    return
+            key = mapping_key(stripped)
+            if key is None:
+                raise StreamAbort(f"Line {index + 1} is not part of a YAML mapping: {stripped[:60]!r}")
+            self._complete_top(index)
+            self._top_key = key
+            self._top_start = index
+            self._job_indent = None
+            self._job_id = None
+            self._jobs_seen = 0
+            self.seen_keys.add(key)
+        elif self._top_key == "jobs":
+            if self._job_indent is None:
+                self._job_indent = indent
+            if indent == self._job_indent:
+                job_id = mapping_key(stripped)
+                if job_id is not None:
+                    self._complete_job(index)
+                    self._job_id = job_id
+                    self._job_start = index
+                    self._jobs_seen += 1
+
+    def _parse(self, start, end, indent=0):
+        text = "\n".join(line[indent:] for line in self.lines[start:end])
+        try:
+            return yaml.load(text, Loader=Loader)
+        except yaml.YAMLError:
+            return None
+
+    def _complete_job(self, end):
+        if self._job_id is None:
+            return
+        parsed = self._parse(self._job_start, end, self._job_indent)
+        job_id, self._job_id = self._job_id, None
+        if not isinstance(parsed, dict) or len(parsed) != 1:
+            return
+        job = next(iter(parsed.values()))
+        workflow = {"on": DEFAULT_TRIGGERS, "jobs": {job_id: job}}
+        fixed = ", fixed locally" if local_fixes(workflow) else ""
+        error = schema_error(workflow, f"jobs.{job_id}")
+        if error is not None:
+            raise StreamAbort(error)
+        job = workflow["jobs"][job_id]
+        steps = job.get('steps') or []
+        self.on_event(f"  ✔ job '{job_id}' complete ({len(steps)} steps, runs-on: {job['runs-on']}{fixed})")
+
+    def _complete_top(self, end):
+        key = self._top_key
+        if key is None:
+            return
+        if key == "jobs":
+            self._complete_job(end)
+            if self._jobs_seen:
+                # Every job was already validated on its own, so 'jobs' is a mapping.
+                self.on_event(f"  ✔ '{key}' section complete")
+                return
+        parsed = self._parse(self._top_start, end)
+        if isinstance(parsed, dict):
+            parsed = fix_yaml_structure(parsed)
+            if key == "jobs" and not isinstance(parsed.get("jobs"), dict):
+                raise StreamAbort("'jobs' must be a dictionary")
+            if key in ("on", "true", "True"):
+                workflow = {"on": parsed.get("on"), "jobs": {}}
+                local_fixes(workflow)
+                error = schema_error(workflow, "on")
+                if error is not None:
+                    raise StreamAbort(error)
+        self.on_event(f"  ✔ '{key}' section complete")
+
+    def finish(self):
+        if self._flow:
+            return
+        if not self._started:
+            raise StreamAbort("No YAML content was generated")
+        self._complete_top(len(self.lines))
+        self._top_key = None
+        # A missing 'on' is repaired locally with a default trigger.
+        if "jobs" not in self.seen_keys:
+            raise StreamAbort("Workflow is missing required 'jobs' section")
+
+
+def stream_generation(chain, query, on_event=print):
+    """Streams a completion, validating as it arrives, and returns the YAML text.
+
+    Raises ``StreamAbort`` as soon as the output provably cannot validate; the
+    underlying stream is closed so the request is cancelled.
+    """
+    stripper = FenceStripper()
+    validator = IncrementalWorkflowValidator(on_event)
+    stream = chain.stream({"query": query})
+    received = 0
+    try:
+        for chunk in stream:
+            text = getattr(chunk, "content", chunk)
+            received += len(text)
+            for line in stripper.feed(text):
+                validator.feed_line(line)
+            if stripper.closed:
+                break
+        for line in stripper.finish():
+            validator.feed_line(line)
+        validator.finish()
+    except StreamAbort as e:
+        on_event(f"⛔ Aborted generation after {received} characters: {e}")
+        raise
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    on_event(f"Received {received} characters")
+    return "\n".join(validator.lines).strip()
+
+
+def stream_cached(chain, llm, prompt, query, cache=None, refresh=False, on_event=print):
+    from github_actions_ai import extract_yaml_content
+    from langchain_core.messages import AIMessage
+
+    key = cache.key_for(llm, prompt, query) if cache is not None else None
+    if key is not None and not refresh:
+        content = cache.get(key)
+        if content is not None:
+            on_event("Using cached response")
+            return extract_yaml_content(AIMessage(content=content))
+    yaml_content = stream_generation(chain, query, on_event)
+    if key is not None:
+        cache.put_workflow(key, yaml_content, getattr(llm, "model_name", None))
+    return yaml_content
@@ -0,0 +1,30 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from batch import generate_batch
+from benchmarks.fake_llm import FakeWorkflowLLM
+from github_actions_ai import generate_yaml_prompt
+from similarity_index import SimilarityIndex
+
+STORED = "name: stored\non: push\njobs:\n  test:\n    runs-on: x\n    steps:\n      - run: pytest\n"
+FRESH = "name: fresh\non: push\njobs:\n  test:\n    runs-on: x\n    steps:\n      - run: pytest\n"
+
+
+@pytest.mark.parametrize("refresh", [False, True])
+def test_refresh_skips_reuse(tmp_path, monkeypatch, refresh):
+    monkeypatch.setenv("GHA_AI_OUTPUT_DIR", str(tmp_path))
+    index = SimilarityIndex(str(tmp_path / "index.jsonl"))
+    index.add("test my python app", STORED)
+    llm = FakeWorkflowLLM(response=FRESH)
+    prompt = generate_yaml_prompt(None)
+    results = io.StringIO()
+    asyncio.run(generate_batch(["test my python app"], prompt | llm, results, llm=llm, prompt=prompt,
+                               similarity=index, refresh=refresh))
+    result = json.loads(results.getvalue())
+    assert result["status"] == "ok"
+    assert result.get("reused", False) is not refresh
+    with open(result["workflow"], encoding="utf-8") as f:
+        assert f.read().startswith("name: fresh" if refresh else "name: stored")
@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+import deploy
+from benchmarks.fake_github import FakeGitHub, start_fake_github
+from deploy import DeployError, GitHubClient, commit_files
+
+REPO = "owner/app"
+
+
+@pytest.fixture
+def github():
+    started = []
+
+    def start(fake=None):
+        fake = fake or FakeGitHub()
+        fake.create_repo(REPO, files={"README.md": "hello", ".github/workflows/ci.yml": "old"})
+        server, url = start_fake_github(fake)
+        client = GitHubClient(api_url=url, pool_size=2)
+        started.append((server, client))
+        return fake, client
+
+    yield start
+    for server, client in started:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_single_file_uses_the_contents_api(github):
+    fake, client = github()
+    commit_files(client, REPO, "main", {".github/workflows/ci.yml": "new"}, "Update CI")
+    commit_files(client, REPO, "main", {".github/workflows/lint.yml": "lint"}, "Add lint")
+    files = fake.files(REPO)
+    assert files[".github/workflows/ci.yml"] == "new"
+    assert files[".github/workflows/lint.yml"] == "lint"
+    assert fake.commits(REPO) == 3
+
+
+def test_several_files_land_in_one_commit(github):
+    fake, client = github()
+    sha = commit_files(client, REPO, "main", {".github/workflows/ci.yml": "new", ".github/workflows/lint.yml": "lint"},
+                       "Update workflows")
+    assert fake.refs[(REPO, "main")] == sha
+    assert fake.commits(REPO) == 2
+    assert fake.files(REPO) == {"README.md": "hello", ".github/workflows/ci.yml": "new",
+                                ".github/workflows/lint.yml": "lint"}
+
+
+def test_unknown_branch_is_an_error(github):
+    _, client = github()
+    with pytest.raises(DeployError) as error:
+        commit_files(client, REPO, "missing", {"a.yml": "a", "b.yml": "b"}, "Add")
+    assert error.value.status == 404
+
+
+class TooManyRequests(FakeGitHub):
+    """Answers the first ``failures`` requests with 429."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    def handle(self, method, path, payload):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                return 429, {"message": "Too many requests"}
+        return super().handle(method, path, payload)
+
+
+def test_429_is_retried_with_backoff(github, monkeypatch):
+    waits = []
+    monkeypatch.setattr(deploy.time, "sleep", waits.append)
+    fake, client = github(TooManyRequests(failures=2))
+    commit_files(client, REPO, "main", {".github/workflows/ci.yml": "new"}, "Update CI")
+    assert waits == [1, 2]
+    assert fake.files(REPO)[".github/workflows/ci.yml"] == "new"
+
+
+class ExhaustedRateLimit(FakeGitHub):
+    """Spends the whole rate budget on the first request, which gets a 403."""
+
+    def __init__(self):
+        super().__init__()
+        self.exhausted = False
+
+    def take_rate_budget(self):
+        if not self.exhausted:
+            self.exhausted = True
+            with self.lock:
+                self.requests += 1
+            return False, 0, time.time() + 0.2
+        return super().take_rate_budget()
+
+
+def test_403_rate_limit_waits_for_the_reset(github):
+    fake, client = github(ExhaustedRateLimit())
+    started = time.monotonic()
+    commit_files(client, REPO, "main", {".github/workflows/ci.yml": "new"}, "Update CI")
+    assert time.monotonic() - started >= 0.1
+    assert fake.requests == 3
+    assert fake.files(REPO)[".github/workflows/ci.yml"] == "new"
+
+
+def test_rate_limit_errors_after_max_retries(github, monkeypatch):
+    monkeypatch.setattr(deploy.time, "sleep", lambda seconds: None)
+    _, client = github(TooManyRequests(failures=10))
+    with pytest.raises(DeployError) as error:
+        commit_files(client, REPO, "main", {".github/workflows/ci.yml": "new"}, "Update CI")
+    assert error.value.status == 429
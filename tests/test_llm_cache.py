@@ -0,0 +1,64 @@
+import os
+import time
+
+import llm_cache
+from llm_cache import ResponseCache
+
+
+def age(cache, key, seconds):
+    """Makes an entry look ``seconds`` old while keeping it recently used."""
+    path = cache._path(key)
+    os.utime(path, (time.time(), time.time() - seconds))
+
+
+def test_creating_a_cache_does_not_walk_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(ResponseCache, "evict", lambda self: (_ for _ in ()).throw(AssertionError("evicted")))
+    ResponseCache(str(tmp_path))
+
+
+def test_ttl_counts_from_creation_despite_hits(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60)
+    cache.put("ab" * 32, "content")
+    assert cache.get("ab" * 32) == "content"
+    age(cache, "ab" * 32, 120)
+    cache.evict()
+    assert not os.path.exists(cache._path("ab" * 32))
+
+
+def test_size_eviction_keeps_recently_hit_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=None)
+    old, new = "aa" * 32, "bb" * 32
+    cache.put(old, "x" * 100)
+    cache.put(new, "y" * 100)
+    os.utime(cache._path(new), (time.time() - 100, os.stat(cache._path(new)).st_mtime))
+    assert cache.get(old) == "x" * 100
+    cache.max_bytes = os.path.getsize(cache._path(old)) + 1
+    cache.evict()
+    assert os.path.exists(cache._path(old))
+    assert not os.path.exists(cache._path(new))
+
+
+def test_first_write_evicts_when_last_eviction_is_old(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(ResponseCache, "evict", lambda self: calls.append(1))
+    cache = ResponseCache(str(tmp_path))
+    marker = os.path.join(str(tmp_path), llm_cache.EVICTION_MARKER)
+    open(marker, "w").close()
+    cache.put("cc" * 32, "a")
+    assert calls == []
+    os.utime(marker, (0, 0))
+    other = ResponseCache(str(tmp_path))
+    other.put("dd" * 32, "b")
+    other.put("ee" * 32, "c")
+    assert calls == [1]
+
+
+def test_only_valid_workflows_are_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    valid = "```yaml\non: push\njobs:\n  test:\n    runs-on: x\n```"
+    assert cache.put_workflow("aa" * 32, valid)
+    assert cache.get("aa" * 32) == valid
+    assert not cache.put_workflow("bb" * 32, "Sure! Here is a workflow that runs your tests.")
+    assert not cache.put_workflow("cc" * 32, "on: push\njobs:\n  test:\n    steps: []\n")
+    assert not cache.put_workflow("dd" * 32, "on: [push\njobs: {")
+    assert cache.stats["writes"] == 1
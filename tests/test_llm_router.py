@@ -0,0 +1,40 @@
+import json
+
+from llm_router import Backend, load_router
+
+
+def write_config(tmp_path, config):
+    path = tmp_path / "backends.json"
+    path.write_text(json.dumps(config), encoding="utf-8")
+    return str(path)
+
+
+def test_breaker_options_only_on_backend(tmp_path):
+    path = write_config(tmp_path, {"backends": [
+        {"name": "a", "type": "local", "failure_threshold": 2, "reset_timeout": 5},
+        {"name": "b", "type": "local"},
+    ]})
+    a, b = load_router(path).backends
+    assert (a.breaker.failure_threshold, a.breaker.reset_timeout) == (2, 5)
+    assert (b.breaker.failure_threshold, b.breaker.reset_timeout) == (5, 30.0)
+
+
+def test_backend_breaker_options_override_top_level(tmp_path):
+    path = write_config(tmp_path, {"failure_threshold": 3, "backends": [
+        {"name": "a", "type": "local", "failure_threshold": 1},
+        {"name": "b", "type": "local"},
+    ]})
+    a, b = load_router(path).backends
+    assert a.breaker.failure_threshold == 1
+    assert b.breaker.failure_threshold == 3
+
+
+def test_cancelled_requests_are_not_latency_samples():
+    backend = Backend("a", llm=None)
+    for seconds in (1.0, 1.2, 1.1):
+        backend.succeeded(seconds)
+    for _ in range(10):
+        backend.cancelled()
+    assert len(backend.latency.samples) == 3
+    assert backend.latency.percentile(95) == 1.2
+    assert backend.stats["cancelled"] == 10
@@ -0,0 +1,86 @@
+import pytest
+
+from matrix import Matrix, job_matrix, value_label
+
+# https://docs.github.com/en/actions/using-jobs/using-a-matrix-for-your-jobs
+FRUIT_ANIMAL = {
+    "fruit": ["apple", "pear"],
+    "animal": ["cat", "dog"],
+    "include": [
+        {"color": "green"},
+        {"color": "pink", "animal": "cat"},
+        {"fruit": "apple", "shape": "circle"},
+        {"fruit": "banana"},
+        {"fruit": "banana", "animal": "cat"},
+    ],
+}
+OS_VERSION_EXCLUDE = {
+    "os": ["macos-latest", "windows-latest"],
+    "version": [12, 14, 16],
+    "environment": ["staging", "production"],
+    "exclude": [
+        {"os": "macos-latest", "version": 12, "environment": "production"},
+        {"os": "windows-latest", "version": 16},
+    ],
+}
+NEW_COMBINATION = {
+    "os": ["ubuntu-latest"],
+    "node": [14, 16],
+    "include": [{"os": "windows-latest", "node": 16}, {"os": "ubuntu-latest", "node": 16, "npm": 6}],
+}
+MATRICES = {
+    "fruit/animal include": FRUIT_ANIMAL,
+    "os/version exclude": OS_VERSION_EXCLUDE,
+    "include adds a combination": NEW_COMBINATION,
+    "exclude and include": {**OS_VERSION_EXCLUDE, "include": [{"os": "windows-latest", "version": 16}]},
+    "include only": {"include": [{"os": "ubuntu-latest"}, {"os": "windows-latest"}]},
+    "empty axis": {"os": [], "node": [14]},
+}
+
+
+def test_include_semantics_match_the_github_docs():
+    assert list(Matrix(FRUIT_ANIMAL)) == [
+        {"fruit": "apple", "animal": "cat", "color": "pink", "shape": "circle"},
+        {"fruit": "apple", "animal": "dog", "color": "green", "shape": "circle"},
+        {"fruit": "pear", "animal": "cat", "color": "pink"},
+        {"fruit": "pear", "animal": "dog", "color": "green"},
+        {"fruit": "banana"},
+        {"fruit": "banana", "animal": "cat"},
+    ]
+    assert len(Matrix(FRUIT_ANIMAL)) == 6
+
+
+def test_exclude_semantics_match_the_github_docs():
+    matrix = Matrix(OS_VERSION_EXCLUDE)
+    assert matrix.count() == 9
+    assert {"os": "windows-latest", "version": 16, "environment": "staging"} not in list(matrix)
+    assert matrix.axis_counts()["os"] == {"macos-latest": 5, "windows-latest": 4}
+
+
+def test_include_that_overwrites_an_axis_value_adds_a_combination():
+    assert list(Matrix(NEW_COMBINATION)) == [
+        {"os": "ubuntu-latest", "node": 14},
+        {"os": "ubuntu-latest", "node": 16, "npm": 6},
+        {"os": "windows-latest", "node": 16},
+    ]
+
+
+@pytest.mark.parametrize("matrix", MATRICES.values(), ids=MATRICES.keys())
+def test_counts_agree_with_iteration(matrix):
+    matrix = Matrix(matrix)
+    combinations = list(matrix)
+    assert matrix.count() == len(combinations)
+    expected = {name: {} for name in matrix.axes}
+    for combination in combinations:
+        for name in matrix.axes:
+            if name in combination:
+                label = value_label(combination[name])
+                expected[name][label] = expected[name].get(label, 0) + 1
+    assert matrix.axis_counts() == expected
+
+
+def test_expression_matrices_are_dynamic():
+    assert Matrix("${{ fromJSON(needs.setup.outputs.matrix) }}").dynamic
+    assert Matrix({"node": "${{ fromJSON(needs.setup.outputs.versions) }}"}).dynamic
+    assert not Matrix({"node": [14, 16]}).dynamic
+    assert job_matrix({"runs-on": "x"}) is None
@@ -0,0 +1,49 @@
+import os
+
+from github_actions_ai import find_repo_root, process_workflow
+from optimizer import optimize_file
+
+WORKFLOW = """name: CI
+on:
+  push: {}
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+      - run: cargo build
+"""
+
+
+def make_repo(root):
+    (root / ".git").mkdir(parents=True)
+    (root / "service").mkdir()
+    (root / "service" / "Cargo.lock").write_text("")
+    return root
+
+
+def test_find_repo_root(tmp_path):
+    repo = make_repo(tmp_path / "repo")
+    (repo / ".github" / "workflows").mkdir(parents=True)
+    assert find_repo_root(str(repo / ".github" / "workflows" / "ci.yml")) == str(repo)
+    assert find_repo_root(str(repo / "service")) == str(repo)
+
+
+def test_optimize_file_keys_caches_on_the_workflow_repository(tmp_path):
+    repo = make_repo(tmp_path / "repo")
+    workflows = repo / ".github" / "workflows"
+    workflows.mkdir(parents=True)
+    (workflows / "ci.yml").write_text(WORKFLOW)
+    assert "service/Cargo.lock" in optimize_file(str(workflows / "ci.yml")).yaml()
+
+
+def test_generation_keys_caches_on_the_target_repository(tmp_path, monkeypatch):
+    monkeypatch.setenv("GHA_AI_OUTPUT_DIR", str(tmp_path / "out"))
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "Cargo.lock").write_text("")
+    repo = make_repo(tmp_path / "repo")
+    outputs = process_workflow(WORKFLOW, "build a rust service", optimize=True, repo_root=str(repo))
+    with open(outputs["workflow"], encoding="utf-8") as f:
+        content = f.read()
+    assert "service/Cargo.lock" in content
+    assert os.path.dirname(outputs["workflow"]).startswith(str(tmp_path / "out"))
@@ -0,0 +1,88 @@
+import os
+import time
+
+from benchmarks.fake_llm import FakeWorkflowLLM
+from github_actions_ai import process_workflow
+from repair import (
+    DEFAULT_RUNNER,
+    MAX_ATTEMPTS,
+    failing_fragments,
+    local_fixes,
+    repair_workflow,
+    splice,
+)
+
+BROKEN_JOB = {"on": {"push": {}}, "jobs": {"test": "pytest"}}
+FIXED_JOB = """test:
+  runs-on: ubuntu-latest
+  steps:
+    - run: pytest
+"""
+
+
+def test_local_fixes_add_missing_runs_on():
+    workflow = {"on": ["push", "pull_request"], "jobs": {"test": {"steps": [{"run": "pytest"}]}}}
+    fixes = local_fixes(workflow)
+    assert workflow["on"] == {"push": {}, "pull_request": {}}
+    assert workflow["jobs"]["test"] == {"runs-on": DEFAULT_RUNNER, "steps": [{"run": "pytest"}]}
+    assert len(fixes) == 2
+
+
+def test_local_fixes_rename_runs_on_alias():
+    workflow = {"on": {"push": {}}, "jobs": {"test": {"runs_on": "macos-latest", "steps": []}}}
+    assert local_fixes(workflow) == ["job 'test': renamed 'runs_on' to 'runs-on'"]
+    assert list(workflow["jobs"]["test"]) == ["runs-on", "steps"]
+    assert workflow["jobs"]["test"]["runs-on"] == "macos-latest"
+
+
+def test_failing_fragments_hold_only_the_broken_job():
+    workflow = {"on": {"push": {}}, "jobs": {"lint": {"runs-on": "x"}, "test": "pytest"}}
+    fragment, errors = failing_fragments(workflow)
+    assert fragment == {"jobs": {"test": "pytest"}}
+    assert len(errors) == 1 and errors[0].startswith("jobs.test")
+
+
+def test_splice_accepts_answers_without_the_jobs_key():
+    workflow = {"on": {"push": {}}, "jobs": {"lint": {"runs-on": "x"}, "test": "pytest"}}
+    fixed = {"test": {"runs-on": "y"}}
+    assert splice(workflow, {"jobs": {"test": "pytest"}}, fixed)["jobs"] == {
+        "lint": {"runs-on": "x"}, "test": {"runs-on": "y"}}
+
+
+def test_repair_sends_only_the_failing_job_to_the_llm():
+    workflow = {"on": {"push": {}}, "jobs": {"lint": {"runs-on": "x", "steps": [{"run": "ruff ."}]},
+                                             "test": "pytest"}}
+    result = repair_workflow(workflow, FakeWorkflowLLM(response=FIXED_JOB))
+    assert result.valid and result.attempts == 1
+    assert result.workflow["jobs"]["lint"] == workflow["jobs"]["lint"]
+    assert result.workflow["jobs"]["test"]["steps"] == [{"run": "pytest"}]
+
+
+def test_repair_stops_after_max_attempts():
+    result = repair_workflow(BROKEN_JOB, FakeWorkflowLLM(response="test: still broken"))
+    assert not result.valid
+    assert result.attempts == MAX_ATTEMPTS
+
+
+def test_repair_stops_at_the_token_budget():
+    llm = FakeWorkflowLLM(response=FIXED_JOB)
+    result = repair_workflow(BROKEN_JOB, llm, max_tokens=10)
+    assert not result.valid
+    assert result.attempts == 0
+    assert repair_workflow(BROKEN_JOB, llm, max_attempts=0).attempts == 0
+
+
+def test_repair_stops_at_the_deadline():
+    llm = FakeWorkflowLLM(response=FIXED_JOB)
+    result = repair_workflow(BROKEN_JOB, llm, deadline=time.monotonic() - 1)
+    assert not result.valid
+    assert result.attempts == 0
+    assert "out of time" in result.error
+
+
+def test_process_workflow_writes_nothing_past_the_deadline(tmp_path, monkeypatch):
+    monkeypatch.setenv("GHA_AI_OUTPUT_DIR", str(tmp_path))
+    content = "on: push\njobs:\n  test:\n    runs-on: ubuntu-latest\n    steps:\n      - run: pytest\n"
+    assert process_workflow(content, "test", deadline=time.monotonic() - 1) is None
+    assert not os.path.exists(tmp_path / ".github")
+    assert process_workflow(content, "test", deadline=time.monotonic() + 60) is not None
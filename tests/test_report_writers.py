@@ -0,0 +1,43 @@
+import json
+
+from github_actions_ai import analyze_workflow, load_workflow_file
+from report_writers import Report, SarifReportWriter, repo_relative_uri
+
+WORKFLOW = """on: push
+jobs:
+  build:
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@main
+      - name: install
+        run: sudo apt-get install -y jq
+"""
+
+
+def sarif_results(tmp_path, workflow_path):
+    yaml_dict = load_workflow_file(str(workflow_path))
+    analysis = analyze_workflow(yaml_dict)
+    report = Report(yaml_dict, analysis["security"], analysis["efficiency"], analysis["quality"], "test",
+                    str(workflow_path))
+    output = SarifReportWriter().write(report, str(tmp_path / "report.sarif"))
+    with open(output, encoding="utf-8") as f:
+        return json.load(f)["runs"][0]["results"]
+
+
+def test_sarif_locations_are_repo_relative_with_step_lines(tmp_path):
+    workflows = tmp_path / "repo" / ".github" / "workflows"
+    workflows.mkdir(parents=True)
+    (tmp_path / "repo" / ".git").mkdir()
+    path = workflows / "ci.yml"
+    path.write_text(WORKFLOW, encoding="utf-8")
+    locations = [result["locations"][0]["physicalLocation"] for result in sarif_results(tmp_path, path)]
+    assert {location["artifactLocation"]["uri"] for location in locations} == {".github/workflows/ci.yml"}
+    assert {location["artifactLocation"]["uriBaseId"] for location in locations} == {"%SRCROOT%"}
+    assert sorted(location["region"]["startLine"] for location in locations) == [6, 7]
+
+
+def test_repo_relative_uri_without_git_uses_github_directory(tmp_path):
+    path = tmp_path / "mirror" / "org" / "repo" / ".github" / "workflows" / "ci.yml"
+    path.parent.mkdir(parents=True)
+    path.write_text(WORKFLOW, encoding="utf-8")
+    assert repo_relative_uri(str(path)) == ".github/workflows/ci.yml"
@@ -0,0 +1,63 @@
+import pytest
+
+from rules import RULES, Rule, RuleEngine, default_engine, run_rules
+
+MALFORMED = {
+    "null job": {"a": None},
+    "string job": {"a": "echo hi"},
+    "string steps": {"a": {"runs-on": "x", "steps": ["echo", None, {"run": "pytest"}]}},
+    "steps mapping": {"a": {"runs-on": "x", "steps": {"run": "pytest"}}},
+    "null strategy": {"a": {"runs-on": "x", "strategy": None, "steps": []}},
+    "non-string uses": {"a": {"runs-on": "x", "steps": [{"uses": 123}, {"uses": ["actions/checkout@main"]}]}},
+}
+
+
+@pytest.mark.parametrize("jobs", MALFORMED.values(), ids=MALFORMED.keys())
+def test_malformed_jobs_and_steps_are_skipped(jobs):
+    results = run_rules({"on": "push", "jobs": jobs})
+    assert set(results) == {"security", "efficiency", "quality"}
+
+
+def test_only_mapping_steps_are_counted():
+    results = run_rules({"on": "push", "jobs": MALFORMED["string steps"]})
+    assert results["efficiency"]["metrics"]["total_steps"] == 1
+    assert "Unit Testing" in results["quality"]["quality_gates"]
+
+
+def test_security_locations_count_malformed_steps():
+    workflow = {"on": "push", "jobs": {"a": {"runs-on": "x", "steps": [
+        "echo", {"uses": "actions/checkout@main"}, None, {"run": "sudo make"}]}}}
+    assert run_rules(workflow)["security"]["locations"]["critical"] == [["a", 1], ["a", 3]]
+
+
+def test_run_job_skips_malformed_steps():
+    engine = default_engine()
+    workflow = {"on": "push", "jobs": MALFORMED["string steps"]}
+    partials = engine.run_job(workflow, "a", workflow["jobs"]["a"])
+    assert engine.combine(workflow, [partials]) == engine.run(workflow)
+
+
+class PipUpgradeRule(Rule):
+    """The custom rule from the README, whose state is a list."""
+
+    name = "pip_upgrade"
+    keywords = ("pip install --upgrade pip",)
+
+    def start(self, yaml_dict):
+        return []
+
+    def visit_step(self, result, job_id, job, step, hits):
+        if "pip install --upgrade pip" in hits.run:
+            result.append(f"{job_id}: {step.get('name', 'unnamed')}")
+
+
+def test_combine_merges_list_states():
+    engine = RuleEngine(RULES + [PipUpgradeRule()])
+    workflow = {"on": "push", "jobs": {
+        job_id: {"runs-on": "x", "steps": [{"name": "up", "run": "pip install --upgrade pip"}]}
+        for job_id in ("a", "b")
+    }}
+    partials = [engine.run_job(workflow, job_id, job) for job_id, job in workflow["jobs"].items()]
+    combined = engine.combine(workflow, partials)
+    assert combined == engine.run(workflow)
+    assert combined["pip_upgrade"] == ["a: up", "b: up"]
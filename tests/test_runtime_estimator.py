@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from runtime_estimator import DurationTable, estimate_runtime
+
+TABLE = DurationTable({"job_overhead": 0})
+
+
+def estimate(jobs, minutes):
+    return estimate_runtime(jobs, job_minutes=minutes, table=TABLE)
+
+
+def test_critical_path_follows_the_needs_chain():
+    jobs = {"build": {}, "lint": {}, "test": {"needs": "build"}, "deploy": {"needs": ["test", "lint"]}}
+    result = estimate(jobs, {"build": 3, "lint": 5, "test": 4, "deploy": 1})
+    assert result["critical_path"] == ["build", "test", "deploy"]
+    assert result["critical_path_minutes"] == 8.0
+    assert result["runner_minutes"] == 13.0
+    assert result["max_parallel_jobs"] == 2
+
+
+def test_matrix_fan_out_multiplies_runner_minutes():
+    jobs = {"test": {"strategy": {"matrix": {"os": ["ubuntu", "windows"], "python": ["3.11", "3.12", "3.13"]}}}}
+    result = estimate(jobs, {"test": 2})
+    assert result["job_instances"] == 6
+    assert result["runner_minutes"] == 12.0
+    assert result["critical_path_minutes"] == 2.0
+    assert result["max_parallel_instances"] == 6
+    assert result["matrices"]["test"]["axis_minutes"]["os"] == {"ubuntu": 6.0, "windows": 6.0}
+
+
+def test_max_parallel_serializes_matrix_instances():
+    jobs = {"test": {"strategy": {"max-parallel": 2, "matrix": {"python": ["3.10", "3.11", "3.12"]}}},
+            "lint": {}}
+    result = estimate(jobs, {"test": 2, "lint": 1})
+    assert result["critical_path_minutes"] == 4.0
+    assert result["runner_minutes"] == 7.0
+    assert result["max_parallel_instances"] == 3
+    assert result["max_parallel_jobs"] == 2
+
+
+def test_cycles_are_reported_without_their_downstream_jobs():
+    jobs = {"a": {"needs": "b"}, "b": {"needs": "a"}, "c": {"needs": "a"}, "d": {}}
+    result = estimate(jobs, {"a": 1, "b": 1, "c": 1, "d": 2})
+    assert result["cycles"] == ["a", "b"]
+    assert result["unreachable_jobs"] == ["a", "b", "c"]
+    assert result["critical_path"] == ["d"]
+    assert result["runner_minutes"] == 2.0
+
+
+def test_missing_needs_make_jobs_unreachable():
+    jobs = {"build": {}, "test": {"needs": ["build", "setup"]}, "deploy": {"needs": "test"}}
+    result = estimate(jobs, {"build": 1, "test": 1, "deploy": 1})
+    assert result["missing_dependencies"] == ["test needs unknown job 'setup'"]
+    assert result["unreachable_jobs"] == ["deploy", "test"]
+    assert result["critical_path"] == ["build"]
+    assert result["runner_minutes"] == 1.0
+
+
+def test_steps_are_timed_with_the_table():
+    jobs = {"test": {"steps": [{"uses": "actions/checkout@v4"}, {"run": "pip install -r requirements.txt"},
+                               {"run": "pytest"}, {"run": "echo done"}, "malformed"]}}
+    assert estimate_runtime(jobs, table=TABLE)["critical_path_minutes"] == pytest.approx(0.2 + 1.0 + 3.0 + 0.5)
+
+
+def test_history_medians(tmp_path):
+    path = tmp_path / "history.jsonl"
+    records = [{"uses": "actions/setup-node@v4", "seconds": 30}, {"uses": "actions/setup-node@v3", "seconds": 90},
+               {"uses": "actions/setup-node@v4", "seconds": 60}, {"run": "npm ci", "minutes": 1.0},
+               {"run": "npm ci", "minutes": 3.0}, {"run": "make"}]
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+    table = DurationTable.load(str(path))
+    assert table.actions["actions/setup-node"] == 1.0
+    assert table.commands["npm ci"] == 2.0
+    assert table.step_minutes({"run": "npm ci"}) == 2.0
+    assert table.fingerprint != DurationTable().fingerprint
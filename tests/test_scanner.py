@@ -0,0 +1,53 @@
+import json
+
+import runtime_estimator
+import yaml_io
+from scanner import analyze_chunk, main, scan
+from workflow_store import extract_files
+
+WORKFLOW = "on: push\njobs:\n  a:\n    runs-on: x\n    steps:\n      - run: pytest\n"
+
+
+def critical_path(output):
+    with open(output, encoding="utf-8") as f:
+        return json.loads(f.readline())["analysis"]["efficiency"]["runtime"]["critical_path_minutes"]
+
+
+def test_rescan_reanalyzes_when_durations_change(tmp_path, monkeypatch):
+    workflows = tmp_path / "repo" / ".github" / "workflows"
+    workflows.mkdir(parents=True)
+    (workflows / "ci.yml").write_text(WORKFLOW, encoding="utf-8")
+    index, output = str(tmp_path / "index.sqlite"), str(tmp_path / "out.jsonl")
+    monkeypatch.setattr(runtime_estimator, "_durations", runtime_estimator.DurationTable())
+
+    assert scan(str(tmp_path / "repo"), output, index, workers=1)["analyzed"] == 1
+    assert scan(str(tmp_path / "repo"), output, index, workers=1)["unchanged"] == 1
+    before = critical_path(output)
+
+    runtime_estimator.set_durations(runtime_estimator.DurationTable({"commands": {"pytest": 50}}))
+    stats = scan(str(tmp_path / "repo"), output, index, workers=1)
+    assert (stats["analyzed"], stats["unchanged"]) == (1, 0)
+    assert critical_path(output) > before
+
+
+def test_bulk_parsing_bypasses_the_document_cache(tmp_path, monkeypatch):
+    path = tmp_path / "ci.yml"
+    path.write_text(WORKFLOW, encoding="utf-8")
+    yaml_io.document_cache.clear()
+    monkeypatch.setattr(yaml_io.DocumentCache, "put", lambda *args: (_ for _ in ()).throw(AssertionError("cached")))
+    assert analyze_chunk([(str(path), None)])[0]["status"] == "ok"
+    assert extract_files([str(path)])[0][2] is None
+
+
+def test_durations_option(tmp_path, monkeypatch):
+    workflows = tmp_path / "repo" / ".github" / "workflows"
+    workflows.mkdir(parents=True)
+    (workflows / "ci.yml").write_text(WORKFLOW, encoding="utf-8")
+    table = tmp_path / "durations.json"
+    table.write_text(json.dumps({"commands": {"pytest": 50}}), encoding="utf-8")
+    monkeypatch.setenv("GHA_AI_DURATIONS", "")
+    monkeypatch.setattr(runtime_estimator, "_durations", None)
+    output = str(tmp_path / "out.jsonl")
+    assert main([str(tmp_path / "repo"), "--output", output, "--index", str(tmp_path / "index.sqlite"),
+                 "--workers", "1", "--durations", str(table)]) == 0
+    assert critical_path(output) > 50
@@ -0,0 +1,91 @@
+import http.client
+import json
+import threading
+import time
+
+from benchmarks.fake_llm import FakeWorkflowLLM
+from server import WorkflowService, create_server
+from similarity_index import SimilarityIndex
+
+WORKFLOW = """name: CI
+on:
+  push: {}
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - run: pytest
+"""
+
+
+def test_generate_seeds_and_reuses_the_similarity_index(tmp_path):
+    calls = []
+
+    def llm_factory():
+        calls.append(1)
+        return FakeWorkflowLLM(response=WORKFLOW)
+
+    index = SimilarityIndex(str(tmp_path / "index.jsonl"))
+    service = WorkflowService(llm_factory=llm_factory, similarity=index)
+
+    first = service.generate({"query": "Test my Python application with pytest"})
+    assert first["valid"] and "reused" not in first
+    assert index.queries == {"Test my Python application with pytest"}
+
+    second = service.generate({"query": "test python app with pytest"})
+    assert second["valid"]
+    assert second["reused"] == {"query": "Test my Python application with pytest", "similarity": 1.0}
+    assert second["yaml"] == first["yaml"]
+    assert len(calls) == 1
+
+
+def serve(**options):
+    server = create_server(port=0, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def post(server, path, body, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    connection.request("POST", path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_timed_out_requests_are_not_run_later():
+    server = serve(workers=1, timeout=0.2, llm_factory=None)
+    calls = []
+
+    def analyze(payload):
+        calls.append(payload)
+        time.sleep(0.5)
+        return {}
+
+    server.app["service"].analyze = analyze
+    try:
+        clients = [threading.Thread(target=post, args=(server, "/analyze", json.dumps({"yaml": str(i)})))
+                   for i in range(2)]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        time.sleep(0.6)
+        assert len(calls) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_malformed_content_length_is_a_bad_request():
+    server = serve(llm_factory=None)
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        connection.putrequest("POST", "/analyze")
+        connection.putheader("Content-Length", "abc")
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == 400
+        assert "Content-Length" in json.loads(response.read())["error"]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,43 @@
+import json
+import threading
+
+from similarity_index import SimilarityIndex, seed_from_repo
+
+WORKFLOW = """name: CI
+on:
+  push: {}
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    steps:
+      - run: pytest
+"""
+
+
+def test_seeding_keeps_the_full_query_of_truncated_file_names(tmp_path):
+    query = "Create and test a Python application with pytest on every push"
+    workflows, reports = tmp_path / "workflows", tmp_path / "reports"
+    workflows.mkdir()
+    reports.mkdir()
+    (workflows / "create-and-test-a-python-appli-0123abcd.yml").write_text(WORKFLOW)
+    (workflows / "create-and-test-a-python-appli-4567cdef.yml").write_text(WORKFLOW.replace("pytest", "tox"))
+    (reports / "workflow-analysis.json").write_text(json.dumps(
+        {"query": query, "workflow_path": str(workflows / "create-and-test-a-python-appli-0123abcd.yml")}))
+    (workflows / "lint-code-89abcdef.yml").write_text(WORKFLOW)
+
+    index = SimilarityIndex(str(tmp_path / "index.jsonl"))
+    assert seed_from_repo(index, str(workflows), str(reports)) == 2
+    assert index.queries == {query, "lint code"}
+
+
+def test_concurrent_adds_write_each_query_once(tmp_path):
+    path = tmp_path / "index.jsonl"
+    index = SimilarityIndex(str(path))
+    threads = [threading.Thread(target=index.add, args=(f"build project {i % 10}", WORKFLOW)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    lines = path.read_text().splitlines()
+    assert len(lines) == 10
+    assert len(SimilarityIndex(str(path))) == 10
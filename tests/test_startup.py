@@ -0,0 +1,46 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Generous enough for a slow CI runner; loading the LLM stack alone takes longer.
+STARTUP_BUDGET_SECONDS = 1.5
+HEAVY_MODULES = ("langchain", "langchain_core", "langchain_openai", "langchain_community", "openai", "pydantic")
+
+PROBE = """
+import json, sys
+sys.argv = ["github_actions_ai.py", "analyze", "--no-report", sys.argv[1]]
+import github_actions_ai
+try:
+    github_actions_ai.main()
+except SystemExit:
+    pass
+heavy = sorted(name for name in sys.modules if name.split(".")[0] in {modules!r})
+print(json.dumps(heavy))
+"""
+
+
+def test_analyze_does_not_load_llm_stack(tmp_path):
+    workflow = tmp_path / "ci.yml"
+    workflow.write_text("on: push\njobs:\n  test:\n    runs-on: ubuntu-latest\n    steps:\n      - run: pytest\n",
+                        encoding="utf-8")
+    probe = PROBE.format(modules=set(HEAVY_MODULES))
+    completed = subprocess.run([sys.executable, "-c", probe, str(workflow)], cwd=ROOT, capture_output=True,
+                               text=True, check=True)
+    assert json.loads(completed.stdout.splitlines()[-1]) == []
+
+
+def test_analyze_startup_time(tmp_path):
+    workflow = tmp_path / "ci.yml"
+    workflow.write_text("on: push\njobs:\n  test:\n    runs-on: ubuntu-latest\n    steps:\n      - run: pytest\n",
+                        encoding="utf-8")
+    command = [sys.executable, os.path.join(ROOT, "github_actions_ai.py"), "analyze", "--no-report", str(workflow)]
+    subprocess.run(command, capture_output=True, check=True)  # warm the filesystem and bytecode caches
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True)
+        timings.append(time.perf_counter() - started)
+    assert min(timings) < STARTUP_BUDGET_SECONDS, f"analyze took {min(timings):.2f}s to start"
@@ -0,0 +1,35 @@
+import pytest
+
+from benchmarks.fake_llm import FakeWorkflowLLM
+from github_actions_ai import generate_yaml_prompt
+from streaming import IncrementalWorkflowValidator, StreamAbort, stream_generation
+
+
+def stream(response):
+    events = []
+    chain = generate_yaml_prompt(None) | FakeWorkflowLLM(response=response, chunk_size=7)
+    return stream_generation(chain, "test", events.append), events
+
+
+def test_non_mapping_top_level_line_aborts():
+    with pytest.raises(StreamAbort, match="not part of a YAML mapping"):
+        stream("name: CI\nHere is your workflow\njobs:\n  test:\n    runs-on: x\n")
+
+
+def test_missing_on_does_not_abort():
+    text, events = stream("name: CI\njobs:\n  test:\n    steps:\n      - run: pytest\n")
+    assert text.startswith("name: CI")
+    assert any("job 'test' complete" in event and "fixed locally" in event for event in events)
+
+
+def test_job_that_is_not_a_mapping_aborts():
+    with pytest.raises(StreamAbort):
+        stream("on: push\njobs:\n  test: pytest\n  lint:\n    runs-on: x\n")
+
+
+def test_missing_jobs_aborts_at_the_end():
+    validator = IncrementalWorkflowValidator(on_event=lambda event: None)
+    for line in ["name: CI", "on: push"]:
+        validator.feed_line(line)
+    with pytest.raises(StreamAbort, match="'jobs'"):
+        validator.finish()
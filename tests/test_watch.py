@@ -0,0 +1,27 @@
+import rules
+from watch import WatchSession
+
+
+class FailingRule(rules.Rule):
+    name = "failing"
+
+    def visit_job(self, result, job_id, job):
+        raise KeyError(job_id)
+
+
+def test_update_survives_half_edited_file(tmp_path):
+    path = tmp_path / "ci.yml"
+    session = WatchSession()
+    path.write_text("on: push\njobs:\n  a:\n", encoding="utf-8")
+    assert session.update(str(path)) is not None
+    path.write_text("on: push\njobs:\n  a:\n    runs-on: x\n    steps:\n      - echo\n", encoding="utf-8")
+    assert session.update(str(path))["efficiency"]["metrics"]["total_steps"] == 0
+
+
+def test_update_reports_rule_errors_and_keeps_going(tmp_path, capsys):
+    path = tmp_path / "ci.yml"
+    path.write_text("on: push\njobs:\n  a:\n    runs-on: x\n", encoding="utf-8")
+    session = WatchSession(engine=rules.RuleEngine(rules.RULES + [FailingRule()]))
+    assert session.update(str(path)) is None
+    assert "analysis failed in job 'a'" in capsys.readouterr().out
+    assert not session.jobs.entries
@@ -0,0 +1,126 @@
+import pytest
+
+import workflow_store
+from workflow_store import MappedStrings, WorkflowStore
+
+CI = """name: CI
+on: push
+concurrency: ci
+jobs:
+  test:
+    runs-on: ubuntu-latest
+    strategy:
+      matrix:
+        python: ["3.11", "3.12"]
+    steps:
+      - uses: actions/checkout@master
+      - uses: actions/setup-python@v5
+      - run: pip install -r requirements.txt
+      - run: sudo pytest
+"""
+RELEASE = """name: Release
+on: push
+jobs:
+  build:
+    runs-on: windows-latest
+    timeout-minutes: 10
+    steps:
+      - uses: actions/checkout@8e5e7e5ab8b370d6c329ec480221332ada57f0ab
+      - uses: actions/cache@v4
+        with:
+          path: ~/.npm
+          key: npm
+      - run: npm ci
+"""
+
+BACKENDS = [
+    pytest.param(False, id="array"),
+    pytest.param(True, id="numpy", marks=pytest.mark.skipif(workflow_store.numpy is None,
+                                                            reason="numpy is not installed")),
+]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "mirror" / ".github" / "workflows"
+    root.mkdir(parents=True)
+    (root / "ci.yml").write_text(CI)
+    (root / "release.yml").write_text(RELEASE)
+    return tmp_path / "mirror"
+
+
+def check_rows(store):
+    assert [row.name for row in store.workflows] == ["CI", "Release"]
+    ci, release = store.workflows
+    assert ci.has_concurrency and not release.has_concurrency
+    assert [job.job_id for job in ci.jobs] == ["test"]
+    test = ci.jobs[0]
+    assert test.runs_on == "ubuntu-latest"
+    assert test.matrix_size == 2 and test.has_matrix
+    assert [step.action for step in test.steps] == ["actions/checkout", "actions/setup-python", "", ""]
+    assert test.steps[0].ref == "master" and "@master" in test.steps[0].keywords
+    assert test.steps[3].workflow.name == "CI"
+    build = release.jobs[0]
+    assert build.has_timeout and build.uses_cache
+    assert build.steps[0].pinned
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_build_save_open_round_trip(corpus, tmp_path, use_numpy):
+    built = WorkflowStore.build([str(corpus)], workers=1, use_numpy=use_numpy)
+    check_rows(built)
+    path = built.save(str(tmp_path / "workflows.store"))
+    store = WorkflowStore.open(path, use_numpy=use_numpy)
+    try:
+        check_rows(store)
+        assert store.summary() == dict(built.summary(), backend=store.ops.name)
+        assert store.ops.count(store.filter_steps(action="actions/checkout")) == 2
+        assert store.ops.count(store.filter_steps(keyword="sudo", field="run_hits")) == 1
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_summary(corpus, use_numpy):
+    summary = WorkflowStore.build([str(corpus)], workers=1, use_numpy=use_numpy).summary()
+    assert (summary["workflows"], summary["jobs"], summary["steps"]) == (2, 2, 7)
+    assert summary["steps_using_master"] == pytest.approx(1 / 7)
+    assert summary["actions_pinned_to_sha"] == pytest.approx(1 / 4)
+    assert summary["steps_with_sudo"] == pytest.approx(1 / 7)
+    assert summary["jobs_with_cache"] == 0.5
+    assert summary["jobs_with_timeout"] == 0.5
+    assert summary["workflows_with_concurrency"] == 0.5
+    assert summary["matrix_jobs_total"] == 3
+    assert summary["uncached_install_steps"] == 1
+    assert summary["top_runners"] == [("ubuntu-latest", 1), ("windows-latest", 1)]
+    assert summary["uncached_actions"] == [("actions/setup-python", 1)]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_empty_store(tmp_path, use_numpy):
+    built = WorkflowStore.build([str(tmp_path)], workers=1, use_numpy=use_numpy)
+    store = WorkflowStore.open(built.save(str(tmp_path / "empty.store")), use_numpy=use_numpy)
+    try:
+        summary = store.summary()
+        assert (summary["workflows"], summary["jobs"], summary["steps"]) == (0, 0, 0)
+        assert summary["steps_using_master"] == 0.0
+        assert summary["top_actions"] == []
+        assert list(store.steps) == []
+    finally:
+        store.close()
+
+
+def test_mapped_strings_after_reopening(corpus, tmp_path):
+    built = WorkflowStore.build([str(corpus)], workers=1, use_numpy=False)
+    store = WorkflowStore.open(built.save(str(tmp_path / "workflows.store")), use_numpy=False)
+    try:
+        assert isinstance(store.strings, MappedStrings)
+        assert list(store.strings) == list(built.strings)
+        checkout = store.strings.id_of("actions/checkout")
+        assert checkout == built.strings.id_of("actions/checkout")
+        assert store.strings[checkout] == "actions/checkout"
+        assert store.strings.id_of("missing") is None
+        with pytest.raises(TypeError):
+            store.strings.intern("new")
+    finally:
+        store.close()
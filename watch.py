@@ -0,0 +1,298 @@
+import argparse
+import collections
+import ctypes
+import ctypes.util
+import hashlib
+import io
+import json
+import os
+import select
+import struct
+import time
+
+import yaml
+
+from github_actions_ai import find_workflow_files, load_workflow_file, output_dir
+from rules import default_engine, workflow_jobs
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+# Only completed writes, renames (editors that save through a temporary file) and deletions,
+# so a file is never read halfway through being written.
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+DEBOUNCE_SECONDS = 0.02
+JOB_CACHE_SIZE = 4096
+
+# What each markdown section is rendered from; a section is only re-rendered when these change.
+SECTION_INPUTS = {
+    "build_quality": lambda report: report.quality,
+    "security": lambda report: report.security,
+    "efficiency": lambda report: report.efficiency,
+    "implementation": lambda report: (getattr(report.yaml_dict, "source", None) or report.yaml_dict,
+                                      report.quality, report.efficiency),
+    "performance": lambda report: (report.efficiency, report.quality),
+    "best_practices": lambda report: (report.quality, report.efficiency),
+    "references": lambda report: None,
+}
+
+
+def is_workflow(path):
+    return path.endswith((".yml", ".yaml"))
+
+
+class InotifyWatcher:
+    """Reports changed files in one directory through Linux inotify (via ctypes)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+
+    def _read(self, changed):
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            if is_workflow(name):
+                changed.add(os.path.join(self.directory, name))
+
+    def poll(self, timeout):
+        changed = set()
+        if select.select([self.fd], [], [], timeout)[0]:
+            self._read(changed)
+            # Editors often write a file in several steps; collect them as one change.
+            while select.select([self.fd], [], [], DEBOUNCE_SECONDS)[0]:
+                self._read(changed)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback that compares mtimes and sizes of the workflow files every ``interval`` seconds."""
+
+    def __init__(self, directory, interval=0.25):
+        self.directory = directory
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and is_workflow(entry.name):
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            if current != self.snapshot:
+                # Wait for the files to stop changing so a write in progress is not read.
+                settled = current
+                while True:
+                    time.sleep(DEBOUNCE_SECONDS)
+                    current = self._scan()
+                    if current == settled:
+                        break
+                    settled = current
+                changed = {path for path in current.keys() | self.snapshot.keys()
+                           if current.get(path) != self.snapshot.get(path)}
+                self.snapshot = current
+                return changed
+            if time.monotonic() >= deadline:
+                return set()
+            time.sleep(min(self.interval, max(0.0, deadline - time.monotonic())))
+
+    def close(self):
+        pass
+
+
+def open_watcher(directory, polling=False, interval=0.25):
+    if not polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), polling every {interval}s")
+    return PollingWatcher(directory, interval)
+
+
+class AnalysisError(Exception):
+    """Raised when the rules fail on a job; the watcher reports it and keeps running."""
+
+
+def job_hash(job_id, job):
+    return hashlib.blake2b(repr((job_id, job)).encode("utf-8"), digest_size=16).digest()
+
+
+class JobResultCache:
+    """Per-job rule states keyed by a hash of the job subtree, shared by every watched file."""
+
+    def __init__(self, engine=None, max_entries=JOB_CACHE_SIZE):
+        self.engine = engine or default_engine()
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+
+    def analyze(self, yaml_dict):
+        """Returns (analysis, number of jobs that had to be re-analyzed, number of jobs)."""
+        partials = []
+        analyzed = 0
+        for job_id, job in workflow_jobs(yaml_dict):
+            key = job_hash(job_id, job)
+            state = self.entries.get(key)
+            if state is None:
+                try:
+                    state = self.engine.run_job(yaml_dict, job_id, job)
+                except Exception as e:
+                    raise AnalysisError(f"job '{job_id}': {type(e).__name__}: {e}") from e
+                analyzed += 1
+                self.entries[key] = state
+                if len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+            else:
+                self.entries.move_to_end(key)
+            partials.append(state)
+        return self.engine.combine(yaml_dict, partials), analyzed, len(partials)
+
+
+def digest(value):
+    return hashlib.blake2b(json.dumps(value, default=str).encode("utf-8"), digest_size=16).digest()
+
+
+class ReportSections:
+    """Keeps the rendered markdown sections of one report and re-renders only those whose inputs changed."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.rendered = {}
+
+    def write(self, report, path):
+        changed = []
+        parts = []
+        for name in self.writer.sections:
+            key = digest(SECTION_INPUTS[name](report)) if name in SECTION_INPUTS else None
+            cached = self.rendered.get(name)
+            if cached is None or key is None or cached[0] != key:
+                buffer = io.StringIO()
+                getattr(self.writer, name)(report, buffer)
+                cached = self.rendered[name] = (key, buffer.getvalue())
+                if key is not None:
+                    changed.append(name)
+            parts.append(cached[1])
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(parts))
+        return changed
+
+
+class WatchSession:
+    def __init__(self, report_dir=None, report_options=None, engine=None):
+        from report_writers import MarkdownReportWriter
+
+        self.report_dir = report_dir
+        self.writer_options = dict(report_options or {})
+        self.formats = self.writer_options.pop("formats", None) or ["markdown"]
+        self.markdown_class = MarkdownReportWriter
+        self.jobs = JobResultCache(engine)
+        self.reports = {}
+
+    def update(self, path):
+        from report_writers import Report, write_reports
+
+        started = time.perf_counter()
+        if not os.path.exists(path):
+            self.reports.pop(path, None)
+            print(f"🗑️  {path} removed")
+            return None
+        try:
+            yaml_dict = load_workflow_file(path)
+        except (OSError, yaml.YAMLError, ValueError) as e:
+            print(f"❌ {path}: {e}")
+            return None
+        try:
+            analysis, analyzed, jobs = self.jobs.analyze(yaml_dict)
+            sections = []
+            if self.report_dir:
+                os.makedirs(self.report_dir, exist_ok=True)
+                stem = os.path.splitext(os.path.basename(path))[0]
+                base = os.path.join(self.report_dir, f"workflow-analysis-{stem}")
+                report = Report(yaml_dict, analysis["security"], analysis["efficiency"], analysis["quality"],
+                                f"Analysis of {path}", path)
+                if "markdown" in self.formats:
+                    if path not in self.reports:
+                        self.reports[path] = ReportSections(self.markdown_class(**self.writer_options))
+                    sections = self.reports[path].write(report, base + self.markdown_class.extension)
+                others = [name for name in self.formats if name != "markdown"]
+                if others:
+                    write_reports(report, base, others, **self.writer_options)
+        except AnalysisError as e:
+            print(f"❌ {path}: analysis failed in {e}")
+            return None
+        except Exception as e:
+            # A half-edited file must not stop the watcher; the next save is analyzed again.
+            print(f"❌ {path}: analysis failed: {type(e).__name__}: {e}")
+            return None
+        elapsed = (time.perf_counter() - started) * 1000
+        security = analysis["security"]
+        print(f"🔄 {path}: {len(security['critical'])} critical, {len(security['warning'])} warnings, "
+              f"{len(security['info'])} info | re-analyzed {analyzed}/{jobs} jobs"
+              f"{', updated ' + ', '.join(sections) if sections else ''} | {elapsed:.1f} ms")
+        for issue in security["critical"]:
+            print(f"  {issue}")
+        return analysis
+
+
+def watch(directory, report_dir=None, report_options=None, polling=False, interval=0.25):
+    if not os.path.isdir(directory):
+        print(f"❌ {directory} is not a directory")
+        return 1
+    session = WatchSession(report_dir, report_options)
+    watcher = open_watcher(directory, polling, interval)
+    for path in find_workflow_files([directory]):
+        session.update(path)
+    print(f"👀 Watching {directory} for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            for path in sorted(watcher.poll(1.0)):
+                session.update(path)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
+
+
+def main(argv=None):
+    from github_actions_ai import add_report_arguments, report_options_from_args
+
+    parser = argparse.ArgumentParser(
+        prog="github_actions_ai.py watch",
+        description="Re-analyze workflows on every save, reusing results of unchanged jobs",
+    )
+    parser.add_argument("directory", nargs="?", default=os.path.join(".github", "workflows"),
+                        help="Directory of workflow files to watch (default: .github/workflows)")
+    parser.add_argument("--report-dir", default=output_dir("reports"), help="Directory analysis reports are written to")
+    parser.add_argument("--no-report", action="store_true", help="Only print findings, do not write reports")
+    parser.add_argument("--poll", action="store_true", help="Poll for changes instead of using inotify")
+    parser.add_argument("--interval", type=float, default=0.25, help="Seconds between polls with --poll")
+    add_report_arguments(parser)
+    args = parser.parse_args(argv)
+    return watch(args.directory, None if args.no_report else args.report_dir, report_options_from_args(args),
+                 args.poll, args.interval)
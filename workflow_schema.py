@@ -0,0 +1,28 @@
+from pydantic import BaseModel, field_validator
+from typing import Optional, Dict, Any
+
+class WorkflowSchema(BaseModel):
+    name: Optional[str] = None
+    on: Dict[str, Any]
+    jobs: Dict[str, Dict[str, Any]]
+
+    @field_validator('on', mode='before')
+    @classmethod
+    def valid_triggers(cls, value):
+        if isinstance(value, dict):
+            return value
+        elif isinstance(value, str):
+            return {value: {}}
+        raise ValueError("Invalid trigger event")
+
+    @field_validator('jobs')
+    @classmethod
+    def valid_jobs(cls, value):
+        if not isinstance(value, dict):
+            raise ValueError("Jobs must be a dictionary")
+        for job_config in value.values():
+            if not isinstance(job_config, dict):
+                raise ValueError("Each job must be a dictionary of configurations")
+            if 'runs-on' not in job_config:
+                raise ValueError("Each job must specify 'runs-on'")
+        return value
@@ -0,0 +1,737 @@
+import argparse
+import array
+import collections
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from github_actions_ai import find_workflow_files, parse_workflow
+from matrix import job_matrix
+from rules import default_engine
+from runtime_estimator import step_uses_cache
+
+MAGIC = b"GHAWFS01"
+PREAMBLE = struct.Struct("<8sQQ")
+ALIGNMENT = 8
+STEP_RUN, STEP_USES, STEP_CACHE, STEP_PINNED, STEP_INSTALLS = 1, 2, 4, 8, 16
+JOB_CACHE, JOB_MATRIX, JOB_TIMEOUT, JOB_NEEDS, JOB_DYNAMIC_MATRIX = 1, 2, 4, 8, 16
+WORKFLOW_CONCURRENCY, WORKFLOW_PERMISSIONS = 1, 2
+SHA_REF = re.compile(r"^[0-9a-f]{40}$")
+
+# (column, typecode) per table; "I" columns of string tables hold StringTable ids.
+SCHEMA = {
+    "workflows": (("path", "I"), ("name", "I"), ("first_job", "I"), ("job_count", "I"),
+                  ("first_step", "I"), ("step_count", "I"), ("flags", "B")),
+    "jobs": (("workflow", "I"), ("job_id", "I"), ("runs_on", "I"), ("first_step", "I"), ("step_count", "I"),
+             ("matrix_size", "I"), ("flags", "B")),
+    "steps": (("workflow", "I"), ("job", "I"), ("name", "I"), ("action", "I"), ("ref", "I"),
+              ("run_hits", "Q"), ("uses_hits", "Q"), ("hits", "Q"), ("flags", "B")),
+}
+
+
+def engine_keywords(engine=None):
+    """Keywords of the rule engine in a fixed order; bit ``i`` of a hits column is keyword ``i``."""
+    engine = engine or default_engine()
+    keywords = sorted({kw for rule in engine.rules for kw in rule.keywords})
+    if len(keywords) > 64:
+        raise ValueError(f"{len(keywords)} rule keywords do not fit a 64-bit hits column")
+    return keywords
+
+
+def split_action(uses):
+    """``owner/repo@ref`` -> (``owner/repo``, ``ref``); local and docker actions have no ref."""
+    if uses.startswith(("./", "docker://")) or "@" not in uses:
+        return uses, ""
+    action, _, ref = uses.rpartition("@")
+    return action, ref
+
+
+def extract_workflow(yaml_dict, engine=None, keywords=None):
+    """Flattens one workflow into plain tuples with the rule engine's per-step keyword scan."""
+    from optimizer import SETUP_PATTERN
+
+    engine = engine or default_engine()
+    bits = {kw: 1 << i for i, kw in enumerate(keywords or engine_keywords(engine))}
+    masks = {}
+
+    def mask(found):
+        found = frozenset(found)
+        if found not in masks:
+            masks[found] = sum(bits.get(kw, 0) for kw in found)
+        return masks[found]
+
+    jobs = []
+    for job_id, job in (yaml_dict.get('jobs') or {}).items():
+        if not isinstance(job, dict):
+            continue
+        steps = []
+        job_flags = 0
+        for step in job.get('steps', []) or []:
+            if not isinstance(step, dict):
+                continue
+            hits = engine.scan_step(step)
+            uses = str(step.get('uses') or '')
+            action, ref = split_action(uses)
+            run = str(step.get('run') or '')
+            flags = (STEP_RUN if run else 0) | (STEP_USES if uses else 0)
+            if step_uses_cache(step):
+                flags |= STEP_CACHE
+                job_flags |= JOB_CACHE
+            if SHA_REF.match(ref):
+                flags |= STEP_PINNED
+            if run and SETUP_PATTERN.search(run):
+                flags |= STEP_INSTALLS
+            steps.append((str(step.get('name') or ''), action, ref,
+                          mask(hits.run), mask(hits.uses), mask(hits.combined), flags))
+        matrix = job_matrix(job)
+        matrix_size = 1
+        if matrix is not None:
+            job_flags |= JOB_MATRIX | (JOB_DYNAMIC_MATRIX if matrix.dynamic else 0)
+            matrix_size = min(len(matrix), 0xFFFFFFFF)
+        if job.get('timeout-minutes') is not None:
+            job_flags |= JOB_TIMEOUT
+        if job.get('needs'):
+            job_flags |= JOB_NEEDS
+        runs_on = job.get('runs-on', '')
+        if not isinstance(runs_on, str):
+            runs_on = json.dumps(runs_on, sort_keys=True, default=str)
+        jobs.append((str(job_id), runs_on, matrix_size, job_flags, steps))
+    flags = ((WORKFLOW_CONCURRENCY if 'concurrency' in yaml_dict else 0)
+             | (WORKFLOW_PERMISSIONS if 'permissions' in yaml_dict else 0))
+    return str(yaml_dict.get('name') or ''), flags, jobs
+
+
+def extract_files(paths, keywords=None):
+    """Worker entry point: (path, extracted workflow or None, error or None) per file."""
+    records = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                records.append((path, extract_workflow(parse_workflow(f.read(), cache=None), keywords=keywords), None))
+        except Exception as e:
+            records.append((path, None, f"{type(e).__name__}: {e}"))
+    return records
+
+
+class StringTable:
+    """Interned strings: each distinct value is stored once and referenced by a 32-bit id."""
+
+    def __init__(self, values=None):
+        self._values = values if values is not None else [""]
+        self._ids = None
+
+    def intern(self, value):
+        if self._ids is None:
+            self._ids = {v: i for i, v in enumerate(self._values)}
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = self._ids[value] = len(self._values)
+            self._values.append(value)
+        return string_id
+
+    def id_of(self, value):
+        """The id of ``value`` or None; builds the reverse index on first use."""
+        if self._ids is None:
+            self._ids = {v: i for i, v in enumerate(self)}
+        return self._ids.get(value)
+
+    def __getitem__(self, string_id):
+        return self._values[string_id]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class MappedStrings(StringTable):
+    """Strings of a mapped store file, decoded only when read."""
+
+    def __init__(self, offsets, data):
+        super().__init__(values=[])
+        self._offsets = offsets
+        self._data = data
+        self._cache = {}
+
+    def __getitem__(self, string_id):
+        value = self._cache.get(string_id)
+        if value is None:
+            value = self._cache[string_id] = str(self._data[self._offsets[string_id]:self._offsets[string_id + 1]],
+                                                 "utf-8")
+        return value
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def intern(self, value):
+        raise TypeError("A mapped workflow store is read-only")
+
+
+class ArrayOps:
+    """Column operations on ``array``/``memoryview`` columns; masks are bytearrays of 0 and 1."""
+
+    name = "array"
+    _NOT = bytes([1, 0]) + bytes(254)
+
+    def column(self, values):
+        return values
+
+    def view(self, buffer, typecode, offset, count):
+        return memoryview(buffer)[offset:offset + count * array.array(typecode).itemsize].cast(typecode)
+
+    def all(self, length):
+        return bytearray(b"\x01") * length
+
+    def eq(self, column, value):
+        return bytearray(map(value.__eq__, column))
+
+    def isin(self, column, values):
+        values = frozenset(values)
+        return bytearray(map(values.__contains__, column))
+
+    def any_bits(self, column, bits):
+        return bytearray(map(bool, map(bits.__and__, column)))
+
+    def and_(self, a, b):
+        # One big-integer AND instead of a Python loop over the rows.
+        return bytearray((int.from_bytes(a, "little") & int.from_bytes(b, "little")).to_bytes(len(a), "little"))
+
+    def or_(self, a, b):
+        return bytearray((int.from_bytes(a, "little") | int.from_bytes(b, "little")).to_bytes(len(a), "little"))
+
+    def not_(self, mask):
+        return bytearray(bytes(mask).translate(self._NOT))
+
+    def count(self, mask):
+        return mask.count(1)
+
+    def indices(self, mask):
+        return [i for i, selected in enumerate(mask) if selected]
+
+    def take(self, column, indices):
+        return [column[i] for i in indices]
+
+    def gather_mask(self, mask, index_column):
+        """``mask`` of the parent table broadcast to rows through ``index_column``."""
+        return bytearray(map(mask.__getitem__, index_column))
+
+    def value_counts(self, column, mask=None):
+        if mask is None:
+            return collections.Counter(column)
+        return collections.Counter(value for value, selected in zip(column, mask) if selected)
+
+    def total(self, column, mask=None):
+        if mask is None:
+            return sum(column)
+        return sum(value for value, selected in zip(column, mask) if selected)
+
+
+class NumpyOps(ArrayOps):
+    """The same operations on NumPy arrays; columns of a mapped file stay zero-copy views."""
+
+    name = "numpy"
+    dtypes = {"B": "uint8", "I": "uint32", "Q": "uint64"}
+
+    def column(self, values):
+        return numpy.frombuffer(values, dtype=self.dtypes[values.typecode]) if len(values) else \
+            numpy.zeros(0, dtype=self.dtypes[values.typecode])
+
+    def view(self, buffer, typecode, offset, count):
+        return numpy.frombuffer(buffer, dtype=self.dtypes[typecode], count=count, offset=offset)
+
+    def all(self, length):
+        return numpy.ones(length, dtype=bool)
+
+    def eq(self, column, value):
+        return column == value
+
+    def isin(self, column, values):
+        return numpy.isin(column, numpy.fromiter(values, dtype=column.dtype))
+
+    def any_bits(self, column, bits):
+        return (column & column.dtype.type(bits)) != 0
+
+    def and_(self, a, b):
+        return a & b
+
+    def or_(self, a, b):
+        return a | b
+
+    def not_(self, mask):
+        return ~mask
+
+    def count(self, mask):
+        return int(numpy.count_nonzero(mask))
+
+    def indices(self, mask):
+        return numpy.flatnonzero(mask)
+
+    def take(self, column, indices):
+        return column[indices]
+
+    def gather_mask(self, mask, index_column):
+        return mask[index_column]
+
+    def value_counts(self, column, mask=None):
+        values = column if mask is None else column[mask]
+        unique, counts = numpy.unique(values, return_counts=True)
+        return collections.Counter(dict(zip(unique.tolist(), counts.tolist())))
+
+    def total(self, column, mask=None):
+        return int(column.sum() if mask is None else column[mask].sum())
+
+
+def column_ops(use_numpy=None):
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if use_numpy and numpy is None:
+        raise ImportError("numpy is not installed")
+    return NumpyOps() if use_numpy else ArrayOps()
+
+
+def _field(column, string=False):
+    def get(self):
+        value = self._table.columns[column][self.index]
+        return self._table.store.strings[value] if string else int(value)
+    return property(get)
+
+
+def _flag(bit):
+    return property(lambda self: bool(self._table.columns["flags"][self.index] & bit))
+
+
+class Row:
+    __slots__ = ("_table", "index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self.index = index
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.index}>"
+
+
+class WorkflowRow(Row):
+    __slots__ = ()
+    path = _field("path", string=True)
+    name = _field("name", string=True)
+    job_count = _field("job_count")
+    step_count = _field("step_count")
+    has_concurrency = _flag(WORKFLOW_CONCURRENCY)
+    has_permissions = _flag(WORKFLOW_PERMISSIONS)
+
+    @property
+    def jobs(self):
+        first = int(self._table.columns["first_job"][self.index])
+        return [self._table.store.jobs[i] for i in range(first, first + self.job_count)]
+
+
+class JobRow(Row):
+    __slots__ = ()
+    job_id = _field("job_id", string=True)
+    runs_on = _field("runs_on", string=True)
+    step_count = _field("step_count")
+    matrix_size = _field("matrix_size")
+    uses_cache = _flag(JOB_CACHE)
+    has_matrix = _flag(JOB_MATRIX)
+    has_timeout = _flag(JOB_TIMEOUT)
+
+    @property
+    def workflow(self):
+        return self._table.store.workflows[int(self._table.columns["workflow"][self.index])]
+
+    @property
+    def steps(self):
+        first = int(self._table.columns["first_step"][self.index])
+        return [self._table.store.steps[i] for i in range(first, first + self.step_count)]
+
+
+class StepRow(Row):
+    __slots__ = ()
+    name = _field("name", string=True)
+    action = _field("action", string=True)
+    ref = _field("ref", string=True)
+    is_run = _flag(STEP_RUN)
+    is_uses = _flag(STEP_USES)
+    uses_cache = _flag(STEP_CACHE)
+    pinned = _flag(STEP_PINNED)
+    installs_dependencies = _flag(STEP_INSTALLS)
+
+    @property
+    def keywords(self):
+        return self._table.store.keywords_of(int(self._table.columns["hits"][self.index]))
+
+    @property
+    def job(self):
+        return self._table.store.jobs[int(self._table.columns["job"][self.index])]
+
+    @property
+    def workflow(self):
+        return self._table.store.workflows[int(self._table.columns["workflow"][self.index])]
+
+
+class Table:
+    def __init__(self, store, name, columns, row_class):
+        self.store = store
+        self.name = name
+        self.columns = columns
+        self.row_class = row_class
+
+    def __len__(self):
+        return len(self.columns["flags"])
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(f"{self.name} index {index} out of range")
+        return self.row_class(self, index)
+
+    def __iter__(self):
+        return (self.row_class(self, i) for i in range(len(self)))
+
+    def rows(self, mask):
+        return [self.row_class(self, int(i)) for i in self.store.ops.indices(mask)]
+
+
+class WorkflowStore:
+    """Workflows, jobs and steps of a corpus held as columns instead of nested dicts.
+
+    Every string is interned once and referenced by id, rows are ``__slots__``
+    views over the columns, and queries build boolean masks over whole columns
+    (with NumPy when it is installed). ``save`` writes a file that ``open``
+    maps back without parsing any YAML.
+    """
+
+    def __init__(self, strings, columns, keywords, ops, errors=None):
+        self.strings = strings
+        self.keywords = list(keywords)
+        self.ops = ops
+        self.workflows = Table(self, "workflows", columns["workflows"], WorkflowRow)
+        self.jobs = Table(self, "jobs", columns["jobs"], JobRow)
+        self.steps = Table(self, "steps", columns["steps"], StepRow)
+        self.errors = errors or []
+        self._mmap = None
+
+    # Building
+
+    @classmethod
+    def build(cls, paths, workers=None, chunk_size=64, use_numpy=None):
+        """Parses every workflow file under ``paths`` (in a process pool) into a new store."""
+        files = list(workflow_paths(paths))
+        keywords = engine_keywords()
+        builder = StoreBuilder(keywords)
+        chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+        if workers == 1 or len(chunks) <= 1:
+            results = (extract_files(chunk, keywords) for chunk in chunks)
+            for records in results:
+                builder.add_records(records)
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                for records in pool.map(extract_files, chunks, [keywords] * len(chunks)):
+                    builder.add_records(records)
+        return builder.finish(use_numpy)
+
+    @classmethod
+    def from_workflows(cls, workflows, use_numpy=None):
+        """Builds a store from (path, yaml_dict) pairs that are already parsed."""
+        keywords = engine_keywords()
+        builder = StoreBuilder(keywords)
+        for path, yaml_dict in workflows:
+            builder.add(path, extract_workflow(yaml_dict, keywords=keywords))
+        return builder.finish(use_numpy)
+
+    # Persistence
+
+    def save(self, path):
+        """Writes the columns, 8-byte aligned, followed by a JSON header locating them."""
+        offsets = array.array("Q", [0])
+        data = bytearray()
+        for value in self.strings:
+            data += value.encode("utf-8")
+            offsets.append(len(data))
+        blobs = [("strings.offsets", memoryview(offsets).cast("B")), ("strings.data", memoryview(data))]
+        header = {"byteorder": sys.byteorder, "keywords": self.keywords, "tables": {}, "blobs": {}}
+        for table_name, schema in SCHEMA.items():
+            table = getattr(self, table_name)
+            header["tables"][table_name] = len(table)
+            for column, typecode in schema:
+                blobs.append((f"{table_name}.{column}", memoryview(table.columns[column]).cast("B")))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(PREAMBLE.pack(MAGIC, 0, 0))
+            for name, blob in blobs:
+                f.write(bytes(_align(f.tell()) - f.tell()))
+                header["blobs"][name] = [f.tell(), blob.nbytes]
+                f.write(blob)
+            encoded = json.dumps(header).encode("utf-8")
+            header_offset = f.tell()
+            f.write(encoded)
+            f.seek(0)
+            f.write(PREAMBLE.pack(MAGIC, header_offset, len(encoded)))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def open(cls, path, use_numpy=None):
+        """Maps a file written by ``save``; columns are read lazily from the page cache."""
+        ops = column_ops(use_numpy)
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_offset, header_length = PREAMBLE.unpack_from(mapped) if len(mapped) >= PREAMBLE.size \
+            else (None, 0, 0)
+        if magic != MAGIC:
+            mapped.close()
+            raise ValueError(f"{path} is not a workflow store")
+        header = json.loads(mapped[header_offset:header_offset + header_length])
+        if header["byteorder"] != sys.byteorder:
+            mapped.close()
+            raise ValueError(f"{path} was written on a {header['byteorder']}-endian machine")
+        blobs = header["blobs"]
+        offset, size = blobs["strings.offsets"]
+        string_offsets = ArrayOps().view(mapped, "Q", offset, size // 8)
+        offset, size = blobs["strings.data"]
+        strings = MappedStrings(string_offsets, memoryview(mapped)[offset:offset + size])
+        columns = {}
+        for table_name, schema in SCHEMA.items():
+            columns[table_name] = {}
+            for column, typecode in schema:
+                offset, _ = blobs[f"{table_name}.{column}"]
+                columns[table_name][column] = ops.view(mapped, typecode, offset, header["tables"][table_name])
+        store = cls(strings, columns, header["keywords"], ops)
+        store._mmap = mapped
+        return store
+
+    # Queries
+
+    def keyword_mask(self, keyword, field="hits"):
+        """Steps whose ``field`` (``hits``, ``run_hits`` or ``uses_hits``) contains ``keyword``."""
+        if keyword not in self.keywords:
+            raise KeyError(f"'{keyword}' is not a rule keyword; known: {', '.join(self.keywords)}")
+        return self.ops.any_bits(self.steps.columns[field], 1 << self.keywords.index(keyword))
+
+    def keywords_of(self, bits):
+        return [kw for i, kw in enumerate(self.keywords) if bits >> i & 1]
+
+    def flag_mask(self, table, bit):
+        return self.ops.any_bits(getattr(self, table).columns["flags"], bit)
+
+    def string_mask(self, table, column, values):
+        ids = [i for i in (self.strings.id_of(value) for value in values) if i is not None]
+        return self.ops.isin(getattr(self, table).columns[column], ids)
+
+    def filter_steps(self, action=None, keyword=None, field="hits", uses=None, cached=None, pinned=None):
+        """Mask of steps matching every given condition; ``cached`` looks at the step or its job."""
+        ops = self.ops
+        mask = ops.all(len(self.steps))
+        if action is not None:
+            mask = ops.and_(mask, self.string_mask("steps", "action", [action] if isinstance(action, str) else action))
+        if keyword is not None:
+            mask = ops.and_(mask, self.keyword_mask(keyword, field))
+        if uses is not None:
+            uses_mask = self.flag_mask("steps", STEP_USES)
+            mask = ops.and_(mask, uses_mask if uses else ops.not_(uses_mask))
+        if pinned is not None:
+            pinned_mask = self.flag_mask("steps", STEP_PINNED)
+            mask = ops.and_(mask, pinned_mask if pinned else ops.not_(pinned_mask))
+        if cached is not None:
+            cached_mask = self.cached_steps()
+            mask = ops.and_(mask, cached_mask if cached else ops.not_(cached_mask))
+        return mask
+
+    def cached_steps(self):
+        job_cache = self.flag_mask("jobs", JOB_CACHE)
+        return self.ops.or_(self.flag_mask("steps", STEP_CACHE),
+                            self.ops.gather_mask(job_cache, self.steps.columns["job"]))
+
+    def share(self, mask, of=None):
+        """Fraction of the rows selected by ``of`` (default: all rows) that ``mask`` also selects."""
+        ops = self.ops
+        total = len(mask) if of is None else ops.count(of)
+        selected = ops.count(mask if of is None else ops.and_(mask, of))
+        return selected / total if total else 0.0
+
+    def count_by(self, table, column, mask=None, top=None):
+        """(value, rows) pairs of a string column, most common first."""
+        counts = self.ops.value_counts(getattr(self, table).columns[column], mask)
+        strings = self.strings
+        return [(strings[value], count) for value, count in counts.most_common(top)]
+
+    def uncached_actions(self, top=None):
+        """Setup actions used in jobs without any dependency caching, by number of steps."""
+        setup_ids = [i for i, value in enumerate(self.strings) if value.startswith("actions/setup-")]
+        mask = self.ops.and_(self.ops.isin(self.steps.columns["action"], setup_ids),
+                             self.ops.not_(self.cached_steps()))
+        return self.count_by("steps", "action", mask, top)
+
+    def summary(self, top=10):
+        ops = self.ops
+        uses = self.flag_mask("steps", STEP_USES)
+        installs = self.flag_mask("steps", STEP_INSTALLS)
+        jobs_without_cache = ops.not_(self.flag_mask("jobs", JOB_CACHE))
+        return {
+            "workflows": len(self.workflows),
+            "jobs": len(self.jobs),
+            "steps": len(self.steps),
+            "strings": len(self.strings),
+            "backend": ops.name,
+            "steps_using_master": self.share(self.keyword_mask("@master", "uses_hits")),
+            "actions_on_branch": self.share(ops.or_(self.keyword_mask("@master", "uses_hits"),
+                                                    self.keyword_mask("@main", "uses_hits")), of=uses),
+            "actions_pinned_to_sha": self.share(self.flag_mask("steps", STEP_PINNED), of=uses),
+            "steps_with_sudo": self.share(self.keyword_mask("sudo", "run_hits")),
+            "jobs_with_cache": self.share(self.flag_mask("jobs", JOB_CACHE)),
+            "jobs_with_timeout": self.share(self.flag_mask("jobs", JOB_TIMEOUT)),
+            "workflows_with_concurrency": self.share(self.flag_mask("workflows", WORKFLOW_CONCURRENCY)),
+            "matrix_jobs_total": ops.total(self.jobs.columns["matrix_size"]),
+            "uncached_install_steps": ops.count(ops.and_(installs, ops.not_(self.cached_steps()))),
+            "jobs_without_cache": ops.count(jobs_without_cache),
+            "top_actions": self.count_by("steps", "action", uses, top),
+            "top_runners": self.count_by("jobs", "runs_on", None, top),
+            "uncached_actions": self.uncached_actions(top),
+        }
+
+    def close(self):
+        if self._mmap is not None:
+            self.workflows = self.jobs = self.steps = self.strings = None
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Rows or columns handed out earlier still point into the map; it is
+                # unmapped once they are garbage collected.
+                pass
+            self._mmap = None
+
+
+class StoreBuilder:
+    """Appends extracted workflows to growable ``array`` columns."""
+
+    def __init__(self, keywords):
+        self.keywords = keywords
+        self.strings = StringTable()
+        self.columns = {table: {column: array.array(typecode) for column, typecode in schema}
+                        for table, schema in SCHEMA.items()}
+        self.errors = []
+
+    def add(self, path, extracted):
+        name, flags, jobs = extracted
+        intern = self.strings.intern
+        workflows, job_columns, step_columns = (self.columns[t] for t in ("workflows", "jobs", "steps"))
+        workflow = len(workflows["flags"])
+        first_job, first_step = len(job_columns["flags"]), len(step_columns["flags"])
+        for job_id, runs_on, matrix_size, job_flags, steps in jobs:
+            job = len(job_columns["flags"])
+            job_columns["workflow"].append(workflow)
+            job_columns["job_id"].append(intern(job_id))
+            job_columns["runs_on"].append(intern(runs_on))
+            job_columns["first_step"].append(len(step_columns["flags"]))
+            job_columns["step_count"].append(len(steps))
+            job_columns["matrix_size"].append(matrix_size)
+            job_columns["flags"].append(job_flags)
+            for step_name, action, ref, run_hits, uses_hits, hits, step_flags in steps:
+                step_columns["workflow"].append(workflow)
+                step_columns["job"].append(job)
+                step_columns["name"].append(intern(step_name))
+                step_columns["action"].append(intern(action))
+                step_columns["ref"].append(intern(ref))
+                step_columns["run_hits"].append(run_hits)
+                step_columns["uses_hits"].append(uses_hits)
+                step_columns["hits"].append(hits)
+                step_columns["flags"].append(step_flags)
+        workflows["path"].append(intern(path))
+        workflows["name"].append(intern(name))
+        workflows["first_job"].append(first_job)
+        workflows["job_count"].append(len(job_columns["flags"]) - first_job)
+        workflows["first_step"].append(first_step)
+        workflows["step_count"].append(len(step_columns["flags"]) - first_step)
+        workflows["flags"].append(flags)
+
+    def add_records(self, records):
+        for path, extracted, error in records:
+            if error is None:
+                self.add(path, extracted)
+            else:
+                self.errors.append((path, error))
+
+    def finish(self, use_numpy=None):
+        ops = column_ops(use_numpy)
+        columns = {table: {column: ops.column(values) for column, values in table_columns.items()}
+                   for table, table_columns in self.columns.items()}
+        return WorkflowStore(self.strings, columns, self.keywords, ops, self.errors)
+
+
+def _align(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def workflow_paths(paths):
+    """Workflow files under ``paths``: ``.github/workflows`` directories anywhere below a
+    directory, or the YAML files directly inside it when there are none."""
+    from scanner import discover_workflows
+
+    for path in paths:
+        if os.path.isdir(path):
+            found = sorted(discover_workflows(path))
+            yield from found or find_workflow_files([path])
+        else:
+            yield path
+
+
+def print_summary(summary):
+    print(f"📦 {summary['workflows']} workflows, {summary['jobs']} jobs, {summary['steps']} steps, "
+          f"{summary['strings']} distinct strings ({summary['backend']} columns)")
+    print(f"- ⛔ Steps using @master: {summary['steps_using_master']:.1%}")
+    print(f"- ⚠️ Actions on a branch (@master/@main): {summary['actions_on_branch']:.1%}")
+    print(f"- 📌 Actions pinned to a commit SHA: {summary['actions_pinned_to_sha']:.1%}")
+    print(f"- ⛔ Steps using sudo: {summary['steps_with_sudo']:.1%}")
+    print(f"- 💾 Jobs with caching: {summary['jobs_with_cache']:.1%} "
+          f"({summary['jobs_without_cache']} without, {summary['uncached_install_steps']} uncached install steps)")
+    print(f"- ⏱️ Jobs with timeout-minutes: {summary['jobs_with_timeout']:.1%}")
+    print(f"- 🚦 Workflows with a concurrency group: {summary['workflows_with_concurrency']:.1%}")
+    print(f"- 🔀 Job instances after matrix expansion: {summary['matrix_jobs_total']}")
+    for title, key in (("Top actions", "top_actions"), ("Top runners", "top_runners"),
+                       ("Setup actions without caching", "uncached_actions")):
+        print(f"\n{title}:")
+        for value, count in summary[key]:
+            print(f"  {count:>8}  {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="github_actions_ai.py store",
+        description="Build a columnar store of many workflows and run corpus-wide queries on it",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Parse workflows into a store file")
+    build_parser.add_argument("paths", nargs="+", help="Workflow files, directories or roots of repository mirrors")
+    build_parser.add_argument("--output", "-o", default="workflows.store", help="Store file to write")
+    build_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    query_parser = commands.add_parser("query", help="Print corpus-wide statistics of a store file")
+    query_parser.add_argument("store", help="Store file written by 'store build'")
+    query_parser.add_argument("--top", type=int, default=10, help="Entries in the top-N lists")
+    query_parser.add_argument("--json", action="store_true", help="Print the statistics as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        store = WorkflowStore.build(args.paths, args.workers)
+        store.save(args.output)
+        for path, error in store.errors:
+            print(f"⚠️ Skipped {path}: {error}")
+        print(f"✅ Stored {len(store.workflows)} workflows, {len(store.jobs)} jobs and {len(store.steps)} steps "
+              f"in {args.output}")
+        return 0
+    store = WorkflowStore.open(args.store)
+    summary = store.summary(args.top)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+    return 0
@@ -0,0 +1,169 @@
+import collections
+import copy
+import hashlib
+import pickle
+import threading
+
+import yaml
+
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+LIBYAML = Loader is not yaml.SafeLoader
+BOOL_TAG = "tag:yaml.org,2002:bool"
+STR_TAG = "tag:yaml.org,2002:str"
+CACHE_ENTRIES = 512
+CACHE_BYTES = 64 * 1024 * 1024
+
+
+class WorkflowLoader(Loader):
+    """Safe loader (libyaml when available) that reads a top-level ``on:`` key as "on".
+
+    YAML 1.1 resolves a plain ``on`` to ``True``; rewriting the key node before
+    construction does what ``fix_yaml_structure`` does, in place and in order.
+    """
+
+    def get_single_data(self):
+        node = self.get_single_node()
+        if node is None:
+            return None
+        if isinstance(node, yaml.MappingNode):
+            for key_node, _ in node.value:
+                if key_node.tag == BOOL_TAG and self.construct_yaml_bool(key_node) is True:
+                    key_node.tag, key_node.value = STR_TAG, "on"
+        return self.construct_document(node)
+
+
+class ParsedWorkflow(dict):
+    """A parsed YAML mapping that keeps the text it was parsed from in ``source``.
+
+    Copies are plain dicts: they are made to be changed, and would no longer
+    match the text.
+    """
+
+    source = None
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def with_source(data, source):
+    """``data`` as a ``ParsedWorkflow`` whose embedded text is ``source``."""
+    if not isinstance(data, dict):
+        return data
+    parsed = ParsedWorkflow(data)
+    parsed.source = source
+    return parsed
+
+
+class DocumentCache:
+    """Bounded LRU of parsed documents keyed by a hash of their text.
+
+    Documents are stored pickled and every hit unpickles a fresh copy, so
+    callers may modify what they get back.
+    """
+
+    def __init__(self, max_entries=CACHE_ENTRIES, max_bytes=CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()
+        self.size = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data):
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+        return pickle.loads(entry)
+
+    def put(self, key, value):
+        entry = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(entry) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self.entries[key] = entry
+            self.size += len(entry)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
+
+
+document_cache = DocumentCache()
+
+
+def load_yaml(content, cache=document_cache):
+    """Parses a YAML document (str, bytes or file); mappings come back as ``ParsedWorkflow``."""
+    if hasattr(content, "read"):
+        content = content.read()
+    if isinstance(content, bytes):
+        data, text = content, None
+    else:
+        data, text = content.encode("utf-8"), content
+    key = cache.key(data) if cache is not None else None
+    parsed = cache.get(key) if cache is not None else None
+    if parsed is None:
+        parsed = yaml.load(data, Loader=WorkflowLoader)
+        if cache is not None:
+            cache.put(key, parsed)
+    if isinstance(parsed, dict):
+        if text is None:
+            text = data.decode("utf-8-sig", "replace")
+        parsed = with_source(parsed, text)
+    return parsed
+
+
+def step_lines(source):
+    """1-based line numbers in ``source`` of every job (by job id) and step (by (job id, index)).
+
+    Only composes the node graph, so it is cheap enough to call when a report
+    needs to point at a line.
+    """
+    try:
+        root = yaml.compose(source, Loader=Loader)
+    except yaml.YAMLError:
+        return {}
+    lines = {}
+    if not isinstance(root, yaml.MappingNode):
+        return lines
+    for key, jobs in root.value:
+        if key.value != "jobs" or not isinstance(jobs, yaml.MappingNode):
+            continue
+        for job_key, job in jobs.value:
+            lines[job_key.value] = job_key.start_mark.line + 1
+            if not isinstance(job, yaml.MappingNode):
+                continue
+            for field, steps in job.value:
+                if field.value == "steps" and isinstance(steps, yaml.SequenceNode):
+                    for index, step in enumerate(steps.value):
+                        lines[(job_key.value, index)] = step.start_mark.line + 1
+    return lines
+
+
+def dump(data, stream=None, **options):
+    """Block-style YAML in key order with the C emitter when available."""
+    options.setdefault("default_flow_style", False)
+    options.setdefault("sort_keys", False)
+    return yaml.dump(data, stream, Dumper=Dumper, **options)